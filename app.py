@@ -1,127 +1,230 @@
+import io
 import os
 import json
+import uuid
 from datetime import datetime, date, timedelta
-from functools import wraps
 
-from flask import Flask, render_template, request, redirect, url_for, session
+import click
+from flask import (
+    Blueprint, Flask, Response, abort, current_app, render_template, request, redirect,
+    stream_with_context, url_for, jsonify,
+)
 from werkzeug.utils import secure_filename
-from sqlalchemy import func
+from sqlalchemy import bindparam, event, func, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from config import Config
+from models import (
+    db, User, HRDocument, Organization, Vehicle, OrgTech, OutsourceCompany, SolarSite, SolarReading, IjroTask, Job,
+    Notification,
+)
+from dashboard import admin_metrics, employee_summary, invalidate_metrics, invalidate_employee
+from outsourcing_analytics import analytics as outsourcing_stats, rebuild_summary as rebuild_outsourcing_summary
+from solar_rollup import PERIODS, period_series, site_daily, rebuild_rollups
+from solar_ingest import DEFAULT_CHUNK_SIZE, ingest as ingest_readings
+from fuel import (
+    month_start, vehicle_usage, fleet_overview, over_limit, organization_usage,
+    ingest as ingest_fuel, rebuild_totals as rebuild_fuel_totals,
+)
+from orgtech_history import (
+    STATUSES as ORGTECH_STATUSES, STATUS_LABELS as ORGTECH_LABELS, REPORT_DAYS,
+    current_counts as orgtech_counts, fleet_report as orgtech_report, item_history as orgtech_item_history,
+    take_snapshots as take_orgtech_snapshots, rebuild_snapshots as rebuild_orgtech_snapshots,
+)
+from solar_poller import SolarPoller, start_background_poller
+from deadlines import DeadlineScheduler, start_background_scheduler, overdue_condition
+from pagination import keyset_paginate
+from migrations import upgrade as upgrade_db, seed_admin
+from hr_import import DEFAULT_CHUNK_SIZE as HR_IMPORT_CHUNK_SIZE, import_users
+from page_cache import init_app as init_page_cache, cached_page, render_page
+from passwords import init_app as init_passwords, check_user_password, hash_password, is_hashed
+from auth import (
+    MANAGER_ROLES, current_user, is_manager, login_user, logout_user,
+    login_required, manager_required, roles_required, init_app as init_auth,
+)
+from querycount import init_app as init_query_counter, query_budget
+from profiling import init_app as init_profiling
+from exports import EXPORTS, FORMATS as EXPORT_FORMATS
+from search import DOCUMENTS as SEARCH_KINDS, rebuild_index as rebuild_search_index, search as search_index
+from uploads import make_thumbnail, thumbnail_or_original, spool_upload, discard_spooled
+import jobs
+import assets
+
+bp = Blueprint("main", __name__, cli_group=None)
+
+
+# ---------- APP FACTORY ----------
+
+def _configure_sqlite(app):
+    # har bir yangi ulanishda: WAL, busy_timeout va h.k. (Config.SQLITE_PRAGMAS)
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+
+    @event.listens_for(db.engine, "connect")
+    def _set_pragmas(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def create_app(config_object=Config, **overrides):
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    app.config.update(overrides)
+
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        # server bazalari uchun pool sozlamalari SQLite'ga tegishli emas
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            k: v for k, v in app.config["SQLALCHEMY_ENGINE_OPTIONS"].items()
+            if k not in ("pool_size", "max_overflow", "pool_timeout")
+        }
+    else:
+        app.config.pop("SQLITE_PRAGMAS", None)
+
+    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    os.makedirs(app.instance_path, exist_ok=True)
+    db.init_app(app)
+    app.register_blueprint(bp)
+    init_auth(app)
+    init_passwords(app)
+    assets.init_app(app)
+    init_page_cache(app)
+
+    with app.app_context():
+        if db.engine.dialect.name == "sqlite":
+            _configure_sqlite(app)
+        init_query_counter(app, db)
+    init_profiling(app, db)
+
+    app.extensions["solar_poller"] = SolarPoller(
+        timeout=app.config["SOLAR_POLL_TIMEOUT"],
+        max_workers=app.config["SOLAR_POLL_WORKERS"],
+    )
+    start_background_poller(app, app.extensions["solar_poller"])
+    app.extensions["deadlines"] = DeadlineScheduler(
+        remind_before=timedelta(hours=app.config["DEADLINE_REMIND_HOURS"]),
+        refresh_sec=app.config["DEADLINE_REFRESH_SEC"],
+    )
+    start_background_scheduler(app, app.extensions["deadlines"])
+    jobs.start_background_workers(app)
+    return app
+
+
+# ---------- MIGRATSIYA ----------
+
+# Sxema va admin import vaqtida emas, deploy paytida bir marta:
+#   flask --app app db-upgrade && flask --app app seed-admin
+@bp.cli.command("db-upgrade")
+def db_upgrade_command():
+    applied = upgrade_db(db.engine)
+    print("Migratsiyalar: " + (", ".join(applied) if applied else "baza yangi"))
+
+
+@bp.cli.command("seed-admin")
+@click.option("--username", default="admin", show_default=True)
+@click.option("--password", envvar="ADMIN_PASSWORD", default="admin")
+def seed_admin_command(username, password):
+    if seed_admin(username, password):
+        print(f"Admin yaratildi: {username}")
+    else:
+        print(f"Admin allaqachon mavjud: {username}")
+
+
+@bp.cli.command("passwords-rehash")
+@click.option("--batch-size", default=200, show_default=True)
+def passwords_rehash_command(batch_size):
+    # ochiq matnli eski parollarni kirishni kutmasdan xeshlash (boshqa narxdagi xeshlar
+    # faqat kirishda yangilanadi — ular uchun parol ma'lum emas)
+    legacy = [(uid, pw) for uid, pw in db.session.execute(select(User.id, User.password)) if not is_hashed(pw)]
+    table = User.__table__
+    stmt = table.update().where(table.c.id == bindparam("uid")).values(password=bindparam("pw"))
+    for start in range(0, len(legacy), batch_size):
+        batch = legacy[start:start + batch_size]
+        db.session.execute(stmt, [{"uid": uid, "pw": hash_password(pw)} for uid, pw in batch])
+        db.session.commit()
+        print(f"{start + len(batch)}/{len(legacy)}")
+    print(f"Xeshlandi: {len(legacy)} ta parol")
 
-from models import db, User, HRDocument, Organization, Vehicle, OrgTech, OutsourceCompany, SolarSite, SolarReading, IjroTask
 
-app = Flask(__name__)
+# ---------- HELPERS ----------
 
-app.config["SECRET_KEY"] = "super-secret-af-imperiya"
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///data.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["UPLOAD_FOLDER"] = os.path.join("static", "uploads")
+@bp.app_template_global()
+def upload_thumb(name):
+    # thumbnail tayyor bo'lsa o'shani, aks holda asl faylni ko'rsatamiz
+    return url_for("static", filename="uploads/" + thumbnail_or_original(current_app.config["UPLOAD_FOLDER"], name))
 
-os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
-db.init_app(app)
 
+def _import_source():
+    # multipart fayl yoki xom tana (csv / jsonl) — oqim xotiraga to'liq o'qilmaydi
+    fmt = request.args.get("format")
+    upload = request.files.get("file")
+    if upload:
+        return upload.stream, fmt or ("jsonl" if upload.filename.endswith((".jsonl", ".ndjson")) else "csv")
+    return request.stream, fmt or ("jsonl" if "json" in (request.mimetype or "") else "csv")
 
-# ---------- HELPERS ----------
 
-def login_required(f):
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        if "user_id" not in session:
-            return redirect(url_for("login"))
-        return f(*args, **kwargs)
-    return wrapper
-
-
-# ---------- INIT DB & DEFAULT ADMIN ----------
-with app.app_context():
-    db.create_all()
-    if not User.query.filter_by(username="admin").first():
-        admin = User(
-            username="admin",
-            password="admin",
-            role="admin",
-            full_name="Super Admin"
-        )
-        db.session.add(admin)
-        db.session.commit()
+def _print_ingest(stats):
+    print(
+        f"O'qildi: {stats.read}, qo'shildi: {stats.inserted}, "
+        f"takroriy: {stats.duplicates}, xato: {stats.invalid}, "
+        f"{stats.elapsed:.2f} s ({stats.rows_per_sec} qator/s)"
+    )
+    for err in stats.errors:
+        print("  " + err)
+
+
+@bp.app_template_global()
+def new_idempotency_key():
+    # formaga yashirin maydon: ikki marta yuborilsa ikkinchisi takroriy vazifa yaratmaydi
+    return uuid.uuid4().hex
+
 
+def _idempotency_key(prefix):
+    key = request.headers.get("Idempotency-Key") or request.form.get("idempotency_key")
+    return f"{prefix}:{key}"[:128] if key else None
 
 
 # ---------- LOGIN ----------
 
-@app.route("/", methods=["GET"])
+@bp.route("/", methods=["GET"])
 def index():
-    if "user_id" in session:
-        if session.get("user_role") == "admin":
-            return redirect(url_for("admin_dashboard"))
-        elif session.get("user_role") == "manager":
-            return redirect(url_for("admin_dashboard"))
-        else:
-            return redirect(url_for("employee_dashboard"))
-    return redirect(url_for("login"))
+    user = current_user()
+    if user.id is not None:
+        if user.role in MANAGER_ROLES:
+            return redirect(url_for(".admin_dashboard"))
+        return redirect(url_for(".employee_dashboard"))
+    return redirect(url_for(".login"))
 
 
-@app.route("/login", methods=["GET", "POST"])
+@bp.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         username = request.form.get("username")
         password = request.form.get("password")
         user = User.query.filter_by(username=username).first()
-        if user and user.password == password:
-            session["user_id"] = user.id
-            session["username"] = user.username
-            session["user_role"] = user.role
-            if user.role == "admin":
-                return redirect(url_for("admin_dashboard"))
-            elif user.role == "manager":
-                return redirect(url_for("admin_dashboard"))
-            else:
-                return redirect(url_for("employee_dashboard"))
+        if check_user_password(user, password):
+            login_user(user)  # qayta xeshlangan parol ham shu commit'da
+            if user.role in MANAGER_ROLES:
+                return redirect(url_for(".admin_dashboard"))
+            return redirect(url_for(".employee_dashboard"))
     # login.html oldin bergan dizayn bilan
     now = datetime.now()
     return render_template("login.html", now=now)
 
 
-@app.route("/logout")
+@bp.route("/logout")
 def logout():
-    session.clear()
-    return redirect(url_for("login"))
+    logout_user()
+    return redirect(url_for(".login"))
 
 
 # ---------- ADMIN DASHBOARD ----------
 
-@app.route("/admin/dashboard")
-@login_required
+@bp.route("/admin/dashboard")
+@manager_required()
+@query_budget(3)
 def admin_dashboard():
-    if session.get("user_role") not in ["admin", "manager"]:
-        return redirect(url_for("login"))
-
-    total_employees = User.query.filter_by(role="employee").count()
-    active_tasks = IjroTask.query.filter(IjroTask.status != "done").count()
-    vehicles_count = Vehicle.query.count()
-    outsource_count = OutsourceCompany.query.count()
-    solar_today = db.session.query(func.coalesce(func.sum(SolarReading.energy_kwh), 0)).filter(
-        SolarReading.date == date.today()
-    ).scalar()
-
-    task_status_data = {
-        "labels": ["new", "in_progress", "done"],
-        "values": [
-            IjroTask.query.filter_by(status="new").count(),
-            IjroTask.query.filter_by(status="in_progress").count(),
-            IjroTask.query.filter_by(status="done").count(),
-        ],
-    }
-
-    today = date.today()
-    solar_labels = []
-    solar_values = []
-    for i in range(6, -1, -1):
-        d = today - timedelta(days=i)
-        solar_labels.append(d.isoformat())
-        total_kwh = db.session.query(func.coalesce(func.sum(SolarReading.energy_kwh), 0)).filter(
-            SolarReading.date == d
-        ).scalar()
-        solar_values.append(float(total_kwh or 0))
+    metrics = admin_metrics()
 
     ijro_monthly_data = {
         "labels": [],
@@ -130,43 +233,25 @@ def admin_dashboard():
 
     return render_template(
         "admin/dashboard.html",
-        total_employees=total_employees,
-        active_tasks=active_tasks,
-        vehicles_count=vehicles_count,
-        outsource_count=outsource_count,
-        solar_today_kwh=solar_today or 0,
-        task_status_data=json.dumps(task_status_data),
+        total_employees=metrics["total_employees"],
+        active_tasks=metrics["active_tasks"],
+        overdue_tasks=metrics["overdue_tasks"],
+        vehicles_count=metrics["vehicles_count"],
+        outsource_count=metrics["outsource_count"],
+        solar_today_kwh=metrics["solar_today_kwh"],
+        task_status_data=json.dumps(metrics["task_status_data"]),
         ijro_monthly_data=json.dumps(ijro_monthly_data),
-        solar_weekly_data=json.dumps(
-            {"labels": solar_labels, "values": solar_values}
-        ),
+        solar_weekly_data=json.dumps(metrics["solar_weekly_data"]),
     )
 
 
 # ---------- EMPLOYEE DASHBOARD ----------
 
-@app.route("/employee/dashboard")
-@login_required
+@bp.route("/employee/dashboard")
+@roles_required("employee")
+@query_budget(1)
 def employee_dashboard():
-    if session.get("user_role") != "employee":
-        return redirect(url_for("login"))
-
-    user_id = session.get("user_id")
-    u = User.query.get_or_404(user_id)
-
-    today = date.today()
-    tasks_today = IjroTask.query.filter(
-        IjroTask.assigned_to_id == user_id,
-        IjroTask.date == today,
-    ).all()
-    today_tasks = len(tasks_today)
-
-    new_tasks = IjroTask.query.filter_by(
-        assigned_to_id=user_id, status="new"
-    ).count()
-    completed_tasks = IjroTask.query.filter_by(
-        assigned_to_id=user_id, status="done"
-    ).count()
+    summary = employee_summary(current_user().id)
 
     employee_modules = ["ijro", "vehicles", "orgtech", "hr"]
 
@@ -174,81 +259,149 @@ def employee_dashboard():
 
     return render_template(
         "employee/dashboard.html",
-        today_tasks=today_tasks,
-        new_tasks=new_tasks,
-        completed_tasks=completed_tasks,
+        today_tasks=summary["today_tasks"],
+        new_tasks=summary["new_tasks"],
+        completed_tasks=summary["completed_tasks"],
+        overdue_tasks=summary["overdue_tasks"],
         employee_modules=employee_modules,
-        today_task_list=tasks_today,
+        today_task_list=summary["today_task_list"],
         mini_calendar=mini_calendar,
     )
 
 
 # ---------- VEHICLES ----------
 
-@app.route("/vehicles")
+@bp.route("/vehicles")
 @login_required
+@query_budget(3)
 def vehicle_list():
-    vehicles = Vehicle.query.all()
-    return render_template("vehicles/list.html", vehicles=vehicles)
+    vehicles = keyset_paginate(Vehicle.query, [Vehicle.id])
+    usage = vehicle_usage([v.id for v in vehicles])
+    return render_template("vehicles/list.html", vehicles=vehicles, usage=usage, fleet=fleet_overview())
 
 
-@app.route("/vehicles/create", methods=["GET", "POST"])
-@login_required
+@bp.route("/vehicles/create", methods=["GET", "POST"])
+@manager_required(fallback="main.vehicle_list")
 def vehicle_create():
-    if session.get("user_role") not in ["admin", "manager"]:
-        return redirect(url_for("vehicle_list"))
-
     if request.method == "POST":
+        job_key = _idempotency_key("vehicle_create")
+        if jobs.find_job(job_key):
+            return redirect(url_for(".vehicle_list"))
+
         model = request.form.get("model")
         plate = request.form.get("plate_number")
         driver = request.form.get("driver_full_name")
         limit = request.form.get("monthly_fuel_limit") or 0
         repair = request.form.get("last_repair_date")
 
-        file = request.files.get("photo")
-        filename = None
-        if file and file.filename:
-            filename = secure_filename(file.filename)
-            file.save(os.path.join(app.config["UPLOAD_FOLDER"], filename))
-
         v = Vehicle(
             model=model,
             plate_number=plate,
             driver_full_name=driver,
             monthly_fuel_limit=int(limit),
             last_repair_date=repair,
-            photo=filename,
         )
         db.session.add(v)
-        db.session.commit()
-        return redirect(url_for("vehicle_list"))
+
+        # rasm hash'lash, joylash va thumbnail — fon vazifasida
+        file = request.files.get("photo")
+        if file and file.filename:
+            spooled = spool_upload(file, current_app.config["JOB_SPOOL_DIR"])
+            db.session.flush()
+            payload = {"vehicle_id": v.id, "path": spooled, "name": secure_filename(file.filename)}
+            _, created = jobs.enqueue("vehicle_photo", payload, key=job_key, created_by_id=current_user().id)
+            if not created:
+                discard_spooled(spooled)
+        else:
+            db.session.commit()
+        invalidate_metrics()
+        return redirect(url_for(".vehicle_list"))
 
     return render_template("vehicles/create.html")
 
 
-@app.route("/vehicles/<int:vehicle_id>")
+@bp.route("/vehicles/fuel")
+@manager_required(fallback="main.vehicle_list")
+@query_budget(4)
+def vehicle_fuel():
+    month = month_start(date.today())
+    value = request.args.get("month")
+    if value:
+        try:
+            month = datetime.strptime(value, "%Y-%m").date()
+        except ValueError:
+            pass
+    by_org = organization_usage(month=month)
+    org_names = dict(
+        db.session.query(Organization.id, Organization.name).filter(Organization.id.in_(list(by_org)))
+    ) if by_org else {}
+    return render_template(
+        "vehicles/fuel.html",
+        month=month,
+        fleet=fleet_overview(month),
+        over=over_limit(month),
+        by_org=sorted(by_org.items(), key=lambda item: -item[1]["liters"]),
+        org_names=org_names,
+    )
+
+
+@bp.route("/vehicles/fuel/import", methods=["POST"])
+@manager_required(fallback=None)
+def fuel_import():
+    raw, fmt = _import_source()
+    if fmt not in ("csv", "jsonl"):
+        return jsonify({"error": "format csv yoki jsonl bo'lishi kerak"}), 400
+
+    stats = ingest_fuel(io.TextIOWrapper(raw, encoding="utf-8", newline=""), fmt)
+    return jsonify(stats.as_dict())
+
+
+@bp.cli.command("ingest-fuel")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None)
+@click.option("--chunk-size", default=DEFAULT_CHUNK_SIZE, show_default=True)
+def ingest_fuel_command(path, fmt, chunk_size):
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, encoding="utf-8", newline="") as f:
+        stats = ingest_fuel(f, fmt, chunk_size)
+    _print_ingest(stats)
+
+
+@bp.cli.command("rebuild-fuel-totals")
+def rebuild_fuel_totals_command():
+    rows = rebuild_fuel_totals()
+    print(f"Yoqilg'i oylik yig'indilari qayta qurildi: {rows} qator")
+
+
+@bp.route("/vehicles/<int:vehicle_id>")
 @login_required
+@cached_page("vehicle", "vehicle_id")
+@query_budget(1)
 def vehicle_details(vehicle_id):
     v = Vehicle.query.get_or_404(vehicle_id)
-    return render_template("vehicles/details.html", vehicle=v)
+    return render_page("vehicles/detail.html", vehicle=v)
 
 
 # ---------- ORGTECH ----------
 
-@app.route("/orgtech")
+@bp.route("/orgtech")
 @login_required
+@query_budget(3)
 def orgtech_list():
-    items = OrgTech.query.all()
-    return render_template("orgtech/list.html", items=items)
+    items = keyset_paginate(OrgTech.query.options(joinedload(OrgTech.assigned_to)), [OrgTech.id])
+    return render_template(
+        "orgtech/list.html",
+        items=items,
+        counts=orgtech_counts(),
+        report=orgtech_report(min(max(request.args.get("days", REPORT_DAYS, type=int) or REPORT_DAYS, 1), 3660)),
+        statuses=ORGTECH_STATUSES,
+        labels=ORGTECH_LABELS,
+    )
 
 
-@app.route("/orgtech/create", methods=["GET", "POST"])
-@login_required
+@bp.route("/orgtech/create", methods=["GET", "POST"])
+@manager_required(fallback="main.orgtech_list")
 def orgtech_create():
-    if session.get("user_role") not in ["admin", "manager"]:
-        return redirect(url_for("orgtech_list"))
-
-    users = User.query.all()
     if request.method == "POST":
         t = OrgTech(
             name=request.form.get("name"),
@@ -257,38 +410,73 @@ def orgtech_create():
             status=request.form.get("status"),
             comment=request.form.get("comment"),
         )
-        assigned_id = request.form.get("assigned_to")
+        assigned_id = request.form.get("assigned_to_id")
         if assigned_id:
             t.assigned_to_id = int(assigned_id)
         db.session.add(t)
         db.session.commit()
-        return redirect(url_for("orgtech_list"))
+        return redirect(url_for(".orgtech_list"))
 
-    return render_template("orgtech/create.html", users=users)
+    return render_template("orgtech/form.html", users=User.query.all())
 
 
-@app.route("/orgtech/<int:item_id>")
+@bp.route("/orgtech/<int:item_id>")
 @login_required
+@cached_page("orgtech", "item_id", also=[("users", 0)], period="hour")  # holatlar davomiyligi soatlarda
+@query_budget(4)
 def orgtech_details(item_id):
+    item = OrgTech.query.options(joinedload(OrgTech.assigned_to)).get_or_404(item_id)
+    return render_page(
+        "orgtech/details.html",
+        item=item,
+        history=orgtech_item_history(item_id),
+        users=User.query.all() if is_manager() else [],
+        statuses=ORGTECH_STATUSES,
+        labels=ORGTECH_LABELS,
+    )
+
+
+@bp.route("/orgtech/<int:item_id>/update", methods=["POST"])
+@manager_required(fallback="main.orgtech_list")
+def orgtech_update(item_id):
+    # holat yoki biriktirish o'zgarsa orgtech_history jurnalga yozadi
     item = OrgTech.query.get_or_404(item_id)
-    return render_template("orgtech/details.html", item=item)
+    status = request.form.get("status")
+    if status:
+        item.status = status
+    if "assigned_to_id" in request.form:
+        assigned_id = request.form.get("assigned_to_id")
+        item.assigned_to_id = int(assigned_id) if assigned_id else None
+    if request.form.get("comment") is not None:
+        item.comment = request.form.get("comment")
+    db.session.commit()
+    return redirect(url_for(".orgtech_details", item_id=item_id))
+
+
+@bp.cli.command("orgtech-snapshot")
+@click.option("--rebuild", is_flag=True, help="barcha snapshotlarni jurnaldan qayta qurish")
+def orgtech_snapshot_command(rebuild):
+    days = rebuild_orgtech_snapshots() if rebuild else take_orgtech_snapshots()
+    job, _ = jobs.schedule_orgtech_snapshot()
+    print(f"Snapshot kunlari: {days}; keyingisi: {job.run_after:%Y-%m-%d %H:%M} UTC (vazifa #{job.id})")
 
 
 # ---------- ORGANIZATIONS ----------
 
-@app.route("/organizations")
+@bp.route("/organizations")
 @login_required
+@query_budget(3)
 def organizations_list():
-    organizations = Organization.query.all()
-    return render_template("organizations/list.html", organizations=organizations)
+    organizations = keyset_paginate(
+        Organization.query.options(selectinload(Organization.vehicles)), [Organization.id]
+    )
+    fuel = organization_usage([org.id for org in organizations])
+    return render_template("organizations/list.html", organizations=organizations, fuel=fuel)
 
 
-@app.route("/organizations/create", methods=["GET", "POST"])
-@login_required
+@bp.route("/organizations/create", methods=["GET", "POST"])
+@manager_required(fallback="main.organizations_list")
 def organizations_create():
-    if session.get("user_role") not in ["admin", "manager"]:
-        return redirect(url_for("organizations_list"))
-
     if request.method == "POST":
         org = Organization(
             name=request.form.get("name"),
@@ -299,85 +487,89 @@ def organizations_create():
         )
         db.session.add(org)
         db.session.commit()
-        return redirect(url_for("organizations_list"))
+        return redirect(url_for(".organizations_list"))
 
     return render_template("organizations/create.html")
 
 
-@app.route("/organizations/<int:org_id>")
+@bp.route("/organizations/<int:org_id>")
 @login_required
+@cached_page("organization", "org_id")  # joriy oy sarfi: sana ham imzoda
+@query_budget(3)
 def organizations_details(org_id):
-    org = Organization.query.get_or_404(org_id)
-    return render_template("organizations/details.html", org=org)
+    org = Organization.query.options(selectinload(Organization.vehicles)).get_or_404(org_id)
+    usage = vehicle_usage([v.id for v in org.vehicles])
+    return render_page("organizations/details.html", org=org, usage=usage)
 
 
 # ---------- OUTSOURSING ----------
 
-@app.route("/outsourcing")
+@bp.route("/outsourcing")
 @login_required
+@query_budget(1)
 def outsourcing_list():
-    companies = OutsourceCompany.query.all()
+    companies = keyset_paginate(OutsourceCompany.query, [OutsourceCompany.id])
     return render_template("outsourcing/list.html", companies=companies)
 
 
-@app.route("/outsourcing/create", methods=["GET", "POST"])
-@login_required
+@bp.route("/outsourcing/create", methods=["GET", "POST"])
+@manager_required(fallback="main.outsourcing_list")
 def outsourcing_create():
-    if session.get("user_role") not in ["admin", "manager"]:
-        return redirect(url_for("outsourcing_list"))
-
     if request.method == "POST":
         from datetime import datetime as dt
 
-        date_str = request.form.get("contract_date")
-        cdate = None
-        if date_str:
+        def parse_date(name):
+            value = request.form.get(name)
+            if not value:
+                return None
             try:
-                cdate = dt.strptime(date_str, "%Y-%m-%d").date()
+                return dt.strptime(value, "%Y-%m-%d").date()
             except Exception:
-                cdate = None
+                return None
 
         comp = OutsourceCompany(
             name=request.form.get("name"),
             service_type=request.form.get("service_type"),
             contract_number=request.form.get("contract_number"),
-            contract_date=cdate,
+            contract_date=parse_date("contract_date"),
+            contract_end_date=parse_date("contract_end_date"),
             contract_amount=float(request.form.get("contract_amount") or 0),
             comment=request.form.get("comment"),
         )
+        # OutsourceSummary shu commit ichida mapper hodisasi orqali yangilanadi
         db.session.add(comp)
         db.session.commit()
-        return redirect(url_for("outsourcing_list"))
+        return redirect(url_for(".outsourcing_list"))
+
+    return render_template("outsourcing/form.html")
+
 
-    return render_template("outsourcing/create.html")
+@bp.route("/outsourcing/analytics")
+@manager_required(fallback="main.outsourcing_list")
+@query_budget(4)
+def outsourcing_analytics():
+    return render_template("outsourcing/analytics.html", stats=outsourcing_stats())
 
 
-@app.route("/outsourcing/<int:company_id>")
+@bp.route("/outsourcing/<int:company_id>")
 @login_required
+@cached_page("outsource", "company_id")
+@query_budget(1)
 def outsourcing_details(company_id):
     company = OutsourceCompany.query.get_or_404(company_id)
-    return render_template("outsourcing/details.html", company=company)
+    return render_page("outsourcing/details.html", company=company)
 
 
 # ---------- SOLAR ----------
 
-@app.route("/solar")
+@bp.route("/solar")
 @login_required
 def solar_dashboard():
     sites = SolarSite.query.all()
     total_power_kw = sum(s.last_power_kw or 0 for s in sites)
     total_energy_today_kwh = sum(s.last_energy_today_kwh or 0 for s in sites)
 
-    today = date.today()
-    labels = []
-    values = []
-    for i in range(6, -1, -1):
-        d = today - timedelta(days=i)
-        labels.append(d.isoformat())
-        total_kwh = db.session.query(func.coalesce(func.sum(SolarReading.energy_kwh), 0)).filter(
-            SolarReading.date == d
-        ).scalar()
-        values.append(float(total_kwh or 0))
+    labels, values = period_series("day", 7)
 
     return render_template(
         "solar/dashboard.html",
@@ -389,21 +581,17 @@ def solar_dashboard():
     )
 
 
-@app.route("/solar/<int:site_id>")
+@bp.route("/solar/<int:site_id>")
 @login_required
+@cached_page("solar_site", "site_id")
+@query_budget(2)
 def solar_detail(site_id):
     site = SolarSite.query.get_or_404(site_id)
-    readings = (
-        SolarReading.query.filter_by(site_id=site.id)
-        .order_by(SolarReading.date.desc())
-        .limit(14)
-        .all()
-    )
-    readings = list(reversed(readings))
+    readings = site_daily(site.id, 14)
     labels = [r.date.isoformat() for r in readings]
     values = [float(r.energy_kwh or 0) for r in readings]
 
-    return render_template(
+    return render_page(
         "solar/site_detail.html",
         site=site,
         readings=readings,
@@ -412,21 +600,92 @@ def solar_detail(site_id):
     )
 
 
+@bp.route("/solar/energy")
+@login_required
+def solar_energy_series():
+    period = request.args.get("period", "day")
+    if period not in PERIODS:
+        period = "day"
+    count = min(max(request.args.get("count", 7, type=int), 1), 366)
+    labels, values = period_series(period, count)
+    return jsonify({"period": period, "labels": labels, "values": values})
+
+
+@bp.route("/solar/ingest", methods=["POST"])
+@manager_required(fallback=None)
+def solar_ingest():
+    raw, fmt = _import_source()
+    if fmt not in ("csv", "jsonl"):
+        return jsonify({"error": "format csv yoki jsonl bo'lishi kerak"}), 400
+
+    stats = ingest_readings(io.TextIOWrapper(raw, encoding="utf-8", newline=""), fmt)
+    invalidate_metrics()
+    return jsonify(stats.as_dict())
+
+
+@bp.cli.command("ingest-solar")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), default=None)
+@click.option("--chunk-size", default=DEFAULT_CHUNK_SIZE, show_default=True)
+def ingest_solar_command(path, fmt, chunk_size):
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, encoding="utf-8", newline="") as f:
+        stats = ingest_readings(f, fmt, chunk_size)
+    _print_ingest(stats)
+
+
+@bp.route("/solar/poller")
+@manager_required(fallback=None)
+def solar_poller_stats():
+    return jsonify(current_app.extensions["solar_poller"].stats())
+
+
+@bp.cli.command("poll-solar")
+@click.option("--interval", default=0, help="Sekund; 0 bo'lsa bir marta so'raydi.")
+def poll_solar_command(interval):
+    poller = current_app.extensions["solar_poller"]
+    if interval:
+        poller.run_forever(current_app._get_current_object(), interval)
+        return
+    cycle = poller.poll_once()
+    print(
+        f"Stansiyalar: {cycle['sites']}, so'raldi: {cycle['polled']}, "
+        f"muvaffaqiyatli: {cycle['ok']}, xato: {cycle['failed']}, {cycle['elapsed_ms']} ms"
+    )
+    for site_id, st in poller.stats()["sites"].items():
+        if st["last_error"]:
+            print(f"  #{site_id}: {st['last_error']}")
+
+
+@bp.cli.command("rebuild-solar-rollups")
+def rebuild_solar_rollups_command():
+    days = rebuild_rollups()
+    print(f"Solar rollup qayta qurildi: {days} kun")
+
+
+@bp.cli.command("rebuild-outsourcing-summary")
+def rebuild_outsourcing_summary_command():
+    rows = rebuild_outsourcing_summary()
+    print(f"Outsorsing yig'indisi qayta qurildi: {rows} qator")
+
+
 # ---------- IJRO ----------
 
-@app.route("/ijro")
+@bp.route("/ijro")
 @login_required
+@query_budget(1)
 def ijro_list():
-    tasks = IjroTask.query.order_by(IjroTask.date.asc()).all()
-    return render_template("ijro/list.html", tasks=tasks)
+    query = IjroTask.query.options(joinedload(IjroTask.assigned_to))
+    overdue = request.args.get("overdue") == "1"
+    if overdue:
+        query = query.filter(overdue_condition())
+    tasks = keyset_paginate(query, [IjroTask.date, IjroTask.id])
+    return render_template("ijro/list.html", tasks=tasks, overdue=overdue)
 
 
-@app.route("/ijro/create", methods=["GET", "POST"])
-@login_required
+@bp.route("/ijro/create", methods=["GET", "POST"])
+@manager_required(fallback="main.ijro_list")
 def ijro_create():
-    if session.get("user_role") not in ["admin", "manager"]:
-        return redirect(url_for("ijro_list"))
-
     employees = User.query.filter_by(role="employee").all()
     if request.method == "POST":
         from datetime import datetime as dt
@@ -455,59 +714,161 @@ def ijro_create():
             task.assigned_to_id = int(assigned)
         db.session.add(task)
         db.session.commit()
-        return redirect(url_for("ijro_list"))
+        invalidate_metrics()
+        invalidate_employee(task.assigned_to_id)
+        return redirect(url_for(".ijro_list"))
 
     return render_template("ijro/create.html", employees=employees)
 
 
-@app.route("/ijro/done/<int:task_id>")
+@bp.route("/ijro/done/<int:task_id>")
 @login_required
 def ijro_done(task_id):
     t = IjroTask.query.get_or_404(task_id)
     # faqat xuddi o'ziga tegishli bo'lsa yoki admin/manager bo‘lsa
-    if session.get("user_role") == "employee" and t.assigned_to_id != session.get("user_id"):
-        return redirect(url_for("ijro_list"))
+    user = current_user()
+    if user.role == "employee" and t.assigned_to_id != user.id:
+        return redirect(url_for(".ijro_list"))
     t.status = "done"
     db.session.commit()
-    return redirect(url_for("ijro_list"))
+    invalidate_metrics()
+    invalidate_employee(t.assigned_to_id)
+    return redirect(url_for(".ijro_list"))
 
 
-@app.route("/ijro/calendar")
+@bp.route("/ijro/calendar")
 @login_required
 def ijro_calendar():
-    tasks = IjroTask.query.all()
-    tasks_json = [
-        {
-            "title": t.title,
-            "description": t.description or "",
-            "date": t.date.isoformat() if t.date else "",
-            "due_date": t.due_date.isoformat() if t.due_date else "",
-            "status": t.status or "new",
-        }
-        for t in tasks
-    ]
-    return render_template("ijro/calendar.html", tasks_json=json.dumps(tasks_json))
+    return render_template("ijro/calendar.html")
 
 
-# ---------- HR ----------
+def _month_window(value):
+    try:
+        first = datetime.strptime(value, "%Y-%m").date()
+    except (TypeError, ValueError):
+        first = date.today().replace(day=1)
+    if first.month == 12:
+        nxt = first.replace(year=first.year + 1, month=1)
+    else:
+        nxt = first.replace(month=first.month + 1)
+    return first, nxt
+
 
-@app.route("/hr")
+@bp.route("/ijro/calendar/feed")
 @login_required
-def hr_list():
-    if session.get("user_role") not in ["admin", "manager"]:
-        return redirect(url_for("login"))
+@query_budget(2)
+def ijro_calendar_feed():
+    first, nxt = _month_window(request.args.get("month"))
+    in_month = (IjroTask.date >= first, IjroTask.date < nxt)
+
+    # oyning versiyasi: soni, id yig'indisi va oxirgi o'zgarish — indeks bo'yicha bitta so'rov
+    count, id_sum, last_modified = db.session.query(
+        func.count(IjroTask.id), func.coalesce(func.sum(IjroTask.id), 0), func.max(IjroTask.updated_at)
+    ).filter(*in_month).one()
+    etag = f"{first:%Y-%m}-{count}-{id_sum}-{last_modified.timestamp() if last_modified else 0}"
+
+    if request.if_none_match.contains(etag):
+        resp = current_app.response_class(status=304)
+    else:
+        tasks = (
+            IjroTask.query.filter(*in_month)
+            .order_by(IjroTask.date, IjroTask.id)
+            .all()
+        )
+        days = {}
+        for t in tasks:
+            days.setdefault(t.date.isoformat(), []).append({
+                "title": t.title,
+                "description": t.description or "",
+                "due_date": t.due_date.isoformat() if t.due_date else "",
+                "status": t.status or "new",
+            })
+        resp = jsonify({"month": f"{first:%Y-%m}", "days": days})
+
+    resp.set_etag(etag)
+    if last_modified:
+        resp.last_modified = last_modified
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
+
+
+# ---------- QIDIRUV ----------
+
+SEARCH_URLS = {
+    "user": (".hr_profile", "user_id"),
+    "vehicle": (".vehicle_details", "vehicle_id"),
+    "organization": (".organizations_details", "org_id"),
+    "outsource": (".outsourcing_details", "company_id"),
+    "orgtech": (".orgtech_details", "item_id"),
+    "task": (".ijro_list", None),
+}
+
+
+@bp.route("/search")
+@login_required
+@query_budget(2)
+def global_search():
+    kinds = [k for k in request.args.getlist("kind") if k in SEARCH_KINDS] or list(SEARCH_KINDS)
+    if not is_manager():
+        # xodimlar boshqalarning pasport ma'lumotlarini qidira olmaydi
+        kinds = [k for k in kinds if k != "user"]
+
+    page = request.args.get("page", 1, type=int)
+    results, has_next = search_index(
+        request.args.get("q", ""), kinds, page, request.args.get("per_page", 20, type=int)
+    )
+    for r in results:
+        endpoint, arg = SEARCH_URLS[r["kind"]]
+        r["url"] = url_for(endpoint, **({arg: r["id"]} if arg else {}))
+    return jsonify({"page": max(page, 1), "has_next": has_next, "results": results})
 
-    users = User.query.filter(User.role == "employee").all()
+
+@bp.cli.command("rebuild-search")
+def rebuild_search_command():
+    total = rebuild_search_index()
+    print(f"Qidiruv indeksi qayta qurildi: {total} hujjat")
+
+
+# ---------- EKSPORT ----------
+
+@bp.route("/export/<name>.<fmt>")
+@manager_required(fallback=None)
+def export(name, fmt):
+    if name not in EXPORTS or fmt not in EXPORT_FORMATS:
+        abort(404)
+    stream, mimetype = EXPORT_FORMATS[fmt]
+    response = Response(stream_with_context(stream(name)), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{name}-{date.today():%Y%m%d}.{fmt}"'
+    response.headers["X-Accel-Buffering"] = "no"  # nginx bo'laklarni ushlab qolmasin
+    return response
+
+
+# ---------- UPLOADS ----------
+
+@bp.cli.command("build-thumbnails")
+def build_thumbnails_command():
+    folder = current_app.config["UPLOAD_FOLDER"]
+    names = [v.photo for v in Vehicle.query.filter(Vehicle.photo.isnot(None))]
+    names += [u.photo for u in User.query.filter(User.photo.isnot(None))]
+    built = sum(1 for name in names if make_thumbnail(folder, name))
+    print(f"Thumbnail: {built} / {len(names)}")
+
+
+# ---------- HR ----------
+
+@bp.route("/hr")
+@manager_required()
+@query_budget(1)
+def hr_list():
+    users = keyset_paginate(User.query.filter(User.role == "employee"), [User.id])
     return render_template("hr/list.html", users=users)
 
 
 
-@app.route("/hr/create", methods=["GET", "POST"])
-@login_required
+@bp.route("/hr/create", methods=["GET", "POST"])
+@manager_required()
 def hr_create():
-    if session.get("user_role") not in ["admin", "manager"]:
-        return redirect(url_for("login"))
-
     if request.method == "POST":
         username = request.form["username"]
         password = request.form["password"]
@@ -517,7 +878,7 @@ def hr_create():
 
         new_user = User(
             username=username,
-            password=password,
+            password=hash_password(password),
             full_name=full_name,
             position=position,
             phone=phone,
@@ -526,32 +887,40 @@ def hr_create():
         db.session.add(new_user)
         db.session.commit()
 
-        return redirect(url_for("hr_list"))
+        return redirect(url_for(".hr_list"))
 
     return render_template("hr/create.html")
 
 
 
-@app.route("/hr/profile/<int:user_id>")
+def _own_profile_only(user_id):
+    # xodim faqat o'z profilini ko'radi — keshdan oldin tekshiriladi
+    user = current_user()
+    if user.role == "employee" and user.id != user_id:
+        return redirect(url_for(".employee_dashboard"))
+    return None
+
+
+@bp.route("/hr/profile/<int:user_id>")
 @login_required
+@cached_page("user", "user_id", guard=_own_profile_only)
+@query_budget(2)
 def hr_profile(user_id):
-    if session.get("user_role") == "employee" and session.get("user_id") != user_id:
-        return redirect(url_for("employee_dashboard"))
-
-    u = User.query.get_or_404(user_id)
-    return render_template("hr/profile.html", user=u)
+    u = User.query.options(selectinload(User.docs)).get_or_404(user_id)
+    return render_page("hr/profile.html", user=u)
 
 
 
-@app.route("/hr/edit/<int:user_id>", methods=["GET", "POST"])
-@login_required
+@bp.route("/hr/edit/<int:user_id>", methods=["GET", "POST"])
+@manager_required()
 def hr_edit(user_id):
-    if session.get("user_role") not in ["admin", "manager"]:
-        return redirect(url_for("login"))
-
     u = User.query.get_or_404(user_id)
 
     if request.method == "POST":
+        job_key = _idempotency_key(f"hr_edit:{user_id}")
+        if jobs.find_job(job_key):
+            return redirect(url_for(".hr_profile", user_id=user_id))
+
         u.full_name = request.form.get("full_name")
         u.position = request.form.get("position")
         u.phone = request.form.get("phone")
@@ -567,28 +936,215 @@ def hr_edit(user_id):
         u.diploma_from = request.form.get("diploma_from")
         u.diploma_year = request.form.get("diploma_year")
 
+        # fayllar spool'ga tushadi; hash, joylash va HRDocument yozuvlari — fon vazifasida
+        spool_dir = current_app.config["JOB_SPOOL_DIR"]
         photo = request.files.get("photo")
-        if photo and photo.filename:
-            filename = secure_filename(photo.filename)
-            photo.save(os.path.join(app.config["UPLOAD_FOLDER"], filename))
-            u.photo = filename
-
-        docs_files = request.files.getlist("docs")
-        for f in docs_files:
-            if f and f.filename:
-                fname = secure_filename(f.filename)
-                f.save(os.path.join(app.config["UPLOAD_FOLDER"], fname))
-                doc = HRDocument(filename=fname, owner=u)
-                db.session.add(doc)
-
-        db.session.commit()
-        return redirect(url_for("hr_profile", user_id=user_id))
+        photo = [spool_upload(photo, spool_dir), secure_filename(photo.filename)] if photo and photo.filename else None
+        docs = [
+            [spool_upload(f, spool_dir), secure_filename(f.filename)]
+            for f in request.files.getlist("docs")
+            if f and f.filename
+        ]
+
+        if photo or docs:
+            payload = {"user_id": u.id, "docs": docs, "photo": photo}
+            _, created = jobs.enqueue("hr_uploads", payload, key=job_key, created_by_id=current_user().id)
+            if not created:
+                discard_spooled(*(path for path, _ in docs + ([photo] if photo else [])))
+        else:
+            db.session.commit()
+        return redirect(url_for(".hr_profile", user_id=user_id))
 
     return render_template("hr/edit.html", user=u)
 
 
+@bp.route("/hr/import", methods=["POST"])
+@manager_required(fallback=None)
+def hr_import():
+    # avval tekshiruv va farqlar (dry-run hisobot); yozish — fon vazifasida
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        return jsonify({"error": "CSV fayl kerak"}), 400
+    dry_run = request.values.get("dry_run") == "1"
+    job_key = _idempotency_key("hr_import")
+    if not dry_run:
+        job = jobs.find_job(job_key)
+        if job:
+            return jsonify({"job": jobs.as_dict(job)})
+
+    path = spool_upload(upload, current_app.config["JOB_SPOOL_DIR"])
+    report = import_users(path, dry_run=True)
+    if dry_run or report.invalid:
+        discard_spooled(path)
+        return jsonify(report.as_dict()), 422 if report.invalid else 200
+
+    job, created = jobs.enqueue("hr_import", {"path": path}, key=job_key, created_by_id=current_user().id)
+    if not created:
+        discard_spooled(path)
+    resp = jsonify({"report": report.as_dict(), "job": jobs.as_dict(job)})
+    resp.status_code = 202
+    resp.headers["Location"] = url_for(".job_status", job_id=job.id)
+    return resp
+
+
+@bp.cli.command("hr-import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--dry-run", is_flag=True, help="faqat tekshiruv va farqlar, hech narsa yozilmaydi")
+@click.option("--chunk-size", default=HR_IMPORT_CHUNK_SIZE, show_default=True)
+def hr_import_command(path, dry_run, chunk_size):
+    report = import_users(path, dry_run=dry_run, chunk_size=chunk_size)
+    for change in report.changes:
+        fields = ", ".join(f"{f}: {old!r} → {new!r}" for f, (old, new) in change["fields"].items())
+        print(f"  {change['line']}-qator {change['action']} {change['username']}: {fields}")
+    print(
+        f"O'qildi: {report.read}, yangi: {report.inserted}, yangilanadi: {report.updated}, "
+        f"o'zgarishsiz: {report.unchanged}, xato: {report.invalid}, "
+        f"{report.elapsed:.2f} s ({report.rows_per_sec} qator/s)"
+    )
+    for err in report.errors:
+        print("  " + err)
+    if report.ignored_columns:
+        print("E'tiborsiz ustunlar: " + ", ".join(report.ignored_columns))
+    if report.applied:
+        print("Yozildi.")
+    elif report.committed:
+        print(f"Qisman yozildi: {report.committed} ta qator, qolganlari xato tufayli yozilmadi.")
+    elif not dry_run:
+        print("Xatolar tuzatilmaguncha hech narsa yozilmadi.")
+
+
+# ---------- FON VAZIFALARI ----------
+
+@bp.route("/jobs")
+@manager_required(fallback=None)
+@query_budget(2)
+def job_list():
+    recent = Job.query.order_by(Job.id.desc()).limit(50).all()
+    return jsonify({"counts": jobs.counts(), "jobs": [jobs.as_dict(j) for j in recent]})
+
+
+@bp.route("/jobs/<int:job_id>")
+@manager_required(fallback=None)
+@query_budget(1)
+def job_status(job_id):
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({"error": "vazifa topilmadi"}), 404
+    return jsonify(jobs.as_dict(job))
+
+
+@bp.route("/jobs/<kind>", methods=["POST"])
+@manager_required(fallback=None)
+def job_enqueue(kind):
+    if kind not in jobs.MAINTENANCE:
+        return jsonify({"error": "noma'lum vazifa", "kinds": sorted(jobs.MAINTENANCE)}), 400
+    job, created = jobs.enqueue(kind, key=_idempotency_key(kind), created_by_id=current_user().id)
+    resp = jsonify(jobs.as_dict(job))
+    resp.status_code = 202 if created else 200
+    resp.headers["Location"] = url_for(".job_status", job_id=job.id)
+    return resp
+
+
+@bp.cli.command("jobs-worker")
+@click.option("--processes", "-p", default=2, show_default=True)
+@click.option("--burst", is_flag=True, help="navbat bo'shaguncha ishlab, chiqib ketadi (bitta jarayon)")
+def jobs_worker_command(processes, burst):
+    if burst:
+        print(f"Bajarildi: {jobs.work(current_app._get_current_object(), burst=True)} ta vazifa")
+        return
+    jobs.schedule_daily()
+    print(f"{processes} ta worker jarayoni ishga tushdi (Ctrl+C — to'xtatish)")
+    jobs.run_pool(processes, {"SQLALCHEMY_DATABASE_URI": current_app.config["SQLALCHEMY_DATABASE_URI"]})
+
+
+@bp.cli.command("jobs-prune")
+@click.option("--days", default=7, show_default=True)
+def jobs_prune_command(days):
+    print(f"O'chirildi: {jobs.prune(days)} ta tugagan vazifa")
+
+
+# ---------- BILDIRISHNOMALAR ----------
+
+@bp.route("/notifications")
+@login_required
+@query_budget(1)
+def notifications():
+    items = keyset_paginate(
+        Notification.query.filter(Notification.user_id == current_user().id), [Notification.id], descending=True
+    )
+    return render_template("notifications/list.html", items=items)
+
+
+@bp.route("/notifications/read", methods=["POST"])
+@login_required
+def notifications_read():
+    Notification.query.filter(
+        Notification.user_id == current_user().id, Notification.read_at.is_(None)
+    ).update({"read_at": datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    return redirect(url_for(".notifications"))
+
+
+@bp.cli.command("deadlines-worker")
+def deadlines_worker_command():
+    # web jarayonlari ko'p bo'lsa DEADLINE_SCHEDULER=0 va shu buyruq bitta nusxada
+    scheduler = current_app.extensions["deadlines"]
+    print("Muddatlar rejalashtiruvchisi ishga tushdi (Ctrl+C — to'xtatish)")
+    try:
+        scheduler.run_forever(current_app._get_current_object())
+    except KeyboardInterrupt:
+        scheduler.stop()
+    print(f"Yuborilgan bildirishnomalar: {scheduler.sent}")
+
+
+@bp.cli.command("deadlines-check")
+def deadlines_check_command():
+    # bir martalik (cron): hozir chiqishi kerak bo'lgan eslatmalar
+    scheduler = current_app.extensions["deadlines"]
+    queued = scheduler.refresh()
+    print(f"Navbatda: {queued}, yuborildi: {scheduler.tick()} ta bildirishnoma, kutmoqda: {len(scheduler)}")
+
+
+# ---------- SAHIFA KESHI ----------
+
+@bp.route("/cache/pages")
+@manager_required(fallback=None)
+def page_cache_stats():
+    cache = current_app.extensions.get("page_cache")
+    return jsonify(cache.stats() if cache else {"enabled": False})
+
+
+# ---------- STATIK FAYLLAR ----------
+
+# Deploy: flask --app app vendor-assets (bir marta) && flask --app app assets-build --clean
+@bp.cli.command("assets-build")
+@click.option("--clean", is_flag=True, help="manifestda yo'q eski versiyalarni o'chirish")
+def assets_build_command(clean):
+    manifest, removed = assets.build(current_app.static_folder, clean=clean)
+    compressed = "gzip + brotli" if assets.brotli else "gzip"
+    print(f"Fayllar: {len(manifest)} ta ({compressed}), o'chirildi: {removed} ta")
+
+
+@bp.cli.command("vendor-assets")
+def vendor_assets_command():
+    for rel, sha in assets.vendor(current_app.static_folder).items():
+        print(f"{rel}  sha256={sha}")
+
+
+@bp.cli.command("templates-compile")
+def templates_compile_command():
+    if current_app.jinja_env.bytecode_cache is None:
+        raise click.ClickException("JINJA_BYTECODE_CACHE_DIR o'rnatilmagan")
+    print(f"Kompilyatsiya qilindi: {assets.compile_templates(current_app)} ta shablon")
+
 
 # ---------- MAIN ----------
 
+# modul darajasida app yo'q: gunicorn 'app:create_app()' / FLASK_APP=app:create_app
+# (import ikkinchi nusxa va uning fon oqimlarini yaratmasin)
 if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        upgrade_db(db.engine)
+        seed_admin()
     app.run(debug=True)
@@ -0,0 +1,187 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import urllib.request
+
+from flask import current_app, request, send_from_directory, url_for
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli bo'lmasa faqat .gz yaratiladi
+    brotli = None
+
+
+# CSS/JS/rasmlar `flask assets-build` bilan static/dist/ ga kontent-hash nomi bilan
+# ko'chiriladi (css/app.css -> dist/css/app.3f2a9c1b7d0e.css), yonida .gz/.br.
+# Shablonlar asset_url() orqali murojaat qiladi; nom tarkibga bog'liq bo'lgani uchun
+# brauzer faylni bir yil keshlaydi va qayta so'ramaydi.
+
+ASSET_DIRS = ("css", "js", "vendor", "img")
+DIST_DIR = "dist"
+MANIFEST = "manifest.json"
+IMMUTABLE_PREFIXES = (DIST_DIR + "/", "uploads/")  # uploads ham sha256 bo'yicha nomlangan
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".map", ".txt"}
+MIN_COMPRESS_SIZE = 512
+FAR_FUTURE = 365 * 24 * 3600
+
+# lokal nusxa bo'lmasa (vendor-assets hali ishlatilmagan) — aynan shu versiya CDN'dan
+VENDOR = {
+    "vendor/chart.umd.min.js": "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js",
+}
+
+
+def _digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()[:12]
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _compress(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    written = []
+    variants = [(".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", lambda d: brotli.compress(d, quality=11)))
+    for ext, compress in variants:
+        target = path + ext
+        if not os.path.exists(target):
+            packed = compress(data)
+            if len(packed) >= len(data):
+                continue
+            _write_atomic(target, packed)
+        written.append(target)
+    return written
+
+
+# ---------- BUILD ----------
+
+def build(static_folder, clean=False):
+    dist = os.path.join(static_folder, DIST_DIR)
+    manifest = {}
+    keep = {os.path.join(dist, MANIFEST)}
+    for sub in ASSET_DIRS:
+        for dirpath, _, files in os.walk(os.path.join(static_folder, sub)):
+            for name in sorted(files):
+                src = os.path.join(dirpath, name)
+                rel = os.path.relpath(src, static_folder).replace(os.sep, "/")
+                root, ext = os.path.splitext(rel)
+                out_rel = f"{root}.{_digest(src)}{ext}"
+                out = os.path.join(dist, out_rel)
+                if not os.path.exists(out):
+                    os.makedirs(os.path.dirname(out), exist_ok=True)
+                    shutil.copyfile(src, out)
+                keep.add(out)
+                if ext in COMPRESSIBLE and os.path.getsize(out) >= MIN_COMPRESS_SIZE:
+                    keep.update(_compress(out))
+                manifest[rel] = out_rel
+
+    _write_atomic(os.path.join(dist, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    removed = 0
+    if clean:
+        # eski versiyalar: keshda qolgan HTML ularni so'rashi mumkin — faqat so'ralganda o'chiriladi
+        for dirpath, _, files in os.walk(dist):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                if path not in keep:
+                    os.remove(path)
+                    removed += 1
+    return manifest, removed
+
+
+def vendor(static_folder):
+    fetched = {}
+    for rel, url in VENDOR.items():
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            data = resp.read()
+        _write_atomic(os.path.join(static_folder, rel), data)
+        fetched[rel] = hashlib.sha256(data).hexdigest()
+    return fetched
+
+
+# ---------- RUNTIME ----------
+
+class Assets:
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self.manifest = {}
+        self._digests = {}  # rel -> (mtime, digest); build qilinmagan muhit uchun
+        path = os.path.join(static_folder, DIST_DIR, MANIFEST)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def url(self, rel):
+        if rel in self.manifest:
+            return url_for("static", filename=f"{DIST_DIR}/{self.manifest[rel]}")
+        src = os.path.join(self.static_folder, rel)
+        try:
+            mtime = os.stat(src).st_mtime
+        except FileNotFoundError:
+            return VENDOR.get(rel) or url_for("static", filename=rel)
+        # dev: ?v=hash — fayl o'zgarsa URL ham o'zgaradi
+        cached = self._digests.get(rel)
+        if cached is None or cached[0] != mtime:
+            cached = self._digests[rel] = (mtime, _digest(src))
+        return url_for("static", filename=rel, v=cached[1])
+
+
+def send_static(filename):
+    app = current_app
+    if not (filename.startswith(IMMUTABLE_PREFIXES) or "v" in request.args):
+        return app.send_static_file(filename)
+
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    encoding = None
+    if filename.startswith(DIST_DIR + "/"):
+        for enc, ext in (("br", ".br"), ("gzip", ".gz")):
+            candidate = safe_join(app.static_folder, filename + ext)
+            if request.accept_encodings[enc] and candidate and os.path.isfile(candidate):
+                filename, encoding = filename + ext, enc
+                break
+
+    resp = send_from_directory(app.static_folder, filename, mimetype=mimetype, max_age=FAR_FUTURE)
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    resp.headers["Vary"] = "Accept-Encoding"
+    resp.cache_control.immutable = True
+    resp.cache_control.public = True
+    return resp
+
+
+# ---------- JINJA ----------
+
+def compile_templates(app):
+    # bytecode keshni oldindan to'ldiradi: yangi worker birinchi so'rovda shablon kompilyatsiya qilmaydi
+    env = app.jinja_env
+    names = [n for n in env.list_templates() if n.endswith(".html")]
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def init_app(app):
+    assets = Assets(app.static_folder)
+    app.extensions["assets"] = assets
+    app.add_template_global(assets.url, "asset_url")
+    app.view_functions["static"] = send_static
+
+    cache_dir = app.config.get("JINJA_BYTECODE_CACHE_DIR")
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
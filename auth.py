@@ -0,0 +1,210 @@
+import secrets
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+from functools import wraps
+from threading import Lock
+
+from flask import current_app, g, jsonify, redirect, session, url_for
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session, object_session
+
+from models import db, User, AuthSession
+
+
+# Cookie'da faqat server sessiyasi id'si (sid). Foydalanuvchi id, rol va
+# ko'rinadigan maydonlar AuthSession + User'dan olinadi va jarayon ichidagi
+# LRU keshda saqlanadi; User o'zgarsa yoki o'chirilsa kesh tozalanadi.
+# Boshqa worker'lardagi nusxalar AUTH_CACHE_TTL ichida yangilanadi.
+# Sessiya AUTH_SESSION_TTL'dan keyin eskiradi (expires_at); qatorlarni
+# jobs.py'dagi kunlik prune_auth_sessions vazifasi o'chiradi.
+
+MANAGER_ROLES = frozenset({"admin", "manager"})
+
+Identity = namedtuple("Identity", "id username role full_name photo")
+ANONYMOUS = Identity(None, None, None, None, None)
+
+
+class IdentityCache:
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items = OrderedDict()  # sid -> (muddat, Identity)
+        self._lock = Lock()
+        self.hits = self.misses = 0
+
+    def get(self, sid):
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(sid)
+            if item and item[0] > now:
+                self._items.move_to_end(sid)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+            return None
+
+    def put(self, sid, identity, ttl=None):
+        # ttl — sessiya muddatigacha qolgan vaqt: keshdagi nusxa undan uzoq yashamaydi
+        ttl = self.ttl if ttl is None else min(self.ttl, ttl)
+        with self._lock:
+            self._items[sid] = (time.monotonic() + ttl, identity)
+            self._items.move_to_end(sid)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def drop(self, sid):
+        with self._lock:
+            self._items.pop(sid, None)
+
+    def drop_user(self, user_id):
+        # User o'zgarishi kam bo'ladi — butun keshni aylanib chiqish arzon
+        self.drop_users((user_id,))
+
+    def drop_users(self, user_ids):
+        user_ids = set(user_ids)
+        with self._lock:
+            for sid in [sid for sid, (_, ident) in self._items.items() if ident.id in user_ids]:
+                del self._items[sid]
+
+
+_cache = IdentityCache()
+
+
+def _load_identity(sid):
+    # (Identity, muddatigacha sekund) yoki None
+    now = datetime.utcnow()
+    row = db.session.execute(
+        select(User.id, User.username, User.role, User.full_name, User.photo, AuthSession.expires_at)
+        .join(AuthSession, AuthSession.user_id == User.id)
+        .where(AuthSession.id == sid, AuthSession.expires_at > now)
+    ).first()
+    if row is None:
+        return None
+    return Identity(*row[:-1]), (row.expires_at - now).total_seconds()
+
+
+def current_user():
+    if "user" not in g:
+        g.user = ANONYMOUS
+        sid = session.get("sid")
+        if sid:
+            identity = _cache.get(sid)
+            if identity is None:
+                loaded = _load_identity(sid)
+                if loaded is None:
+                    session.clear()  # bekor qilingan yoki eskirgan sessiya
+                else:
+                    identity, expires_in = loaded
+                    _cache.put(sid, identity, expires_in)
+            g.user = identity or ANONYMOUS
+    return g.user
+
+
+def is_manager():
+    return current_user().role in MANAGER_ROLES
+
+
+def login_user(user):
+    sid = secrets.token_urlsafe(32)
+    expires_at = datetime.utcnow() + timedelta(seconds=current_app.config["AUTH_SESSION_TTL"])
+    db.session.add(AuthSession(id=sid, user_id=user.id, expires_at=expires_at))
+    db.session.commit()
+    session.clear()
+    session["sid"] = sid
+    g.pop("user", None)
+
+
+def logout_user():
+    sid = session.pop("sid", None)
+    if sid:
+        db.session.execute(delete(AuthSession).where(AuthSession.id == sid))
+        db.session.commit()
+        _cache.drop(sid)
+    session.clear()
+    g.pop("user", None)
+
+
+def prune_sessions(now=None):
+    # muddati o'tgan sessiyalar — jadval cheksiz o'smasin (jobs.py, kuniga bir marta)
+    deleted = db.session.execute(
+        delete(AuthSession).where(AuthSession.expires_at <= (now or datetime.utcnow()))
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+# ---------- DEKORATORLAR ----------
+
+def login_required(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if current_user().id is None:
+            return redirect(url_for("main.login"))
+        return f(*args, **kwargs)
+    return wrapper
+
+
+def roles_required(*roles, fallback="main.login"):
+    # rol mos kelmasa fallback endpoint'ga yo'naltiradi; fallback=None — JSON 403
+    allowed = frozenset(roles)
+
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            user = current_user()
+            if user.id is None:
+                return redirect(url_for("main.login"))
+            if user.role not in allowed:
+                if fallback is None:
+                    return jsonify({"error": "ruxsat yo'q"}), 403
+                return redirect(url_for(fallback))
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def manager_required(fallback="main.login"):
+    return roles_required(*MANAGER_ROLES, fallback=fallback)
+
+
+# ---------- INVALIDATSIYA ----------
+
+# flush paytida darhol, commit'dan keyin yana: oraliqda eski qiymat keshga qaytib tushmasin
+def _mark(target):
+    object_session(target).info.setdefault("auth_changed_users", set()).add(target.id)
+    _cache.drop_user(target.id)
+
+
+def forget_users(user_ids):
+    # Core UPDATE'lar (hr_import) uchun: commit'dan keyin chaqiriladi
+    _cache.drop_users(user_ids)
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    _mark(target)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    connection.execute(delete(AuthSession).where(AuthSession.user_id == target.id))
+    _mark(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(sess):
+    for user_id in sess.info.pop("auth_changed_users", ()):
+        _cache.drop_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(sess):
+    sess.info.pop("auth_changed_users", None)
+
+
+def init_app(app):
+    _cache.max_size = app.config["AUTH_CACHE_SIZE"]
+    _cache.ttl = app.config["AUTH_CACHE_TTL"]
+    # shablonlar current_user'ni so'rovsiz oladi (keshdan)
+    app.context_processor(lambda: {"current_user": current_user(), "is_manager": is_manager()})
@@ -0,0 +1,75 @@
+"""Worker sovuq starti: `import app` + `create_app()` vaqti (yangi jarayonda).
+
+"eski" rejim olib tashlangan import-vaqtidagi _init_db'ni takrorlaydi
+(create_all + har bir jadval/indeksni tekshirish + admin so'rovi);
+"yangi" rejimda import bazaga umuman tegmaydi, sxema `flask db-upgrade` bilan.
+
+    python -m benchmarks.cold_start [runs]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import percentile
+
+LEGACY_INIT = """
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+from app import create_app
+from models import db, User
+app = create_app()
+with app.app_context():
+    db.create_all()
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            inspector.get_columns(table.name)  # yangi ustunlarni solishtirish
+            for index in table.indexes:
+                # checkfirst ifodali indeksni ko'rmaydi (migrations._create_index bilan bir xil)
+                conn.execute(CreateIndex(index, if_not_exists=True))
+    User.query.filter_by(username="admin").first()
+"""
+
+MODES = {
+    "eski (import + _init_db)": LEGACY_INIT,
+    "yangi (import + create_app)": "from app import create_app; create_app()",
+}
+
+
+def cold_start_ms(code, env):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    tmp = tempfile.mkdtemp(prefix="af-cold-")
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'cold.db')}",
+        PYTHONPATH=os.getcwd(),
+    )
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "flask", "--app", "app", "db-upgrade"],
+            env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+        # interpretator bazasi (python -c pass) ham ko'rsatiladi
+        baseline = [cold_start_ms("pass", env) for _ in range(runs)]
+        print(f"{'rejim':<28}{'p50 ms':>10}{'p95 ms':>10}{'import ms':>12}")
+        print(f"{'python (bo‘sh)':<28}{percentile(baseline, 50):>10.1f}{percentile(baseline, 95):>10.1f}{'—':>12}")
+        for label, code in MODES.items():
+            cold_start_ms(code, env)  # .pyc keshini isitish
+            samples = [cold_start_ms(code, env) for _ in range(runs)]
+            p50 = percentile(samples, 50)
+            print(f"{label:<28}{p50:>10.1f}{percentile(samples, 95):>10.1f}{p50 - percentile(baseline, 50):>12.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
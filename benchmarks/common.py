@@ -0,0 +1,76 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from flask import Flask
+from sqlalchemy import event
+
+from models import db
+
+
+def make_app(uri="sqlite://", **config):
+    # Benchmarklar uchun alohida, bo'sh baza bilan minimal ilova
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = uri
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config.update(config)
+    db.init_app(app)
+    return app
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def count_queries():
+    with QueryCounter(db.engine) as counter:
+        yield counter
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def measure(fn, runs=200):
+    # bitta chaqiruvdagi so'rovlar soni + latency statistikasi (ms)
+    with count_queries() as counter:
+        fn()
+    queries = counter.count
+
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        "queries": queries,
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "runs": runs,
+    }
+
+
+def print_table(title, results):
+    print(title)
+    print(f"{'variant':<28}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<28}{r['queries']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}")
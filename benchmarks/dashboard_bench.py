@@ -0,0 +1,108 @@
+"""Rahbar paneli ko'rsatkichlari: eski (13 so'rov) va yangi servis.
+
+    python -m benchmarks.dashboard_bench
+"""
+import random
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+
+import dashboard
+from solar_rollup import rebuild_rollups
+from models import db, User, Vehicle, OutsourceCompany, SolarSite, SolarReading, IjroTask
+from benchmarks.common import make_app, measure, print_table
+
+
+def seed(tasks=20000, readings=50000):
+    rnd = random.Random(1)
+    today = date.today()
+    db.session.add_all(User(username=f"u{i}", password="x", role="employee") for i in range(500))
+    db.session.add_all(Vehicle(model="Cobalt", plate_number=f"01A{i:03d}") for i in range(300))
+    db.session.add_all(OutsourceCompany(name=f"Firma {i}") for i in range(100))
+    site = SolarSite(name="Bosh stansiya")
+    db.session.add(site)
+    db.session.flush()
+    db.session.bulk_insert_mappings(IjroTask, [
+        {
+            "title": f"Topshiriq {i}",
+            "date": today - timedelta(days=rnd.randint(0, 365)),
+            "status": rnd.choice(["new", "in_progress", "done"]),
+            # har beshinchi topshiriq bitta "band" xodimga (u0, id=1)
+            "assigned_to_id": 1 if i % 5 == 0 else rnd.randint(2, 500),
+        }
+        for i in range(tasks)
+    ])
+    db.session.bulk_insert_mappings(SolarReading, [
+        {
+            "site_id": site.id,
+            "date": today - timedelta(days=rnd.randint(0, 365)),
+            "energy_kwh": rnd.random() * 50,
+            "created_at": datetime(2024, 1, 1) + timedelta(seconds=i),
+        }
+        for i in range(readings)
+    ])
+    db.session.commit()
+    rebuild_rollups()
+
+
+def legacy_admin_metrics():
+    # admin_dashboard ichidagi avvalgi so'rovlar ketma-ketligi
+    total_employees = User.query.filter_by(role="employee").count()
+    active_tasks = IjroTask.query.filter(IjroTask.status != "done").count()
+    vehicles_count = Vehicle.query.count()
+    outsource_count = OutsourceCompany.query.count()
+    solar_today = db.session.query(func.coalesce(func.sum(SolarReading.energy_kwh), 0)).filter(
+        SolarReading.date == date.today()
+    ).scalar()
+    statuses = [IjroTask.query.filter_by(status=s).count() for s in ["new", "in_progress", "done"]]
+    today = date.today()
+    values = []
+    for i in range(6, -1, -1):
+        d = today - timedelta(days=i)
+        values.append(db.session.query(func.coalesce(func.sum(SolarReading.energy_kwh), 0)).filter(
+            SolarReading.date == d
+        ).scalar())
+    return total_employees, active_tasks, vehicles_count, outsource_count, solar_today, statuses, values
+
+
+def legacy_employee_summary(user_id=1):
+    # employee_dashboard ichidagi avvalgi so'rovlar
+    User.query.get_or_404(user_id)
+    tasks_today = IjroTask.query.filter(
+        IjroTask.assigned_to_id == user_id, IjroTask.date == date.today()
+    ).all()
+    new_tasks = IjroTask.query.filter_by(assigned_to_id=user_id, status="new").count()
+    completed_tasks = IjroTask.query.filter_by(assigned_to_id=user_id, status="done").count()
+    return len(tasks_today), new_tasks, completed_tasks
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        seed()
+
+        results = {"legacy": measure(legacy_admin_metrics)}
+
+        app.config["DASHBOARD_CACHE_TTL"] = 0
+        results["service (no cache)"] = measure(dashboard.admin_metrics)
+
+        app.config["DASHBOARD_CACHE_TTL"] = 30
+        dashboard.invalidate_metrics()
+        dashboard.admin_metrics()
+        results["service (warm cache)"] = measure(dashboard.admin_metrics)
+
+        employee = {"legacy": measure(legacy_employee_summary)}
+        app.config["DASHBOARD_CACHE_TTL"] = 0
+        employee["service (no cache)"] = measure(lambda: dashboard.employee_summary(1))
+        app.config["DASHBOARD_CACHE_TTL"] = 30
+        dashboard.employee_summary(1)
+        employee["service (warm cache)"] = measure(lambda: dashboard.employee_summary(1))
+
+    print_table("admin_dashboard metrics", results)
+    print()
+    print_table("employee_dashboard (4000 topshiriqli xodim)", employee)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Sintetik ma'lumotlar: models.py'dagi har bir jadvalni real hajmda to'ldiradi.
+
+Standart hajm (--scale 1): 10k xodim, 1M solar o'lchov, 200k ijro topshirig'i,
+3k avtomobil, 5k orgtexnika, 200k yoqilg'i tranzaksiyasi. Bir xil --seed bilan natija bir xil.
+
+    python -m benchmarks.datagen /tmp/af-bench.db [--scale 0.1] [--seed 1]
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from models import (
+    db, User, HRDocument, Organization, Vehicle, FuelLog, OrgTech, OrgTechEvent, OutsourceCompany,
+    SolarSite, SolarReading, IjroTask,
+)
+from passwords import hash_password
+
+VOLUMES = {
+    "users": 10_000,
+    "hr_documents": 20_000,
+    "organizations": 200,
+    "vehicles": 3_000,
+    "fuel_logs": 200_000,
+    "orgtech": 5_000,
+    "outsource": 500,
+    "solar_sites": 50,
+    "solar_readings": 1_000_000,
+    "tasks": 200_000,
+}
+BATCH = 10_000
+READING_STEP = timedelta(minutes=15)
+
+FIRST = ["Aziz", "Dilnoza", "Jasur", "Malika", "Sardor", "Nigora", "Bekzod", "Gulnora", "Otabek", "Shahlo"]
+LAST = ["Karimov", "Yusupova", "Rahimov", "Toshpulatova", "Aliyev", "Nazarova", "Ergashev", "Saidova"]
+POSITIONS = ["Mutaxassis", "Bosh mutaxassis", "Bo'lim boshlig'i", "Haydovchi", "Hisobchi", "Dasturchi"]
+CAR_MODELS = ["Cobalt", "Nexia 3", "Malibu", "Damas", "Lacetti", "Tracker"]
+TECH = [("Printer", "HP LaserJet"), ("Kompyuter", "Dell OptiPlex"), ("Monitor", "Samsung 24"), ("Skaner", "Canon")]
+TASK_WORDS = ["hisobot", "xat", "buyruq", "so'rovnoma", "shartnoma", "reja", "ma'lumotnoma", "dalolatnoma"]
+
+
+def _insert(model, rows):
+    rows = list(rows)
+    for start in range(0, len(rows), BATCH):
+        db.session.execute(insert(model), rows[start:start + BATCH])
+    return len(rows)
+
+
+def _person(rnd):
+    return f"{rnd.choice(LAST)} {rnd.choice(FIRST)}"
+
+
+def generate(scale=1.0, seed=1):
+    rnd = random.Random(seed)
+    n = {k: max(1, int(v * scale)) for k, v in VOLUMES.items()}
+    today = date.today()
+    counts = {}
+
+    managers = max(1, n["users"] // 100)
+    password = hash_password("secret")  # hammasi bir xil — 10k marta scrypt shart emas
+    counts["users"] = _insert(User, (
+        {
+            "username": f"user{i:05d}",
+            "password": password,
+            "role": "manager" if i < managers else "employee",
+            "full_name": _person(rnd),
+            "position": rnd.choice(POSITIONS),
+            "phone": f"+99890{rnd.randint(1000000, 9999999)}",
+            "passport_series": rnd.choice(["AA", "AB", "AC"]),
+            "passport_number": f"{rnd.randint(1000000, 9999999)}",
+        }
+        for i in range(n["users"])
+    ))
+    # admin (seed-admin) birinchi — xodimlar id'lari 2 dan boshlanadi
+    user_ids = range(2, n["users"] + 2)
+
+    counts["hr_documents"] = _insert(HRDocument, (
+        {"filename": f"{i:02x}/doc{i}.pdf", "original_name": f"hujjat_{i}.pdf", "user_id": rnd.choice(user_ids)}
+        for i in range(n["hr_documents"])
+    ))
+    counts["organizations"] = _insert(Organization, (
+        {
+            "name": f"Tashkilot {i}",
+            "employee_count": rnd.randint(5, 500),
+            "address": f"Toshkent, {rnd.randint(1, 120)}-uy",
+            "floor": str(rnd.randint(1, 9)),
+        }
+        for i in range(n["organizations"])
+    ))
+    counts["vehicles"] = _insert(Vehicle, (
+        {
+            "model": rnd.choice(CAR_MODELS),
+            "plate_number": f"01{chr(65 + i % 26)}{i:03d}{chr(65 + i // 26 % 26)}{chr(65 + i // 676 % 26)}",
+            "driver_full_name": _person(rnd),
+            "monthly_fuel_limit": rnd.choice([200, 300, 400, 500]),
+            "organization_id": rnd.randint(1, n["organizations"]),
+        }
+        for i in range(n["vehicles"])
+    ))
+    # har bir transportda oxirgi ~6 oy ichida, vaqt bo'yicha o'suvchi quyishlar
+    per_vehicle = n["fuel_logs"] // n["vehicles"]
+    fuel_start = datetime.combine(today, datetime.min.time()) - timedelta(days=180)
+    counts["fuel_logs"] = _insert(FuelLog, (
+        {
+            "vehicle_id": vehicle_id,
+            "filled_at": fuel_start + timedelta(hours=k * 180 * 24 // per_vehicle, minutes=rnd.randint(0, 59)),
+            "liters": (liters := round(rnd.uniform(15, 60), 1)),
+            "amount": round(liters * 11_000, 2),
+            "station": f"AYOQSH #{rnd.randint(1, 80)}",
+            "card_number": f"8600{vehicle_id:012d}",
+        }
+        for vehicle_id in range(1, n["vehicles"] + 1)
+        for k in range(per_vehicle)
+    ))
+    # orgtexnika tarixi: oxirgi yil ichida qo'shilgan, bir necha holat o'zgarishi;
+    # oxirgi yozuvdagi holat OrgTech.status bilan bir xil
+    tech_rows, tech_events = [], []
+    history_start = datetime.combine(today, datetime.min.time()) - timedelta(days=365)
+    for item_id in range(1, n["orgtech"] + 1):
+        name, model = rnd.choice(TECH)
+        ts = history_start + timedelta(minutes=rnd.randint(0, 200 * 24 * 60))
+        status, user_id = "new", rnd.choice(user_ids)
+        tech_events.append({"item_id": item_id, "ts": ts, "kind": "created", "to_status": status, "to_user_id": user_id})
+        for _ in range(rnd.randint(0, 6)):
+            ts += timedelta(minutes=rnd.randint(60, 40 * 24 * 60))
+            if ts.date() >= today:
+                break
+            new_status = rnd.choice([s for s in ("working", "working", "repair", "broken") if s != status])
+            tech_events.append({
+                "item_id": item_id, "ts": ts, "kind": "status", "from_status": status, "to_status": new_status,
+                "from_user_id": user_id, "to_user_id": user_id,
+            })
+            status = new_status
+        tech_rows.append({
+            "name": name,
+            "model": model,
+            "serial_number": f"SN{item_id:08d}",
+            "status": status,
+            "assigned_to_id": user_id,
+            "last_update": ts,
+        })
+    counts["orgtech"] = _insert(OrgTech, tech_rows)
+    counts["orgtech_events"] = _insert(OrgTechEvent, tech_events)
+    counts["outsource"] = _insert(OutsourceCompany, (
+        {
+            "name": f"Servis {i} MChJ",
+            "service_type": rnd.choice(["Tozalash", "Qo'riqlash", "IT xizmat", "Oshxona"]),
+            "contract_number": f"SH-{i:04d}",
+            "contract_date": (d := today - timedelta(days=rnd.randint(0, 1000))),
+            "contract_end_date": d + timedelta(days=rnd.choice([365, 730, 1095])),
+            "contract_amount": round(rnd.uniform(1e6, 5e8), 2),
+        }
+        for i in range(n["outsource"])
+    ))
+    counts["solar_sites"] = _insert(SolarSite, (
+        {"name": f"Stansiya {i}", "location": f"Hudud {i % 12}", "capacity_kw": rnd.choice([50, 100, 250, 500])}
+        for i in range(n["solar_sites"])
+    ))
+
+    # har bir stansiyada 15 daqiqalik qadam bilan, bugungi kungacha
+    per_site = n["solar_readings"] // n["solar_sites"]
+    start = datetime.combine(today, datetime.min.time()) - READING_STEP * per_site
+    counts["solar_readings"] = 0
+    for site_id in range(1, n["solar_sites"] + 1):
+        counts["solar_readings"] += _insert(SolarReading, (
+            {
+                "site_id": site_id,
+                "created_at": start + READING_STEP * k,
+                "date": (start + READING_STEP * k).date(),
+                "energy_kwh": round(rnd.random() * 5, 3),
+            }
+            for k in range(per_site)
+        ))
+
+    statuses = ["new", "in_progress", "done", "done", "rejected"]
+    counts["tasks"] = _insert(IjroTask, (
+        {
+            "title": f"{rnd.choice(TASK_WORDS).capitalize()} #{i}",
+            "description": " ".join(rnd.choices(TASK_WORDS, k=8)),
+            "date": (d := today - timedelta(days=rnd.randint(-30, 365))),
+            "due_date": d + timedelta(days=rnd.randint(1, 30)),
+            "status": rnd.choice(statuses),
+            "assigned_to_id": rnd.choice(user_ids),
+            "updated_at": datetime.combine(d, datetime.min.time()),
+        }
+        for i in range(n["tasks"])
+    ))
+    db.session.commit()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="SQLite fayl (mavjud bo'lsa qayta yaratiladi)")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    from app import create_app
+    from migrations import upgrade, seed_admin
+    from fuel import rebuild_totals as rebuild_fuel_totals
+    from orgtech_history import rebuild_snapshots
+    from outsourcing_analytics import rebuild_summary
+    from search import rebuild_index
+    from solar_rollup import rebuild_rollups
+
+    path = os.path.abspath(args.path)
+    for stale in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    app = create_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}")
+    with app.app_context():
+        upgrade(db.engine)
+        seed_admin()
+        t0 = time.perf_counter()
+        # Core insert mapper hodisalarini chetlab o'tadi — yig'indilar va indeks oxirida quriladi
+        counts = generate(args.scale, args.seed)
+        rollup_days = rebuild_rollups()
+        summary_rows = rebuild_summary()
+        fuel_rows = rebuild_fuel_totals()
+        snapshot_days = rebuild_snapshots()
+        indexed = rebuild_index()
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+    for name, count in counts.items():
+        print(f"{name:<16}{count:>10}")
+    print(f"{'rollup kunlari':<16}{rollup_days:>10}")
+    print(f"{'outsorsing yig.':<16}{summary_rows:>10}")
+    print(f"{'yoqilgi oylari':<16}{fuel_rows:>10}")
+    print(f"{'orgtex. kunlari':<16}{snapshot_days:>10}")
+    print(f"{'qidiruv indeksi':<16}{indexed:>10}")
+    print(f"{time.perf_counter() - t0:.1f} s, {os.path.getsize(path) / 1e6:.0f} MB -> {path}")
+
+
+if __name__ == "__main__":
+    main()
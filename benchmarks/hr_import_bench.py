@@ -0,0 +1,99 @@
+"""HR CSV importi (hr_import.py): 50k qatorli fayl uchun tekshiruv (dry-run),
+yozish, qayta import (hammasi o'zgarishsiz) va yangilash vaqti hamda xotira cho'qqisi.
+
+Mavjud xodimlarning lavozim/telefoni o'zgartiriladi, qolgan qatorlar — yangi
+xodimlar (parol bilan); oxirida hamma qatorlarda lavozim o'zgargan fayl.
+Parol xeshi narxi login_bench'da o'lchanadi; bu yerda import'ning o'zini
+ko'rish uchun standart --password-method arzon.
+
+Avval baza: python -m benchmarks.datagen /tmp/af-bench.db --scale 0.2
+
+    python -m benchmarks.hr_import_bench /tmp/af-bench.db [--rows 50000] [--chunk-size 2000]
+        [--password-method pbkdf2:sha256:1000]
+"""
+import argparse
+import csv
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import func, select
+
+from models import db, User
+from migrations import upgrade as upgrade_db
+import hr_import
+
+
+def write_csv(path, usernames, rows, position="Mutaxassis"):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "password", "full_name", "position", "phone",
+                         "passport_series", "passport_number", "birth_date", "diploma_year"])
+        for i in range(rows):
+            if i < len(usernames):
+                writer.writerow([usernames[i], "", "", "Bosh " + position.lower(), f"+99890{i:07d}", "", "", "", ""])
+            else:
+                writer.writerow([f"imp{i:06d}", "secret", f"Import Xodim {i}", position, f"+99891{i:07d}",
+                                 "ZZ", f"{i:07d}", "1990-01-15", "2012"])
+
+
+def timed(path, chunk_size, dry_run):
+    t0 = time.perf_counter()
+    report = hr_import.import_users(path, dry_run=dry_run, chunk_size=chunk_size)
+    return time.perf_counter() - t0, report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("db_path")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=hr_import.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--password-method", default="pbkdf2:sha256:1000")
+    args = parser.parse_args()
+
+    from app import create_app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "hr.db")
+        shutil.copyfile(args.db_path, db_path)
+        app = create_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}", PASSWORD_METHOD=args.password_method)
+        with app.app_context():
+            upgrade_db(db.engine)  # eski nusxada ham pasport indeksi bo'lsin
+            usernames = db.session.scalars(
+                select(User.username).where(User.role == "employee").order_by(User.id)
+            ).all()
+            csv_path = os.path.join(tmp, "hr.csv")
+            write_csv(csv_path, usernames, args.rows)
+            size_mb = os.path.getsize(csv_path) / 2**20
+            print(f"{args.rows} qator ({size_mb:.1f} MB): {min(len(usernames), args.rows)} yangilanadi, "
+                  f"{max(0, args.rows - len(usernames))} yangi; parol: {args.password_method}")
+
+            tracemalloc.start()
+            hr_import.import_users(csv_path, dry_run=True, chunk_size=args.chunk_size)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+            print(f"{'bosqich':<28}{'s':>8}{'qator/s':>10}{'yangi':>8}{'yangilandi':>12}{'o‘zgarishsiz':>13}")
+            update_path = os.path.join(tmp, "hr-update.csv")
+            write_csv(update_path, usernames, args.rows, position="Yetakchi mutaxassis")
+            phases = (
+                ("tekshiruv (dry-run)", csv_path, True),
+                ("import", csv_path, False),
+                ("qayta import", csv_path, False),
+                ("hammasini yangilash", update_path, False),
+            )
+            for label, path, dry_run in phases:
+                elapsed, r = timed(path, args.chunk_size, dry_run)
+                print(f"{label:<28}{elapsed:>8.2f}{args.rows / elapsed:>10.0f}{r.inserted:>8}"
+                      f"{r.updated:>12}{r.unchanged:>13}")
+                if r.invalid:
+                    print(f"  xatolar: {r.invalid} — {r.errors[:3]}")
+            total = db.session.scalar(select(func.count()).select_from(User))
+            print(f"Xotira cho'qqisi (dry-run, tracemalloc): {peak:.1f} MB; jami xodimlar: {total}")
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
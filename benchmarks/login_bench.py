@@ -0,0 +1,188 @@
+"""Kirish (POST /login) o'tkazuvchanligi: gunicorn sync worker'lari soni va
+parol xeshi narxi (PASSWORD_METHOD) bo'yicha — narxni ma'lumotga qarab tanlash uchun.
+
+Baza nusxasida har bir usul uchun parollar oldindan shu usulda xeshlanadi
+(o'lchov paytida qayta xeshlash yozuvlari bo'lmaydi), `gunicorn -w N` ishga
+tushiriladi va --concurrency ta parallel klient --seconds davomida turli
+xodimlar nomidan /login'ga POST yuboradi.
+
+Avval baza: python -m benchmarks.datagen /tmp/af-bench.db --scale 0.05
+
+    python -m benchmarks.login_bench /tmp/af-bench.db [--workers 1,2,4] [--concurrency 32]
+        [--seconds 10] [--methods pbkdf2:sha256:600000,scrypt:32768:8:1] [--out login.json]
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+from sqlalchemy import select, update
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from benchmarks.common import percentile
+from models import db, User
+
+METHODS = [
+    "pbkdf2:sha256:260000",
+    "pbkdf2:sha256:600000",
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+    "scrypt:65536:8:1",
+]
+PASSWORD = "secret"
+SAMPLE_USERS = 500
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def hash_ms(method, runs=5):
+    stored = generate_password_hash(PASSWORD, method=method)
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        check_password_hash(stored, PASSWORD)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return percentile(timings, 50)
+
+
+def prepare(db_path, method):
+    # bitta xesh hamma uchun: maqsad — kirishdagi tekshiruv narxi, xeshlash emas
+    from app import create_app
+
+    app = create_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}")
+    with app.app_context():
+        db.session.execute(update(User).values(password=generate_password_hash(PASSWORD, method=method)))
+        usernames = db.session.scalars(
+            select(User.username).where(User.role == "employee").order_by(User.id).limit(SAMPLE_USERS)
+        ).all()
+        db.session.commit()
+        db.engine.dispose()
+    return usernames
+
+
+def start_server(db_path, method, workers, tmp):
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        PASSWORD_METHOD=method,
+        SOLAR_POLL_INTERVAL="0",
+        JOB_WORKER_THREADS="0",
+        DEADLINE_SCHEDULER="0",
+        JINJA_BYTECODE_CACHE_DIR=os.path.join(tmp, "jinja"),
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}",
+         "--log-level", "warning", "app:app"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/login")
+            conn.getresponse().read()
+            return proc, port
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("gunicorn ishga tushmadi")
+
+
+def load(port, usernames, concurrency, seconds):
+    timings, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(offset):
+        i = offset
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            body = urlencode({"username": usernames[i % len(usernames)], "password": PASSWORD})
+            t0 = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                conn.request("POST", "/login", body, {"Content-Type": "application/x-www-form-urlencoded"})
+                resp = conn.getresponse()
+                resp.read()
+                conn.close()
+                if resp.status != 302:
+                    failed += 1
+            except OSError:
+                failed += 1
+            local.append((time.perf_counter() - t0) * 1000)
+            i += concurrency
+        with lock:
+            timings.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(k,)) for k in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    return {
+        "logins_per_s": round((len(timings) - errors[0]) / elapsed, 1),
+        "p50_ms": round(percentile(timings, 50), 1),
+        "p95_ms": round(percentile(timings, 95), 1),
+        "errors": errors[0],
+        "requests": len(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("db_path")
+    parser.add_argument("--workers", default="1,2,4", help="vergul bilan: gunicorn -w qiymatlari")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--methods", default=",".join(METHODS))
+    parser.add_argument("--out")
+    args = parser.parse_args()
+
+    workers = [int(w) for w in args.workers.split(",")]
+    methods = [m for m in args.methods.split(",") if m]
+    print(f"CPU: {os.cpu_count()}, parallel klientlar: {args.concurrency}, {args.seconds:.0f} s")
+    print(f"{'usul':<24}{'xesh ms':>9}{'-w':>4}{'kirish/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'xato':>6}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "login.db")
+        shutil.copyfile(args.db_path, db_path)
+        for method in methods:
+            usernames = prepare(db_path, method)
+            single = hash_ms(method)
+            for n in workers:
+                proc, port = start_server(db_path, method, n, tmp)
+                try:
+                    r = load(port, usernames, args.concurrency, args.seconds)
+                finally:
+                    proc.terminate()
+                    proc.wait()
+                r.update(method=method, workers=n, hash_ms=round(single, 1))
+                results.append(r)
+                print(f"{method:<24}{single:>9.1f}{n:>4}{r['logins_per_s']:>10.1f}"
+                      f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['errors']:>6}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"cpu": os.cpu_count(), "concurrency": args.concurrency, "results": results}, f, indent=2)
+        print(f"Yozildi: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
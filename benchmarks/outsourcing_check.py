@@ -0,0 +1,81 @@
+"""Outsorsing yig'indilari tekshiruvi: ORM orqali yaratish/tahrirlash/o'chirishdan
+keyin inkremental OutsourceSummary rebuild_summary() natijasi bilan aynan
+bir xilmi (bo'sh va NULL xizmat turi, sanasiz shartnomalar bilan).
+
+    python -m benchmarks.outsourcing_check
+"""
+import sys
+from datetime import date
+
+from sqlalchemy import select
+
+from models import db, OutsourceCompany, OutsourceSummary
+from outsourcing_analytics import rebuild_summary
+from benchmarks.common import make_app
+
+COMPANIES = [
+    # (name, service_type, contract_date, amount)
+    ("Toza Servis", "Tozalash", date(2024, 1, 15), 1200.0),
+    ("Bo'sh xizmat", "", date(2024, 2, 1), 500.0),       # forma bo'sh maydonni "" yuboradi
+    ("Xizmatsiz", None, date(2024, 4, 10), 300.0),
+    ("Sanasiz", "Qo'riqlash", None, 800.0),
+    ("Bo'sh, sanasiz", "", None, None),
+    ("Oshxona", "Ovqatlanish", date(2024, 5, 20), 2500.0),
+]
+
+
+def summary():
+    # inkremental yo'l nol qatorlarni qoldiradi — ular solishtirilmaydi
+    rows = db.session.execute(
+        select(OutsourceSummary.dimension, OutsourceSummary.bucket,
+               OutsourceSummary.contracts, OutsourceSummary.total_amount)
+    )
+    return {
+        (dim, bucket): (n, round(total or 0.0, 6))
+        for dim, bucket, n, total in rows
+        if n or total
+    }
+
+
+def scenario():
+    companies = [
+        OutsourceCompany(name=name, service_type=service, contract_date=d, contract_amount=amount)
+        for name, service, d, amount in COMPANIES
+    ]
+    db.session.add_all(companies)
+    db.session.commit()
+    yield "yaratish"
+
+    rebuild_summary()
+    companies[0].service_type = ""                 # to'ldirilgandan bo'shga
+    companies[2].service_type = "Tozalash"         # NULL'dan to'ldirilganga
+    companies[3].contract_date = date(2024, 3, 3)
+    db.session.commit()
+    yield "rebuild'dan keyin tahrirlash"
+
+    db.session.delete(companies[1])
+    db.session.delete(companies[4])
+    db.session.commit()
+    yield "o'chirish"
+
+
+def main():
+    app = make_app()
+    problems = []
+    with app.app_context():
+        db.create_all()
+        for step in scenario():
+            incremental = summary()
+            rebuild_summary()
+            rebuilt = summary()
+            if incremental != rebuilt:
+                diff = sorted(set(incremental.items()) ^ set(rebuilt.items()))
+                problems.append(f"{step}: inkremental != rebuild: {diff}")
+    print(f"{len(COMPANIES)} ta shartnoma: {len(problems)} muammo")
+    for problem in problems:
+        print(f"  {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Detal sahifalari keshi (page_cache.py): har bir sahifa uchun keshsiz render,
+kesh bo'sh (miss), bloklar keshdan (hit) va If-None-Match → 304 kechikishi.
+
+Avval baza: python -m benchmarks.datagen /tmp/af-bench.db --scale 0.2
+
+    python -m benchmarks.page_cache_bench /tmp/af-bench.db [--requests 200]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import select
+
+from models import db, Vehicle, Organization, OutsourceCompany, OrgTech, SolarSite, User
+from migrations import upgrade as upgrade_db
+
+
+def pages():
+    first = lambda column, *where: db.session.scalar(select(column).where(*where).order_by(column))
+    return {
+        "vehicle": f"/vehicles/{first(Vehicle.id)}",
+        "organization": f"/organizations/{first(Organization.id)}",
+        "outsource": f"/outsourcing/{first(OutsourceCompany.id)}",
+        "orgtech": f"/orgtech/{first(OrgTech.id)}",
+        "solar_site": f"/solar/{first(SolarSite.id)}",
+        "user": f"/hr/profile/{first(User.id, User.role == 'employee')}",
+    }
+
+
+def client(app):
+    c = app.test_client()
+    c.post("/login", data={"username": "admin", "password": "admin"})
+    return c
+
+
+def measure(fn, n):
+    times = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("db_path")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    from app import create_app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "pages.db")
+        shutil.copyfile(args.db_path, db_path)
+        uri = f"sqlite:///{db_path}"
+        cached = create_app(SQLALCHEMY_DATABASE_URI=uri)
+        plain = create_app(SQLALCHEMY_DATABASE_URI=uri, PAGE_CACHE_BYTES=0)
+        with cached.app_context():
+            upgrade_db(db.engine)
+            urls = pages()
+
+        c, p = client(cached), client(plain)
+        cache = cached.extensions["page_cache"]
+        n = args.requests
+        print(f"{'sahifa':<14}{'KB':>7}{'keshsiz ms':>12}{'miss ms':>10}{'hit ms':>9}{'304 ms':>9}")
+        for kind, url in urls.items():
+            size = len(p.get(url).data) / 1024
+            no_cache = measure(lambda: p.get(url), n)
+
+            def miss():
+                cache.clear()
+                c.get(url)
+
+            miss_ms = measure(miss, n)
+            etag = c.get(url).headers["ETag"]
+            hit_ms = measure(lambda: c.get(url), n)
+            nm_ms = measure(lambda: c.get(url, headers={"If-None-Match": etag}), n)
+            print(f"{kind:<14}{size:>7.1f}{no_cache:>12.2f}{miss_ms:>10.2f}{hit_ms:>9.2f}{nm_ms:>9.2f}")
+        print(cache.stats())
+        with cached.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Keyset pagination: 100k qatorli jadvallarda birinchi, o'rta va oxirgi sahifa.
+
+    python -m benchmarks.pagination_bench
+"""
+from datetime import date, timedelta
+
+from models import db, Vehicle, IjroTask, User
+from pagination import keyset_paginate, encode_cursor
+from benchmarks.common import make_app, measure, print_table
+
+ROWS = 100_000
+
+
+def seed():
+    today = date.today()
+    db.session.bulk_insert_mappings(Vehicle, [
+        {"model": "Cobalt", "plate_number": f"01A{i:06d}"} for i in range(ROWS)
+    ])
+    db.session.bulk_insert_mappings(User, [
+        {"username": f"u{i}", "password": "x", "role": "employee" if i % 10 else "manager"}
+        for i in range(ROWS)
+    ])
+    db.session.bulk_insert_mappings(IjroTask, [
+        {"title": f"Topshiriq {i}", "date": None if i % 100 == 0 else today - timedelta(days=i % 1000), "status": "new"}
+        for i in range(ROWS)
+    ])
+    db.session.commit()
+
+
+def page_fn(app, query_factory, keys, after=None):
+    qs = {"after": after} if after else {}
+
+    def run():
+        with app.test_request_context(query_string=qs):
+            return keyset_paginate(query_factory(), keys).items
+    return run
+
+
+def legacy_fn(query_factory):
+    return lambda: query_factory().all()
+
+
+def main():
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        seed()
+
+        results = {}
+        cases = [
+            ("vehicles", lambda: Vehicle.query, [Vehicle.id]),
+            ("hr", lambda: User.query.filter(User.role == "employee"), [User.id]),
+            ("ijro", lambda: IjroTask.query, [IjroTask.date, IjroTask.id]),
+        ]
+        for name, qf, keys in cases:
+            results[f"{name} .all() (eski)"] = measure(legacy_fn(qf), runs=5)
+            ordered = qf().order_by(*keys)
+            total = qf().count()
+            for label, offset in (("1-sahifa", None), ("o'rta", total // 2), ("oxirgi", total - 30)):
+                after = None
+                if offset is not None:
+                    row = ordered.offset(offset).limit(1).first()
+                    after = encode_cursor([getattr(row, k.key) for k in keys])
+                results[f"{name} {label}"] = measure(page_fn(app, qf, keys, after), runs=100)
+
+    print_table(f"keyset pagination, {ROWS} qator", results)
+
+
+if __name__ == "__main__":
+    main()
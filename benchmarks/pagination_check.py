@@ -0,0 +1,89 @@
+"""Keyset pagination tekshiruvi: NULL sanali qatorlar bilan ham har bir sahifa
+"Keyingi"/"Oldingi" orqali to'liq, takrorsiz va to'g'ri tartibda o'tiladimi,
+hamda ijro_list so'rovi ifodali indeks bo'yicha diapazon qidiruvini ishlatadimi.
+
+    python -m benchmarks.pagination_check
+"""
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from models import db, IjroTask
+from pagination import NULL_DATE, keyset_paginate, _seek, _sort_key
+from benchmarks.common import make_app
+
+DATED = 30
+UNDATED = 30
+PER_PAGE = 7
+
+
+def seed():
+    start = date(2024, 1, 1)
+    rows = [{"title": f"Sanali {i}", "date": start + timedelta(days=i % 9), "status": "new"} for i in range(DATED)]
+    rows += [{"title": f"Sanasiz {i}", "date": None, "status": "new"} for i in range(UNDATED)]
+    rows.sort(key=lambda r: r["title"][-1])  # id'lar sana tartibida emas
+    db.session.bulk_insert_mappings(IjroTask, rows)
+    db.session.commit()
+
+
+def walk(app, keys, descending, direction, start=None):
+    # sahifalar ketma-ketligi: direction = "after" (oldinga) yoki "before" (orqaga)
+    pages, cursor = [], start
+    for _ in range((DATED + UNDATED) // PER_PAGE + 3):
+        qs = {"per_page": PER_PAGE}
+        if cursor:
+            qs[direction] = cursor
+        with app.test_request_context(query_string=qs):
+            page = keyset_paginate(IjroTask.query, keys, descending=descending)
+        pages.append([t.id for t in page])
+        cursor = page.next_cursor if direction == "after" else page.prev_cursor
+        if cursor is None:
+            return pages, page
+    raise AssertionError(f"{direction}: kursor to'xtamadi")
+
+
+def check(app, descending):
+    keys = [IjroTask.date, IjroTask.id]
+    expected = [
+        t.id for t in sorted(IjroTask.query.all(), key=lambda t: (t.date or NULL_DATE, t.id), reverse=descending)
+    ]
+    problems = []
+    pages, last = walk(app, keys, descending, "after")
+    seen = [i for p in pages for i in p]
+    if seen != expected:
+        problems.append(f"oldinga: {len(seen)} ta id, kutilgan {len(expected)} (tartib yoki takror)")
+    # oxirgi sahifadan orqaga — oldingi sahifalar aynan qaytishi kerak
+    back, _ = walk(app, keys, descending, "before", start=last.prev_cursor)
+    if [i for p in reversed(back) for i in p] + pages[-1] != expected:
+        problems.append("orqaga: sahifalar mos kelmadi")
+    return problems
+
+
+def plan_problems():
+    keys = [_sort_key(IjroTask.date), _sort_key(IjroTask.id)]
+    stmt = IjroTask.query.filter(_seek(keys, [date(2024, 1, 5), 10])).order_by(*keys).limit(PER_PAGE + 1).statement
+    sql = str(stmt.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    plan = " ".join(row[-1] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + sql)))
+    if "SEARCH ijro_task USING INDEX ix_ijro_task_date_key" not in plan:
+        return [f"ijro_list rejasi: {plan}"]
+    return []
+
+
+def main():
+    app = make_app()
+    problems = []
+    with app.app_context():
+        db.create_all()
+        seed()
+        for descending in (False, True):
+            problems += [f"descending={descending}: {p}" for p in check(app, descending)]
+        problems += plan_problems()
+    print(f"{DATED} sanali + {UNDATED} sanasiz topshiriq, {PER_PAGE} tadan: {len(problems)} muammo")
+    for problem in problems:
+        print(f"  {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Parol xeshi tekshiruvi: PASSWORD_METHOD qisqa ("scrypt", "pbkdf2") yoki to'liq
+yozilganda ham joriy xesh bilan kirish user qatorini qayta yozmaydi; eskirgan
+usul yoki ochiq matnli parol esa birinchi kirishda yangilanadi.
+
+    python -m benchmarks.password_check
+"""
+import os
+import sys
+import tempfile
+
+from sqlalchemy import event, select
+from werkzeug.security import generate_password_hash
+
+from models import db, User
+
+# (PASSWORD_METHOD, boshqa usul — qayta xeshlanishi kerak); pbkdf2 narxi tekshiruv uchun past
+METHODS = [
+    ("scrypt", "pbkdf2:sha256:1000"),
+    ("scrypt:32768:8:1", "scrypt:16384:8:1"),
+    ("pbkdf2", "scrypt"),
+    ("pbkdf2:sha256:1000", "pbkdf2:sha256:2000"),
+]
+PASSWORD = "secret"
+
+
+def _login_writes(app, client, username):
+    # kirish paytida user jadvaliga nechta UPDATE ketdi
+    writes = []
+
+    def on_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith(('UPDATE "USER"', "UPDATE USER ")):
+            writes.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        resp = client.post("/login", data={"username": username, "password": PASSWORD})
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    client.get("/logout")
+    return resp.status_code, len(writes)
+
+
+def check(tmp, method, other):
+    from app import create_app
+    from migrations import upgrade
+
+    app = create_app(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(tmp, method.replace(':', '_'))}.db",
+        PASSWORD_METHOD=method, JOB_WORKER_THREADS=0,
+    )
+    problems = []
+    with app.app_context():
+        upgrade(db.engine)
+        hasher = app.extensions["passwords"]
+        db.session.add_all([
+            User(username="current", password=hasher.hash(PASSWORD), role="employee"),
+            User(username="other", password=generate_password_hash(PASSWORD, method=other), role="employee"),
+            User(username="plain", password=PASSWORD, role="employee"),
+        ])
+        db.session.commit()
+
+    client = app.test_client()
+    for username, expected in (("current", 0), ("other", 1), ("plain", 1)):
+        status, writes = _login_writes(app, client, username)
+        if status != 302:
+            problems.append(f"{method}: {username} kira olmadi (HTTP {status})")
+        elif writes != expected:
+            problems.append(f"{method}: {username} kirishida {writes} ta UPDATE (kutilgan {expected})")
+        # qayta xeshlangandan keyin ikkinchi kirish ham yozmasligi kerak
+        status, writes = _login_writes(app, client, username)
+        if writes:
+            problems.append(f"{method}: {username} ikkinchi kirishida ham {writes} ta UPDATE")
+    with app.app_context():
+        stored = db.session.scalar(select(User.password).where(User.username == "other"))
+        db.engine.dispose()
+    if hasher.needs_rehash(stored):
+        problems.append(f"{method}: qayta xeshlangan parol hali ham eskirgan deb topiladi")
+    return problems
+
+
+def main():
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for method, other in METHODS:
+            problems += check(tmp, method, other)
+    print(f"{len(METHODS)} ta PASSWORD_METHOD: {len(problems)} muammo")
+    for problem in problems:
+        print(f"  {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Solar poller: lokal stub HTTP server'dagi 500 ta stansiya.
+
+    python -m benchmarks.poller_bench
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from models import db, SolarSite
+from solar_poller import SolarPoller
+from benchmarks.common import make_app
+
+SITES = 500
+MAX_DELAY = 0.5
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubHandler.lock:
+            StubHandler.connections += 1
+
+    def do_GET(self):
+        site = int(self.path.rsplit("/", 1)[-1])
+        time.sleep(random.Random(site).random() * MAX_DELAY)
+        if site % 50 == 0:
+            body = b"xato"
+            self.send_response(500)
+        else:
+            body = json.dumps({"power_kw": site / 10, "energy_today_kwh": site}).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    request_queue_size = 1024  # 500 ta bir vaqtdagi connect uchun
+
+
+def main():
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            SolarSite(name=f"Stansiya {i}", external_url=f"{base}/site/{i}") for i in range(1, SITES + 1)
+        )
+        db.session.commit()
+
+        poller = SolarPoller(timeout=2.0, max_workers=SITES, backoff_base=0)
+        for n in (1, 2):
+            cycle = poller.poll_once()
+            print(
+                f"tsikl {n}: {cycle['polled']} stansiya, ok={cycle['ok']}, "
+                f"xato={cycle['failed']}, {cycle['elapsed_ms']} ms "
+                f"(eng sekin javob ~{MAX_DELAY * 1000:.0f} ms, ketma-ket ~{SITES * MAX_DELAY / 2:.0f} s), "
+                f"TCP ulanishlar jami: {StubHandler.connections}"
+            )
+        poller.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""So'rov budjeti tekshiruvi: QUERY_BUDGET_STRICT=True bilan har bir @query_budget
+GET route'i ko'p qatorli bazada (bitta xodimga ko'p hujjat, texnika va topshiriq)
+ochiladi; budjetdan oshgan (N+1) view QueryBudgetExceeded beradi.
+
+    python -m benchmarks.query_budget_check
+"""
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert, select
+
+from benchmarks.datagen import generate
+from benchmarks.routes_bench import EMPLOYEE_ENDPOINTS, ID_ARGS, PATH_ARGS, QUERY_ARGS
+from models import db, User, HRDocument, OrgTech, IjroTask, Vehicle, FuelLog, SolarSite, SolarReading
+from querycount import QueryBudgetExceeded
+
+SCALE = 0.02
+HEAVY = 60  # "og'ir" xodimga qo'shiladigan hujjat/texnika/topshiriq soni
+
+
+def seed_heavy_employee():
+    user_id = db.session.scalar(select(User.id).where(User.role == "employee").order_by(User.id).limit(1))
+    today = date.today()
+    db.session.execute(insert(HRDocument), [
+        {"filename": f"hr/{user_id}-{i}.pdf", "original_name": f"hujjat-{i}.pdf", "user_id": user_id}
+        for i in range(HEAVY)
+    ])
+    db.session.execute(insert(OrgTech), [
+        {"name": "Noutbuk", "model": "ThinkPad", "serial_number": f"QB{i:04d}", "status": "working",
+         "assigned_to_id": user_id}
+        for i in range(HEAVY)
+    ])
+    db.session.execute(insert(IjroTask), [
+        {"title": f"Topshiriq {i}", "date": today - timedelta(days=i % 20),
+         "due_date": today + timedelta(days=i % 7 - 3), "status": "new", "assigned_to_id": user_id}
+        for i in range(HEAVY)
+    ])
+    db.session.commit()
+    return user_id
+
+
+def _busiest(column):
+    # eng ko'p bog'langan qatorga ega obyekt — N+1 bo'lsa aynan shu yerda ko'rinadi
+    return db.session.scalar(select(column).group_by(column).order_by(func.count().desc()).limit(1))
+
+
+def sample_ids(user_id):
+    ids = {arg: db.session.scalar(select(model.id).order_by(model.id).limit(1)) for arg, model in ID_ARGS.items()}
+    ids.update(
+        user_id=user_id,
+        item_id=db.session.scalar(select(OrgTech.id).where(OrgTech.assigned_to_id == user_id).limit(1)),
+        vehicle_id=_busiest(FuelLog.vehicle_id) or ids["vehicle_id"],
+        org_id=_busiest(Vehicle.organization_id) or ids["org_id"],
+        site_id=_busiest(SolarReading.site_id) or db.session.scalar(select(SolarSite.id).limit(1)),
+    )
+    return ids
+
+
+def budgeted_rules(app):
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        view = app.view_functions[rule.endpoint]
+        if "GET" in rule.methods and hasattr(view, "query_budget"):
+            yield rule
+
+
+def check(app, admin, employee, ids):
+    problems, checked = [], 0
+    for rule in budgeted_rules(app):
+        values = {arg: ids.get(arg) or PATH_ARGS.get(arg, [None])[0] for arg in rule.arguments}
+        if None in values.values():
+            problems.append(f"{rule.rule}: namuna id topilmadi")
+            continue
+        path = rule.build(values, append_unknown=False)[1]
+        query = QUERY_ARGS.get(rule.endpoint, lambda rnd: {})(_FirstChoice())
+        client = employee if rule.endpoint in EMPLOYEE_ENDPOINTS else admin
+        try:
+            resp = client.get(path, query_string=query)
+        except QueryBudgetExceeded as e:
+            problems.append(str(e))
+            continue
+        if resp.status_code != 200:
+            problems.append(f"{path}: HTTP {resp.status_code}")
+            continue
+        checked += 1
+    return checked, problems
+
+
+class _FirstChoice:
+    # QUERY_ARGS random.Random kutadi — tekshiruvda har doim birinchi qiymat
+    def choice(self, values):
+        return values[0]
+
+
+def main():
+    from app import create_app
+    import jobs
+    from migrations import upgrade, seed_admin
+    from search import rebuild_index
+    from solar_rollup import rebuild_rollups
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # TESTING: QueryBudgetExceeded test client'gacha ko'tariladi (500 sahifaga aylanmaydi)
+        app = create_app(
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(tmp, 'budget.db')}",
+            QUERY_BUDGET_STRICT=True, TESTING=True, JOB_WORKER_THREADS=0,
+        )
+        with app.app_context():
+            upgrade(db.engine)
+            seed_admin()
+            generate(SCALE)
+            user_id = seed_heavy_employee()
+            rebuild_rollups()
+            rebuild_index()
+            jobs.enqueue("rebuild_search")  # /jobs/<id> uchun; worker yo'q, navbatda qoladi
+            ids = sample_ids(user_id)
+            username = db.session.get(User, user_id).username
+
+        admin, employee = app.test_client(), app.test_client()
+        admin.post("/login", data={"username": "admin", "password": "admin"})
+        employee.post("/login", data={"username": username, "password": "secret"})  # datagen paroli
+        checked, problems = check(app, admin, employee, ids)
+        with app.app_context():
+            db.engine.dispose()
+
+    print(f"{checked} route budjet ichida, {len(problems)} muammo")
+    for problem in problems:
+        print(f"  {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
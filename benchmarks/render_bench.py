@@ -0,0 +1,131 @@
+"""Sahifalar HTML hajmi (xom va gzip), render vaqti va shablonlarning sovuq
+kompilyatsiyasi (Jinja bytecode keshi bilan/siz).
+
+Avval baza: python -m benchmarks.datagen /tmp/af-bench.db
+Manifest bilan o'lchash uchun: flask --app app assets-build
+
+    python -m benchmarks.render_bench /tmp/af-bench.db [--runs 30] [--out render.json]
+    python -m benchmarks.render_bench /tmp/af-bench.db --compare render.json
+"""
+import argparse
+import gzip
+import json
+import sys
+import tempfile
+import time
+
+from sqlalchemy import func, select
+
+from assets import compile_templates
+from benchmarks.common import percentile
+from models import db, SolarSite, User
+
+PAGES = [
+    "/login",
+    "/admin/dashboard",
+    "/hr/profile/{user_id}",
+    "/organizations",
+    "/vehicles",
+    "/outsourcing",
+    "/solar",
+    "/solar/{site_id}",
+    "/ijro",
+    "/ijro/calendar",
+]
+
+
+def _app(db_path, **config):
+    from app import create_app
+
+    return create_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}", **config)
+
+
+def measure_pages(app, runs):
+    with app.app_context():
+        ids = {
+            "user_id": db.session.scalar(select(func.min(User.id)).where(User.role == "employee")),
+            "site_id": db.session.scalar(select(func.min(SolarSite.id))),
+        }
+    client = app.test_client()
+    client.post("/login", data={"username": "admin", "password": "admin"})
+
+    results = {}
+    for pattern in PAGES:
+        url = pattern.format(**ids)
+        resp = client.get(url)  # isitish: shablon kompilyatsiyasi va keshlar
+        body = resp.data
+        timings = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - t0) * 1000)
+        results[pattern] = {
+            "status": resp.status_code,
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, 6)),
+            "p50_ms": round(percentile(timings, 50), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+        }
+    return results
+
+
+def measure_compile(db_path, runs):
+    # har safar yangi app = yangi Jinja muhiti: xotiradagi shablon keshi bo'sh
+    out = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label, directory in (("keshsiz", ""), ("bytecode kesh", cache_dir)):
+            timings = []
+            count = 0
+            for i in range(runs + 1):
+                app = _app(db_path, JINJA_BYTECODE_CACHE_DIR=directory)
+                t0 = time.perf_counter()
+                count = compile_templates(app)
+                if i:  # birinchi o'tish keshni to'ldiradi
+                    timings.append((time.perf_counter() - t0) * 1000)
+            out[label] = {"templates": count, "p50_ms": round(percentile(timings, 50), 2)}
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("db_path")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--compile-runs", type=int, default=5)
+    parser.add_argument("--out")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    app = _app(args.db_path)
+    manifest = bool(app.extensions["assets"].manifest)
+    pages = measure_pages(app, args.runs)
+    compile_ = measure_compile(args.db_path, args.compile_runs)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["pages"]
+
+    print("manifest: " + ("bor" if manifest else "yo'q (?v= rejimi)"))
+    print(f"{'sahifa':<24}{'kod':>5}{'bayt':>9}{'gzip':>8}{'p50 ms':>9}{'p95 ms':>9}")
+    for url, r in pages.items():
+        line = f"{url:<24}{r['status']:>5}{r['bytes']:>9}{r['gzip_bytes']:>8}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+        old = baseline.get(url)
+        if old:
+            line += f"   bayt {r['bytes'] - old['bytes']:+d}, p50 {r['p50_ms'] - old['p50_ms']:+.2f} ms"
+        print(line)
+    total = sum(r["bytes"] for r in pages.values())
+    total_gz = sum(r["gzip_bytes"] for r in pages.values())
+    print(f"{'jami':<24}{'':>5}{total:>9}{total_gz:>8}")
+
+    print("\nsovuq kompilyatsiya (barcha shablonlar):")
+    for label, r in compile_.items():
+        print(f"  {label:<16}{r['templates']:>4} ta  p50 {r['p50_ms']:.2f} ms")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"python": sys.version.split()[0], "manifest": manifest, "pages": pages, "compile": compile_}, f, indent=2)
+        print(f"\nYozildi: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
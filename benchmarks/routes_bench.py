@@ -0,0 +1,223 @@
+"""app.py'dagi har bir route'ni test client orqali (login qilingan sessiya bilan)
+yuklaydi va JSON baseline yozadi: req/s, p50/p95/p99 va so'rov boshiga SQL soni.
+
+Avval baza: python -m benchmarks.datagen /tmp/af-bench.db
+
+    python -m benchmarks.routes_bench /tmp/af-bench.db [--runs 50] [--out baseline.json]
+    python -m benchmarks.routes_bench /tmp/af-bench.db --compare baseline.json
+
+--compare bilan p95 yoki SQL soni baseline'dan --tolerance (standart 25%)
+ko'proq oshgan route'lar chiqariladi va chiqish kodi 1 bo'ladi.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import date
+
+from sqlalchemy import func, select
+
+from benchmarks.common import QueryCounter, percentile
+from models import db, User, Vehicle, OrgTech, Organization, OutsourceCompany, SolarSite, IjroTask, Job
+
+# URL parametri -> qaysi jadvaldan mavjud id olinadi
+ID_ARGS = {
+    "vehicle_id": Vehicle,
+    "item_id": OrgTech,
+    "org_id": Organization,
+    "company_id": OutsourceCompany,
+    "site_id": SolarSite,
+    "task_id": IjroTask,
+    "user_id": User,
+    "job_id": Job,
+}
+# id bo'lmagan URL parametrlari — qiymatlar ro'yxatidan tanlanadi
+PATH_ARGS = {
+    "name": ["hr", "vehicles", "contracts", "tasks"],
+    "fmt": ["csv", "xlsx"],
+    "kind": ["rebuild_outsourcing_summary"],
+}
+QUERY_ARGS = {
+    "main.global_search": lambda rnd: {"q": rnd.choice(["hisobot", "kar", "cobalt", "stansiya", "xat buyruq"])},
+    "main.ijro_calendar_feed": lambda rnd: {"month": date.today().strftime("%Y-%m")},
+    "main.solar_energy_series": lambda rnd: {"period": rnd.choice(["day", "week", "month"])},
+}
+EMPLOYEE_ENDPOINTS = {"main.employee_dashboard"}
+SKIP_ENDPOINTS = {"static", "main.logout"}
+# millisekunddan tezroq route'larda nisbiy farq shovqin — mutlaq chegaralar ham kerak
+MIN_DELTA_MS = 1.0
+MIN_DELTA_QUERIES = 0.5
+
+
+def _form(endpoint, rnd, i):
+    forms = {
+        "main.login": {"username": "admin", "password": "admin"},
+        "main.ijro_create": {"title": f"Yuklama {i}", "description": "bench", "assigned_to": "2"},
+        "main.organizations_create": {"name": f"Yuklama {i}", "employee_count": "10"},
+        "main.outsourcing_create": {"name": f"Yuklama {i}", "contract_amount": "1000"},
+        "main.vehicle_create": {"model": "Cobalt", "plate_number": f"99Z{i:05d}"},
+        "main.orgtech_create": {"name": "Printer", "model": "HP", "serial_number": f"BENCH{i}", "status": "new"},
+        "main.hr_create": {
+            "username": f"bench{i}-{rnd.random():.6f}", "password": "x",
+            "full_name": "Yuklama", "position": "", "phone": "",
+        },
+        "main.hr_edit": {"full_name": f"Yuklama {i}"},
+    }
+    return forms.get(endpoint)
+
+
+def _ingest_body(rnd, i):
+    site = rnd.randint(1, 2)
+    return f"site_id,created_at,energy_kwh\n{site},2030-01-01T00:{i % 60:02d}:{rnd.randint(0, 59):02d},1.5\n"
+
+
+def _fuel_body(rnd, i):
+    vehicle = rnd.randint(1, 50)
+    return f"vehicle_id,filled_at,liters,amount\n{vehicle},2030-01-01T{i % 24:02d}:{rnd.randint(0, 59):02d}:00,40,440000\n"
+
+
+def _sample_ids(limit=500):
+    ids = {
+        arg: db.session.scalars(select(model.id).order_by(func.random()).limit(limit)).all() or [1]
+        for arg, model in ID_ARGS.items()
+    }
+    ids.update(PATH_ARGS)
+    return ids
+
+
+def _scenarios(app, include_writes):
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.endpoint in SKIP_ENDPOINTS or rule.endpoint.startswith("profiling."):
+            continue
+        for method in ("GET", "POST"):
+            if method not in rule.methods:
+                continue
+            if method == "POST" and not include_writes:
+                continue
+            # ijro_done GET bo'lsa ham yozadi
+            if rule.endpoint == "main.ijro_done" and not include_writes:
+                continue
+            yield rule, method
+
+
+def run_route(client, engine, rule, method, ids, rnd, runs):
+    latencies, queries, statuses = [], [], {}
+    started = time.perf_counter()
+    for i in range(runs):
+        values = {arg: rnd.choice(ids[arg]) for arg in rule.arguments}
+        path = rule.build(values, append_unknown=False)[1]
+        query = QUERY_ARGS.get(rule.endpoint, lambda r: {})(rnd)
+        kwargs = {"query_string": query}
+        if method == "POST":
+            if rule.endpoint == "main.solar_ingest":
+                kwargs.update(data=_ingest_body(rnd, i), content_type="text/csv")
+            elif rule.endpoint == "main.fuel_import":
+                kwargs.update(data=_fuel_body(rnd, i), content_type="text/csv")
+            else:
+                kwargs["data"] = _form(rule.endpoint, rnd, i) or {}
+
+        with QueryCounter(engine) as counter:
+            t0 = time.perf_counter()
+            resp = client.open(path, method=method, **kwargs)
+            resp.get_data()  # oqimli javoblar ham to'liq o'qiladi
+            latencies.append((time.perf_counter() - t0) * 1000)
+        queries.append(counter.count)
+        statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+    elapsed = time.perf_counter() - started
+    return {
+        "method": method,
+        "rule": rule.rule,
+        "requests": runs,
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "errors": sum(v for k, v in statuses.items() if k >= 500),
+        "rps": round(runs / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries_per_request": round(sum(queries) / runs, 2),
+        "max_queries": max(queries),
+    }
+
+
+def compare(current, baseline, tolerance):
+    regressions = []
+    for key, cur in current["routes"].items():
+        base = baseline["routes"].get(key)
+        if not base:
+            continue
+        if (cur["p95_ms"] > base["p95_ms"] * (1 + tolerance)
+                and cur["p95_ms"] - base["p95_ms"] > MIN_DELTA_MS):
+            regressions.append(f"{key}: p95 {base['p95_ms']} -> {cur['p95_ms']} ms")
+        if (cur["queries_per_request"] > base["queries_per_request"] * (1 + tolerance)
+                and cur["queries_per_request"] - base["queries_per_request"] > MIN_DELTA_QUERIES):
+            regressions.append(f"{key}: SQL {base['queries_per_request']} -> {cur['queries_per_request']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="datagen yaratgan SQLite fayl")
+    parser.add_argument("--runs", type=int, default=50, help="har bir route uchun so'rovlar")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--read-only", action="store_true", help="POST va yozuvchi route'larsiz")
+    parser.add_argument("--out", help="natija JSON fayli")
+    parser.add_argument("--compare", help="baseline JSON bilan solishtirish")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    from app import create_app
+
+    # vazifalar navbatda qoladi — o'lchov faqat so'rovning o'zi (worker oqimi SQL sanog'iga aralashmasin)
+    app = create_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{args.path}", JOB_WORKER_THREADS=0)
+    app.logger.disabled = True  # 5xx jadvalda sanaladi, traceback shart emas
+    rnd = random.Random(args.seed)
+    admin = app.test_client()
+    employee = app.test_client()
+    with app.app_context():
+        engine = db.engine
+        ids = _sample_ids()
+        employee_name = db.session.scalar(select(User.username).where(User.role == "employee").limit(1))
+    # datagen parollari: admin/admin, qolganlar "secret"
+    admin.post("/login", data={"username": "admin", "password": "admin"})
+    employee.post("/login", data={"username": employee_name, "password": "secret"})
+
+    result = {
+        "meta": {
+            "db": args.path,
+            "runs": args.runs,
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "routes": {},
+    }
+    print(f"{'route':<44}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'SQL':>7}{'5xx':>5}")
+    # har bir so'rov o'z app context'ida (tashqi context bo'lsa sessiya va g umumiy bo'lib qoladi)
+    for rule, method in _scenarios(app, not args.read_only):
+        client = employee if rule.endpoint in EMPLOYEE_ENDPOINTS else admin
+        r = run_route(client, engine, rule, method, ids, rnd, args.runs)
+        key = f"{method} {rule.rule}"
+        result["routes"][key] = r
+        print(
+            f"{key:<44}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+            f"{r['p99_ms']:>9}{r['queries_per_request']:>7}{r['errors']:>5}"
+        )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"-> {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSIYA " + line)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
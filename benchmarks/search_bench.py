@@ -0,0 +1,75 @@
+"""FTS5 global qidiruv: 1M indekslangan hujjatda so'rov vaqti.
+
+    python -m benchmarks.search_bench [qatorlar]
+"""
+import itertools
+import random
+import sys
+import time
+
+from models import db
+import search
+from benchmarks.common import make_app, measure, print_table
+
+SYLLABLES = "ba bo da di ja ka ko la ma mi na no qa ra sa sho ta to xa yo za zi".split()
+NAMES = "Alisher Bobur Dilshod Jasur Kamola Malika Nodira Sardor Shaxzod Zarina".split()
+
+
+def make_vocabulary(rnd, size=20_000):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rnd.choices(SYLLABLES, k=rnd.randint(2, 4))))
+    words = sorted(words)
+    rnd.shuffle(words)
+    # Zipf: tez-tez uchraydigan so'zlar oz, noyoblari ko'p
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(size)))
+    return words, cum_weights
+
+
+def fake_doc(rnd, vocab, i):
+    words, cum_weights = vocab
+    kind = rnd.choice(list(search.DOCUMENTS))
+    code = search.DOCUMENTS[kind][1]
+    title = " ".join(rnd.choices(words, cum_weights=cum_weights, k=3)) + f" {rnd.choice(NAMES)}"
+    body = " ".join(rnd.choices(words, cum_weights=cum_weights, k=12)) + f" 01A{i % 1000:03d}BC AB{i:07d}"
+    return {"rowid": i * 8 + code, "title": title, "body": body}
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    app = make_app()
+    with app.app_context():
+        search.ensure_index(db.session.connection())
+        rnd = random.Random(7)
+        vocab = make_vocabulary(rnd)
+        t0 = time.perf_counter()
+        conn = db.session.connection()
+        for start in range(0, rows, 10_000):
+            conn.execute(
+                search.text(f"INSERT INTO {search.INDEX_TABLE} (rowid, title, body) VALUES (:rowid, :title, :body)"),
+                [fake_doc(rnd, vocab, i) for i in range(start, min(start + 10_000, rows))],
+            )
+        conn.execute(search.text(f"INSERT INTO {search.INDEX_TABLE}({search.INDEX_TABLE}) VALUES ('optimize')"))
+        db.session.commit()
+        print(f"{rows} hujjat indekslandi: {time.perf_counter() - t0:.1f} s")
+
+        words = vocab[0]
+        queries = {
+            "noyob raqam AB0500000": "AB0500000",
+            "eng ko'p uchraydigan so'z": words[0],
+            "o'rtacha so'z": words[100],
+            "noyob so'z": words[5000],
+            "prefiks (3 harf)": words[100][:3],
+            "ism + so'z (AND)": f"{NAMES[0]} {words[50]}",
+            "2-sahifa, o'rtacha so'z": (words[100], 2),
+        }
+        results = {}
+        for label, q in queries.items():
+            q, page = q if isinstance(q, tuple) else (q, 1)
+            results[label] = measure(lambda: search.search(q, page=page), runs=50)
+
+    print_table("FTS5 qidiruv", results)
+
+
+if __name__ == "__main__":
+    main()
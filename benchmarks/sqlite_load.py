@@ -0,0 +1,107 @@
+"""Bir nechta worker jarayoni bir SQLite faylga parallel o'qib-yozadi.
+
+SQLITE_PRAGMAS'siz (avvalgi holat) va Config'dagi WAL sozlamalari bilan
+o'tkazuvchanlik va "database is locked" xatolari ulushini solishtiradi.
+
+    python -m benchmarks.sqlite_load [workers] [sekund]
+"""
+import multiprocessing as mp
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.common import percentile
+from migrations import upgrade as upgrade_db, seed_admin
+from models import db
+
+WRITE_RATIO = 0.2
+
+
+def _app(db_path, pragmas):
+    from app import create_app
+    return create_app(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}",
+        SQLITE_PRAGMAS=pragmas,
+        DASHBOARD_CACHE_TTL=0,
+    )
+
+
+def worker(db_path, pragmas, seconds, seed, out):
+    app = _app(db_path, pragmas)
+    client = app.test_client()
+    client.post("/login", data={"username": "admin", "password": "admin"})
+
+    rnd = random.Random(seed)
+    ops = errors = locked = 0
+    read_ms = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        t0 = time.perf_counter()
+        is_write = rnd.random() < WRITE_RATIO
+        try:
+            if is_write:
+                resp = client.post("/ijro/create", data={"title": f"Yuklama {seed}-{ops}", "description": "x"})
+            else:
+                resp = client.get(rnd.choice(["/ijro", "/admin/dashboard", "/vehicles"]))
+            if resp.status_code >= 500:
+                errors += 1
+        except OperationalError as e:
+            errors += 1
+            if "locked" in str(e):
+                locked += 1
+        if not is_write:
+            read_ms.append((time.perf_counter() - t0) * 1000)
+        ops += 1
+    out.put((ops, errors, locked, read_ms))
+
+
+def run(label, pragmas, workers, seconds):
+    tmp = tempfile.mkdtemp(prefix="af-load-")
+    db_path = os.path.join(tmp, "load.db")
+    try:
+        app = _app(db_path, pragmas)
+        with app.app_context():  # sxema va admin
+            upgrade_db(db.engine)
+            seed_admin()
+
+        out = mp.Queue()
+        procs = [
+            mp.Process(target=worker, args=(db_path, pragmas, seconds, i, out))
+            for i in range(workers)
+        ]
+        for p in procs:
+            p.start()
+        results = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    ops = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    locked = sum(r[2] for r in results)
+    read_p95 = percentile([ms for r in results for ms in r[3]], 95)
+    print(
+        f"{label:<22}{workers:>8}{ops / seconds:>12.1f}{read_p95:>14.1f}"
+        f"{errors:>9}{locked:>9}{(errors / ops * 100 if ops else 0):>10.2f}%"
+    )
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    from config import Config
+
+    print(f"{'rejim':<22}{'workers':>8}{'so‘rov/s':>12}{'o‘qish p95':>14}{'xato':>9}{'locked':>9}{'xato %':>11}")
+    run("rollback journal", {}, workers, seconds)
+    run("WAL + busy_timeout", Config.SQLITE_PRAGMAS, workers, seconds)
+
+
+if __name__ == "__main__":
+    main()
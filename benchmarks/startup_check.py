@@ -0,0 +1,65 @@
+"""Fon oqimlari tekshiruvi: `import app` va `create_app()` hech qanday oqim
+ishga tushirmaydi (SOLAR_POLL_INTERVAL, DEADLINE_SCHEDULER, JOB_WORKER_THREADS
+yoqilgan bo'lsa ham); birinchi so'rovdan keyin har biridan aynan bitta,
+ikkinchi app nusxasi (xizmat qilmayotgan) esa hech narsa qo'shmaydi.
+
+    python -m benchmarks.startup_check
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROBE = """
+import json, threading
+names = lambda: sorted(t.name for t in threading.enumerate() if t is not threading.main_thread())
+import app
+after_import = names()
+served = app.create_app()
+app.create_app()  # masalan, CLI yoki boshqa kirish nuqtasi yaratgan ikkinchi nusxa
+after_create = names()
+client = served.test_client()
+client.get("/login")
+client.get("/login")
+print(json.dumps({"import": after_import, "create_app": after_create, "request": names()}))
+"""
+EXPECTED_AFTER_REQUEST = ["deadlines", "jobs-0", "solar-poller"]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+            PYTHONPATH=os.getcwd(),
+            SOLAR_POLL_INTERVAL="60",
+            DEADLINE_SCHEDULER="1",
+            JOB_WORKER_THREADS="1",
+        )
+        subprocess.run(
+            [sys.executable, "-m", "flask", "--app", "app", "db-upgrade"],
+            env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    threads = json.loads(out.strip().splitlines()[-1])
+
+    problems = []
+    for stage in ("import", "create_app"):
+        if threads[stage]:
+            problems.append(f"{stage}: oqimlar ishga tushdi {threads[stage]}")
+    # poller o'z ThreadPoolExecutor oqimlarini ham ochishi mumkin — faqat nomlanganlari
+    started = sorted(n for n in threads["request"] if n in EXPECTED_AFTER_REQUEST)
+    if started != EXPECTED_AFTER_REQUEST:
+        problems.append(f"birinchi so'rovdan keyin: {started}, kutilgan {EXPECTED_AFTER_REQUEST}")
+
+    print(f"oqimlar: {threads}; {len(problems)} muammo")
+    for problem in problems:
+        print(f"  {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
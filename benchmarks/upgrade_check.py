@@ -0,0 +1,179 @@
+"""Migratsiyalar tekshiruvi: `flask db-upgrade` bo'sh bazada va birinchi relizdagi
+sxemada (create_all'siz, ma'lumotlar bilan) oxirigacha o'tadimi va natijada
+models.py'dagi har bir ustun, nomli indeks va unikal cheklov bazada bormi,
+eski ma'lumotlardan yig'indilar to'ldirilganmi.
+
+Eski migratsiyalar modelning joriy shakliga bog'lanib qolsa (keyin qo'shilgan
+ustunni tanlasa), shu yerda yiqiladi.
+
+    python -m benchmarks.upgrade_check
+"""
+import os
+import sys
+import tempfile
+import warnings
+from datetime import date, datetime
+
+from sqlalchemy import UniqueConstraint, create_engine, func, inspect, select, text
+
+from models import db, SolarReading, SolarDailyRollup, SolarEnergyTotal
+from migrations import upgrade as upgrade_db
+from solar_ingest import _insert_ignore
+
+
+# birinchi relizdagi jadvallar (o'shanda app.py import vaqtida create_all qilardi)
+BASELINE_SCHEMA = """
+CREATE TABLE user (
+    id INTEGER NOT NULL, username VARCHAR(64) NOT NULL, password VARCHAR(128) NOT NULL, role VARCHAR(20),
+    full_name VARCHAR(120), position VARCHAR(120), phone VARCHAR(64), address VARCHAR(200), birth_date VARCHAR(20),
+    passport_series VARCHAR(10), passport_number VARCHAR(20), passport_given_date VARCHAR(20),
+    passport_given_by VARCHAR(200), diploma_type VARCHAR(200), diploma_from VARCHAR(200), diploma_year VARCHAR(10),
+    photo VARCHAR(200), PRIMARY KEY (id), UNIQUE (username)
+);
+CREATE TABLE organization (
+    id INTEGER NOT NULL, name VARCHAR(200), employee_count INTEGER, address VARCHAR(200), floor VARCHAR(50),
+    comment TEXT, PRIMARY KEY (id)
+);
+CREATE TABLE outsource_company (
+    id INTEGER NOT NULL, name VARCHAR(128) NOT NULL, service_type VARCHAR(128), contract_number VARCHAR(64),
+    contract_date DATE, contract_amount FLOAT, comment TEXT, PRIMARY KEY (id)
+);
+CREATE TABLE solar_site (
+    id INTEGER NOT NULL, name VARCHAR(128) NOT NULL, external_url VARCHAR(255), location VARCHAR(255),
+    capacity_kw FLOAT, last_power_kw FLOAT, last_energy_today_kwh FLOAT, last_updated_at DATETIME,
+    PRIMARY KEY (id)
+);
+CREATE TABLE hr_document (
+    id INTEGER NOT NULL, filename VARCHAR(200), user_id INTEGER, PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES user (id)
+);
+CREATE TABLE vehicle (
+    id INTEGER NOT NULL, model VARCHAR(120), plate_number VARCHAR(50), driver_full_name VARCHAR(120),
+    monthly_fuel_limit INTEGER, last_repair_date VARCHAR(20), photo VARCHAR(200), organization_id INTEGER,
+    PRIMARY KEY (id), FOREIGN KEY(organization_id) REFERENCES organization (id)
+);
+CREATE TABLE org_tech (
+    id INTEGER NOT NULL, name VARCHAR(128), model VARCHAR(128), serial_number VARCHAR(128), status VARCHAR(64),
+    comment TEXT, assigned_to_id INTEGER, last_update DATETIME, PRIMARY KEY (id),
+    FOREIGN KEY(assigned_to_id) REFERENCES user (id)
+);
+CREATE TABLE solar_reading (
+    id INTEGER NOT NULL, site_id INTEGER, date DATE, energy_kwh FLOAT, created_at DATETIME, PRIMARY KEY (id),
+    FOREIGN KEY(site_id) REFERENCES solar_site (id)
+);
+CREATE TABLE ijro_task (
+    id INTEGER NOT NULL, title VARCHAR(200), description TEXT, date DATE, due_date DATE, status VARCHAR(50),
+    assigned_to_id INTEGER, PRIMARY KEY (id), FOREIGN KEY(assigned_to_id) REFERENCES user (id)
+);
+"""
+
+BASELINE_ROWS = """
+INSERT INTO user (id, username, password, role, full_name, position) VALUES
+    (1, 'admin', 'admin', 'admin', 'Super Admin', NULL),
+    (2, 'ali', 'secret', 'employee', 'Ali Valiyev', 'Hisobchi');
+INSERT INTO organization (id, name, address) VALUES (1, 'Bosh ofis', 'Toshkent');
+INSERT INTO vehicle (id, model, plate_number, organization_id) VALUES (1, 'Cobalt', '01A123BC', 1);
+INSERT INTO outsource_company (id, name, service_type, contract_date, contract_amount) VALUES
+    (1, 'Toza Servis', 'Tozalash', '2024-03-01', 1200.0);
+INSERT INTO org_tech (id, name, status, assigned_to_id, last_update) VALUES
+    (1, 'Printer', 'working', 2, '2024-03-02 10:00:00.000000');
+INSERT INTO solar_site (id, name, capacity_kw) VALUES (1, 'Tom', 50.0);
+INSERT INTO solar_reading (site_id, date, energy_kwh, created_at) VALUES
+    (1, '2024-03-01', 10.0, '2024-03-01 12:00:00.000000'),
+    (1, '2024-03-02', 12.5, '2024-03-02 12:00:00.000000'),
+    (1, '2024-03-02', 12.5, '2024-03-02 12:00:00.000000');
+INSERT INTO ijro_task (id, title, date, status, assigned_to_id) VALUES
+    (1, 'Hisobot', '2024-03-05', 'new', 2),
+    (2, 'Sanasiz topshiriq', NULL, 'new', 2);
+"""
+
+
+def _executescript(engine, script):
+    with engine.begin() as conn:
+        for statement in script.split(";"):
+            if statement.strip():
+                conn.execute(text(statement))
+
+
+def schema_problems(engine):
+    inspector = inspect(engine)
+    problems = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            problems.append(f"{table.name}: jadval yo'q")
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        problems += [f"{table.name}.{c.name}: ustun yo'q" for c in table.columns if c.name not in columns]
+        # sqlite_master: reflektsiya ifodali indekslarni (ix_ijro_task_date_key) qaytarmaydi
+        with engine.connect() as conn:
+            indexes = set(conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :t"), {"t": table.name}
+            ).scalars())
+        problems += [f"{table.name}: {i.name} indeksi yo'q" for i in table.indexes if i.name not in indexes]
+        unique = [c["column_names"] for c in inspector.get_unique_constraints(table.name)]
+        unique += [i["column_names"] for i in inspector.get_indexes(table.name) if i["unique"]]
+        expected = [list(c.columns.keys()) for c in table.constraints if isinstance(c, UniqueConstraint)]
+        expected += [[c.name for c in i.columns] for i in table.indexes if i.unique]
+        problems += [f"{table.name}{tuple(cols)}: unikal emas" for cols in expected if cols not in unique]
+    return problems
+
+
+def _count(conn, model):
+    return conn.execute(select(func.count()).select_from(model.__table__)).scalar()
+
+
+def data_problems(engine):
+    problems = []
+    with engine.begin() as conn:
+        if _count(conn, SolarReading) != 2:
+            problems.append(f"solar_reading: takrorlar o'chmagan ({_count(conn, SolarReading)} qator)")
+        # rollup'lar mavjud (takrorsiz) o'lchovlardan to'ldirilgan bo'lishi kerak
+        daily = conn.execute(select(func.sum(SolarDailyRollup.energy_kwh))).scalar()
+        monthly = conn.execute(
+            select(func.sum(SolarEnergyTotal.energy_kwh)).where(SolarEnergyTotal.period == "month")
+        ).scalar()
+        if daily != 22.5 or monthly != 22.5:
+            problems.append(f"solar rollup: kunlik {daily}, oylik {monthly} (kutilgan 22.5)")
+        # ingest'ning ON CONFLICT DO NOTHING'i unikal indeksga tayanadi
+        try:
+            inserted = _insert_ignore(conn, [{"site_id": 1, "date": date(2024, 3, 1), "energy_kwh": 10.0,
+                                              "created_at": datetime(2024, 3, 1, 12)}])
+        except Exception as e:
+            problems.append(f"solar ingest: {str(e).splitlines()[0]}")
+        else:
+            if inserted or _count(conn, SolarReading) != 2:
+                problems.append("solar ingest: mavjud o'lchov qayta yozildi")
+    return problems
+
+
+def check(label, engine, seed=None):
+    if seed:
+        _executescript(engine, BASELINE_SCHEMA)
+        _executescript(engine, seed)
+    try:
+        applied = upgrade_db(engine)
+    except Exception as e:
+        return [f"upgrade yiqildi: {e.__class__.__name__}: {str(e).splitlines()[0]}"]
+    problems = schema_problems(engine)
+    if seed:
+        problems += data_problems(engine)
+    print(f"{label}: {len(applied)} migratsiya, {len(problems)} muammo")
+    return problems
+
+
+def main():
+    warnings.filterwarnings("ignore", "Skipped unsupported reflection of expression-based index")
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, seed in (("bo'sh baza", None), ("birinchi reliz sxemasi", BASELINE_ROWS)):
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, label.replace(' ', '_'))}.db")
+            problems = check(label, engine, seed)
+            for problem in problems:
+                print(f"  {problem}")
+            failed = failed or bool(problems)
+            engine.dispose()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
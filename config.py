@@ -3,10 +3,64 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key")
+    # app.py avval "sqlite:///data.db" ishlatgan — Flask-SQLAlchemy uni instance/ ichida ochadi
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "DATABASE_URL",
-        "sqlite:///" + os.path.join(basedir, "data.db")
+        "sqlite:///" + os.path.join(basedir, "instance", "data.db")
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # PostgreSQL/MySQL uchun; SQLite'da pool_size/max_overflow/pool_timeout olib tashlanadi
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    }
+    # SQLite: har bir ulanishda qo'llanadi (gunicorn bir nechta worker bilan yozganda "database is locked" bo'lmasligi uchun)
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    }
     UPLOAD_FOLDER = os.path.join(basedir, "static", "uploads")
+    DASHBOARD_CACHE_TTL = int(os.environ.get("DASHBOARD_CACHE_TTL", 30))
+    QUERY_BUDGET_STRICT = False  # True: budjetdan oshgan view xato beradi (benchmarks/query_budget_check.py)
+    SOLAR_POLL_INTERVAL = int(os.environ.get("SOLAR_POLL_INTERVAL", 0))  # 0 = o'chirilgan
+    SOLAR_POLL_TIMEOUT = float(os.environ.get("SOLAR_POLL_TIMEOUT", 5))
+    SOLAR_POLL_WORKERS = int(os.environ.get("SOLAR_POLL_WORKERS", 100))
+    # auth.py: sid -> foydalanuvchi keshi; boshqa worker'dagi rol o'zgarishi TTL ichida yetib keladi
+    AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", 10000))
+    AUTH_CACHE_TTL = int(os.environ.get("AUTH_CACHE_TTL", 60))
+    AUTH_SESSION_TTL = int(os.environ.get("AUTH_SESSION_TTL", 14 * 24 * 3600))  # sekund; keyin qayta login
+    # so'rov profili va /metrics (profiling.py); o'chirilgan bo'lsa hech narsa ulanmaydi
+    PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+    PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))  # cProfile: so'rovlarning ulushi
+    PROFILE_SLOW_MS = int(os.environ.get("PROFILE_SLOW_MS", 500))          # shundan sekin bo'lsa saqlanadi
+    PROFILE_DIR = os.environ.get("PROFILE_DIR")                             # .prof fayllar (ixtiyoriy)
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # Prometheus uchun; bo'lmasa /metrics faqat rahbarga
 
+    # fon vazifalari (jobs.py): web jarayonida shuncha oqim (birinchi so'rovda ishga tushadi);
+    # alohida `flask jobs-worker` ishlatilsa 0 qilinadi
+    JOB_WORKER_THREADS = int(os.environ.get("JOB_WORKER_THREADS", 1))
+    JOB_SPOOL_DIR = os.environ.get("JOB_SPOOL_DIR", os.path.join(basedir, "instance", "spool"))
+
+    # shablonlar bytecode keshi (assets.py); bo'sh qiymat — o'chirilgan
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get(
+        "JINJA_BYTECODE_CACHE_DIR", os.path.join(basedir, "instance", "jinja-cache")
+    )
+
+    # muddat eslatmalari (deadlines.py): web jarayonida oqim yoki alohida `flask deadlines-worker`
+    DEADLINE_SCHEDULER = os.environ.get("DEADLINE_SCHEDULER", "0") == "1"
+    DEADLINE_REMIND_HOURS = int(os.environ.get("DEADLINE_REMIND_HOURS", 24))
+    DEADLINE_REFRESH_SEC = int(os.environ.get("DEADLINE_REFRESH_SEC", 600))
+
+    # parol xeshi (passwords.py): "scrypt:N:r:p" yoki "pbkdf2:sha256:iteratsiyalar";
+    # o'zgartirilsa eski xeshlar keyingi kirishda yangilanadi
+    PASSWORD_METHOD = os.environ.get("PASSWORD_METHOD", "scrypt:32768:8:1")
+    PASSWORD_SALT_LENGTH = int(os.environ.get("PASSWORD_SALT_LENGTH", 16))
+
+    # detal sahifalari keshi (page_cache.py): bloklar uchun LRU hajmi, 0 — o'chirilgan
+    PAGE_CACHE_BYTES = int(os.environ.get("PAGE_CACHE_BYTES", 32 * 2**20))
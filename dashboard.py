@@ -0,0 +1,146 @@
+import time
+from datetime import date
+from threading import Lock
+
+from flask import current_app
+from sqlalchemy import case, func, literal, null, select, type_coerce, union_all
+
+from deadlines import overdue_condition
+from models import db, User, Vehicle, OutsourceCompany, IjroTask
+from solar_rollup import period_series
+
+
+# Rahbar paneli ko'rsatkichlari jarayon ichida qisqa muddat keshlanadi.
+DEFAULT_TTL = 30  # sekund
+
+TASK_STATUSES = ["new", "in_progress", "done"]
+
+MAX_ENTRIES = 5000  # xodimlar bo'yicha kalitlar: oshsa eskirganlari tozalanadi
+
+_cache = {}
+_lock = Lock()
+
+
+def invalidate_metrics():
+    # admin ko'rsatkichlari; xodim kalitlari invalidate_employee bilan
+    with _lock:
+        for key in [k for k in _cache if k[0] == "admin"]:
+            del _cache[key]
+
+
+def invalidate_employee(*user_ids):
+    with _lock:
+        for key in [k for k in _cache if k[0] == "employee" and k[1] in user_ids]:
+            del _cache[key]
+
+
+def _cached(key, compute):
+    ttl = current_app.config.get("DASHBOARD_CACHE_TTL", DEFAULT_TTL)
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+
+    value = compute()
+    if ttl > 0:
+        with _lock:
+            if len(_cache) >= MAX_ENTRIES:
+                for stale in [k for k, (expires, _) in _cache.items() if expires <= now]:
+                    del _cache[stale]
+            _cache[key] = (now + ttl, value)
+    return value
+
+
+# ---------- SO'ROVLAR ----------
+
+def _entity_counts():
+    # uchta COUNT bitta SELECT ichida skalyar subquery sifatida
+    row = db.session.execute(
+        select(
+            select(func.count(User.id)).where(User.role == "employee").scalar_subquery(),
+            select(func.count(Vehicle.id)).scalar_subquery(),
+            select(func.count(OutsourceCompany.id)).scalar_subquery(),
+        )
+    ).one()
+    return {
+        "total_employees": row[0] or 0,
+        "vehicles_count": row[1] or 0,
+        "outsource_count": row[2] or 0,
+    }
+
+
+def _overdue_count(today):
+    return func.coalesce(func.sum(case((overdue_condition(today), 1), else_=0)), 0)
+
+
+def task_status_counts(today):
+    # status bo'yicha sonlar va muddati o'tganlar — (status, due_date) indeksidan, bitta so'rovda
+    rows = db.session.execute(
+        select(IjroTask.status, func.count(IjroTask.id), _overdue_count(today)).group_by(IjroTask.status)
+    ).all()
+    return {status: count for status, count, _ in rows}, sum(overdue for *_, overdue in rows)
+
+
+def _compute_admin_metrics(today):
+    metrics = _entity_counts()
+
+    by_status, metrics["overdue_tasks"] = task_status_counts(today)
+    metrics["active_tasks"] = sum(
+        n for status, n in by_status.items() if status is not None and status != "done"
+    )
+    metrics["task_status_data"] = {
+        "labels": TASK_STATUSES,
+        "values": [by_status.get(s, 0) for s in TASK_STATUSES],
+    }
+
+    labels, values = period_series("day", 7, today)
+    metrics["solar_today_kwh"] = values[-1]
+    metrics["solar_weekly_data"] = {"labels": labels, "values": values}
+    return metrics
+
+
+def admin_metrics():
+    today = date.today()
+    return _cached(("admin", today), lambda: _compute_admin_metrics(today))
+
+
+# ---------- XODIM PANELI ----------
+
+def _compute_employee_summary(user_id, today):
+    # status bo'yicha sonlar va bugungi topshiriqlar bitta UNION ALL so'rovida;
+    # ikkala qism ham (assigned_to_id, ...) indekslari bo'yicha
+    # (assigned_to_id, status, due_date) indeksi "muddati o'tgan" sonini ham qoplaydi
+    # UNION ustun turlari birinchi qismdan olinadi — due_date Date bo'lmasa SQLite satr qaytaradi
+    counts = select(
+        IjroTask.status, func.count(IjroTask.id).label("n"), _overdue_count(today).label("overdue"),
+        null().label("id"), null().label("title"), type_coerce(null(), IjroTask.due_date.type).label("due_date"),
+    ).where(IjroTask.assigned_to_id == user_id).group_by(IjroTask.status)
+    todays = select(
+        IjroTask.status, literal(None).label("n"), literal(None).label("overdue"),
+        IjroTask.id, IjroTask.title, IjroTask.due_date,
+    ).where(IjroTask.assigned_to_id == user_id, IjroTask.date == today)
+
+    by_status = {}
+    overdue = 0
+    today_list = []
+    for row in db.session.execute(union_all(counts, todays)):
+        if row.id is None:
+            by_status[row.status] = row.n
+            overdue += row.overdue
+        else:
+            today_list.append({"id": row.id, "title": row.title, "due_date": row.due_date, "status": row.status})
+    today_list.sort(key=lambda t: t["id"])
+
+    return {
+        "today_tasks": len(today_list),
+        "new_tasks": by_status.get("new", 0),
+        "completed_tasks": by_status.get("done", 0),
+        "overdue_tasks": overdue,
+        "today_task_list": today_list,
+    }
+
+
+def employee_summary(user_id):
+    today = date.today()
+    return _cached(("employee", user_id, today), lambda: _compute_employee_summary(user_id, today))
@@ -0,0 +1,256 @@
+import heapq
+import json
+import threading
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, event, select
+from sqlalchemy.exc import IntegrityError
+
+from models import db, IjroTask, DeadlineReminder, Notification
+
+
+# Ijro topshiriqlari muddatlari: har bir ochiq topshiriq uchun ikki eslatma —
+# muddatdan REMIND_BEFORE oldin (due_soon) va muddat kuni tugagach (overdue).
+# Yaqin HORIZON ichidagi eslatmalar min-heap'da turadi; worker eng yaqinigacha
+# uxlaydi. Heap (status, due_date) indeksi bo'yicha bitta diapazon so'rovi bilan
+# to'ldiriladi, shu jarayondagi o'zgarishlar mapper hodisasi orqali qo'shiladi.
+# Bir vaqtda chiqqan eslatmalar xodim bo'yicha bitta bildirishnomaga jamlanadi.
+
+OPEN_STATUSES = ("new", "in_progress")
+REMIND_BEFORE = timedelta(hours=24)
+HORIZON = timedelta(days=2)
+REFRESH_SEC = 600
+CATCH_UP_DAYS = 7       # bundan eski muddati o'tganlar uchun eslatma yuborilmaydi
+MAX_LISTED = 10         # bildirishnoma matnidagi topshiriqlar
+
+TITLES = {
+    "due_soon": "{n} ta topshiriq muddati yaqinlashmoqda",
+    "overdue": "{n} ta topshiriq muddati o'tdi",
+}
+
+
+def overdue_condition(today=None):
+    return and_(IjroTask.status.in_(OPEN_STATUSES), IjroTask.due_date < (today or date.today()))
+
+
+def fire_times(due_date, remind_before=REMIND_BEFORE):
+    due_at = datetime.combine(due_date, time.min)
+    return {"due_soon": due_at - remind_before, "overdue": due_at + timedelta(days=1)}
+
+
+# ---------- YETKAZISH ----------
+
+def deliver(entries, now=None):
+    # entries: [(task_id, kind, due_date)] — topshiriq hali ham ochiq va muddati
+    # o'zgarmagan bo'lsa, avval yuborilmagan eslatmalar bitta tranzaksiyada yoziladi
+    if not entries:
+        return 0
+    for _ in range(2):
+        try:
+            return _deliver(entries, now or datetime.utcnow())
+        except IntegrityError:
+            # boshqa jarayon shu eslatmalarning bir qismini yuborib ulgurdi
+            db.session.rollback()
+    return 0
+
+
+def _deliver(entries, now):
+    task_ids = {task_id for task_id, _, _ in entries}
+    tasks = {
+        row.id: row
+        for row in db.session.execute(
+            select(IjroTask.id, IjroTask.title, IjroTask.due_date, IjroTask.status, IjroTask.assigned_to_id)
+            .where(IjroTask.id.in_(task_ids))
+        )
+    }
+    sent = set(map(tuple, db.session.execute(
+        select(DeadlineReminder.task_id, DeadlineReminder.kind, DeadlineReminder.due_date)
+        .where(DeadlineReminder.task_id.in_(task_ids))
+    )))
+
+    fresh = []
+    for key in dict.fromkeys(entries):
+        task = tasks.get(key[0])
+        if (
+            key not in sent and task is not None and task.status in OPEN_STATUSES
+            and task.due_date == key[2] and task.assigned_to_id
+        ):
+            fresh.append((task, key[1]))
+    if not fresh:
+        db.session.commit()
+        return 0
+
+    db.session.execute(
+        DeadlineReminder.__table__.insert(),
+        [{"task_id": task.id, "kind": kind, "due_date": task.due_date, "sent_at": now} for task, kind in fresh],
+    )
+    batches = defaultdict(list)
+    for task, kind in fresh:
+        batches[(task.assigned_to_id, kind)].append(task)
+    db.session.execute(Notification.__table__.insert(), [_notification(user_id, kind, items, now)
+                                                         for (user_id, kind), items in batches.items()])
+    db.session.commit()
+    return len(batches)
+
+
+def _notification(user_id, kind, tasks, now):
+    tasks = sorted(tasks, key=lambda t: (t.due_date, t.id))
+    lines = [f"{t.due_date:%d.%m.%Y} — {t.title or f'#{t.id}'}" for t in tasks[:MAX_LISTED]]
+    if len(tasks) > MAX_LISTED:
+        lines.append(f"... yana {len(tasks) - MAX_LISTED} ta")
+    return {
+        "user_id": user_id,
+        "kind": kind,
+        "title": TITLES[kind].format(n=len(tasks)),
+        "body": "\n".join(lines),
+        "payload": json.dumps({"task_ids": [t.id for t in tasks]}),
+        "created_at": now,
+    }
+
+
+# ---------- REJALASHTIRUVCHI ----------
+
+class DeadlineScheduler:
+    def __init__(self, remind_before=REMIND_BEFORE, horizon=HORIZON,
+                 refresh_sec=REFRESH_SEC, catch_up_days=CATCH_UP_DAYS):
+        self.remind_before = remind_before
+        self.horizon = horizon
+        self.refresh_sec = refresh_sec
+        self.catch_up_days = catch_up_days
+        self._heap = []          # (fire_at, task_id, kind, due_date)
+        self._queued = set()     # heap'dagi (task_id, kind, due_date)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = None
+        self.running = False
+        self.sent = 0
+        self.last_refresh = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _push(self, rows, now, skip=()):
+        limit = now + self.horizon
+        added = 0
+        with self._lock:
+            for task_id, due_date in rows:
+                times = fire_times(due_date, self.remind_before)
+                for kind, fire_at in times.items():
+                    key = (task_id, kind, due_date)
+                    if kind == "due_soon" and times["overdue"] <= now:
+                        continue  # kechikib yuklangan: faqat "muddati o'tdi"
+                    if fire_at <= limit and key not in skip and key not in self._queued:
+                        heapq.heappush(self._heap, (fire_at, task_id, kind, due_date))
+                        self._queued.add(key)
+                        added += 1
+        return added
+
+    def push(self, task_id, due_date, now=None):
+        # horizon ichida chiqadigan eslatmalar; kechikkanlari darhol chiqadi
+        if due_date is None:
+            return 0
+        added = self._push([(task_id, due_date)], now or datetime.now())
+        if added:
+            self._wake.set()
+        return added
+
+    def refresh(self, now=None):
+        # muddati [bugun - catch_up, now + horizon + remind_before] oralig'idagi ochiq
+        # topshiriqlar: har bir ochiq status uchun (status, due_date) indeksida diapazon
+        now = now or datetime.now()
+        first = now.date() - timedelta(days=self.catch_up_days)
+        last = (now + self.horizon + self.remind_before).date()
+        rows = db.session.execute(
+            select(IjroTask.id, IjroTask.due_date).where(
+                IjroTask.status.in_(OPEN_STATUSES), IjroTask.due_date.between(first, last)
+            )
+        ).all()
+        sent = set(map(tuple, db.session.execute(
+            select(DeadlineReminder.task_id, DeadlineReminder.kind, DeadlineReminder.due_date)
+            .where(DeadlineReminder.due_date.between(first, last))
+        ))) if rows else set()
+        db.session.commit()
+
+        self.last_refresh = now
+        return self._push(rows, now, sent)
+
+    def pop_due(self, now=None):
+        now = now or datetime.now()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, task_id, kind, due_date = heapq.heappop(self._heap)
+                self._queued.discard((task_id, kind, due_date))
+                due.append((task_id, kind, due_date))
+        return due
+
+    def next_fire_at(self):
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def tick(self, now=None):
+        notified = deliver(self.pop_due(now))
+        self.sent += notified
+        return notified
+
+    def run_forever(self, app, stop_event=None):
+        stop_event = self._stop = stop_event or threading.Event()
+        self.running = True
+        next_refresh = datetime.now()
+        try:
+            while not stop_event.is_set():
+                now = datetime.now()
+                with app.app_context():
+                    try:
+                        if now >= next_refresh:
+                            self.refresh(now)
+                            next_refresh = now + timedelta(seconds=self.refresh_sec)
+                        self.tick(now)
+                    except Exception:
+                        db.session.rollback()
+                        app.logger.exception("Muddatlar rejalashtiruvchisida xato")
+                # eng yaqin eslatma yoki navbatdagi yangilanishgacha; push() uyg'otadi
+                wake_at = min(filter(None, (self.next_fire_at(), next_refresh)))
+                self._wake.wait(max(0.0, min((wake_at - datetime.now()).total_seconds(), self.refresh_sec)))
+                self._wake.clear()
+        finally:
+            self.running = False
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        self._wake.set()
+
+
+@event.listens_for(IjroTask, "after_insert")
+@event.listens_for(IjroTask, "after_update")
+def _task_changed(mapper, connection, target):
+    # shu jarayonda ishlayotgan rejalashtiruvchiga; yetkazishda holat qayta tekshiriladi
+    if not has_app_context() or target.due_date is None or target.status not in OPEN_STATUSES:
+        return
+    scheduler = current_app.extensions.get("deadlines")
+    if scheduler is not None and scheduler.running:
+        scheduler.push(target.id, target.due_date)
+
+
+def start_background_scheduler(app, scheduler):
+    # birinchi so'rovda, jarayonda bir marta (solar_poller.start_background_poller bilan bir xil)
+    started = app.extensions["deadline_threads"] = []
+    if not app.config.get("DEADLINE_SCHEDULER"):
+        return started
+    lock = threading.Lock()
+
+    @app.before_request
+    def _start_deadline_scheduler():
+        if started:
+            return
+        with lock:
+            if started:
+                return
+            thread = threading.Thread(target=scheduler.run_forever, args=(app,), name="deadlines", daemon=True)
+            thread.start()
+            started.append(thread)
+
+    return started
@@ -0,0 +1,204 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from models import db, User, Vehicle, Organization, OutsourceCompany, IjroTask
+
+
+# Katta jadvallar yield_per bilan bo'laklab o'qiladi va javob oqim sifatida
+# yuboriladi: xotira jadval hajmiga bog'liq emas, birinchi bayt darhol chiqadi.
+
+YIELD_PER = 1000
+FLUSH_ROWS = 500  # shuncha qatordan keyin bo'lak klientga yuboriladi
+
+_Assignee = aliased(User)
+
+# nom -> (sarlavhalar, SELECT)
+EXPORTS = {
+    "hr": (
+        ["ID", "Login", "Rol", "F.I.Sh.", "Lavozim", "Telefon", "Manzil", "Tug'ilgan sana",
+         "Pasport seriya", "Pasport raqam", "Berilgan sana", "Kim tomonidan",
+         "Diplom turi", "O'quv yurti", "Bitirgan yili"],
+        select(
+            User.id, User.username, User.role, User.full_name, User.position, User.phone,
+            User.address, User.birth_date, User.passport_series, User.passport_number,
+            User.passport_given_date, User.passport_given_by,
+            User.diploma_type, User.diploma_from, User.diploma_year,
+        ).order_by(User.id),
+    ),
+    "vehicles": (
+        ["ID", "Model", "Davlat raqami", "Haydovchi", "Oylik yoqilg'i limiti", "Oxirgi ta'mir", "Tashkilot"],
+        select(
+            Vehicle.id, Vehicle.model, Vehicle.plate_number, Vehicle.driver_full_name,
+            Vehicle.monthly_fuel_limit, Vehicle.last_repair_date, Organization.name,
+        ).outerjoin(Organization, Vehicle.organization_id == Organization.id).order_by(Vehicle.id),
+    ),
+    "contracts": (
+        ["ID", "Kompaniya", "Xizmat turi", "Shartnoma raqami", "Shartnoma sanasi", "Summa", "Izoh"],
+        select(
+            OutsourceCompany.id, OutsourceCompany.name, OutsourceCompany.service_type,
+            OutsourceCompany.contract_number, OutsourceCompany.contract_date,
+            OutsourceCompany.contract_amount, OutsourceCompany.comment,
+        ).order_by(OutsourceCompany.id),
+    ),
+    "tasks": (
+        ["ID", "Sarlavha", "Sana", "Muddat", "Holat", "Oxirgi o'zgarish", "Ijrochi"],
+        select(
+            IjroTask.id, IjroTask.title, IjroTask.date, IjroTask.due_date, IjroTask.status,
+            IjroTask.updated_at, _Assignee.full_name,
+        ).outerjoin(_Assignee, IjroTask.assigned_to_id == _Assignee.id).order_by(IjroTask.id),
+    ),
+}
+
+
+def _rows(name):
+    _, stmt = EXPORTS[name]
+    result = db.session.execute(stmt, execution_options={"yield_per": YIELD_PER, "stream_results": True})
+    for partition in result.partitions():
+        yield from partition
+
+
+# ---------- CSV ----------
+
+def stream_csv(name):
+    headers, _ = EXPORTS[name]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")  # Excel UTF-8'ni to'g'ri ochishi uchun BOM
+    writer.writerow(headers)
+    yield buf.getvalue().encode("utf-8")
+    buf.seek(0)
+    buf.truncate()
+
+    for i, row in enumerate(_rows(name), 1):
+        writer.writerow(row)
+        if i % FLUSH_ROWS == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+# ---------- XLSX ----------
+# Tashqi kutubxonasiz: zip oqimga yoziladi (data descriptor bilan),
+# varaq XML'i qator-qator, satrlar inlineStr sifatida.
+
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _workbook_xml(sheet_name):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, (int, float)):
+        return f'<c t="n"><v>{value}</v></c>'
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    text = _ILLEGAL_XML.sub("", str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _row_xml(values):
+    return "<row>" + "".join(_cell(v) for v in values) + "</row>"
+
+
+class _Pipe(io.RawIOBase):
+    # zipfile yozgan baytlarni yig'adi; generator ularni bo'lak-bo'lak oladi
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_xlsx(name):
+    headers, _ = EXPORTS[name]
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for part, xml in _STATIC_PARTS.items():
+            zf.writestr(part, xml)
+        zf.writestr("xl/workbook.xml", _workbook_xml(name))
+
+        # hajm oldindan noma'lum — zip64 majburiy
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_row_xml(headers).encode("utf-8"))
+            yield pipe.drain()
+            batch = []
+            for i, row in enumerate(_rows(name), 1):
+                batch.append(_row_xml(row))
+                if i % FLUSH_ROWS == 0:
+                    sheet.write("".join(batch).encode("utf-8"))
+                    batch = []
+                    chunk = pipe.drain()
+                    if chunk:
+                        yield chunk
+            sheet.write("".join(batch).encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+    yield pipe.drain()
+
+
+FORMATS = {
+    "csv": (stream_csv, "text/csv; charset=utf-8"),
+    "xlsx": (stream_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
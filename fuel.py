@@ -0,0 +1,300 @@
+import time
+from collections import defaultdict
+from datetime import date
+from itertools import islice
+
+from sqlalchemy import Date, and_, case, cast, delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, Vehicle, FuelLog, FuelMonthlyTotal
+import page_cache
+from solar_ingest import DEFAULT_CHUNK_SIZE, IngestStats, iter_records, parse_datetime
+
+
+# Har bir transport uchun oylik litr/summa FuelMonthlyTotal'da yuritiladi:
+# ORM orqali yozilsa mapper hodisalari, import paytida _write_chunk delta qo'shadi.
+# Limit tekshiruvi va ro'yxatlar tranzaksiyalarni emas, shu jadvalni o'qiydi.
+
+
+def month_start(d):
+    return date(d.year, d.month, 1)
+
+
+# ---------- INKREMENTAL YANGILASH ----------
+
+# deltas: {(vehicle_id, month): [liters, amount, fills]}
+def apply_deltas(connection, deltas):
+    rows = [
+        {"vehicle_id": vehicle_id, "month": month, "liters": liters, "amount": amount, "fills": fills}
+        for (vehicle_id, month), (liters, amount, fills) in deltas.items()
+        if vehicle_id is not None and month is not None and (liters or amount or fills)
+    ]
+    if not rows:
+        return
+    table = FuelMonthlyTotal.__table__
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["vehicle_id", "month"],
+        set_={
+            "liters": table.c.liters + stmt.excluded.liters,
+            "amount": table.c.amount + stmt.excluded.amount,
+            "fills": table.c.fills + stmt.excluded.fills,
+        },
+    )
+    connection.execute(stmt, rows)
+    # tashkilot sahifasi joriy oy sarfini ko'rsatadi
+    page_cache.bump_select(connection, "organization", select(Vehicle.organization_id).where(
+        Vehicle.id.in_({row["vehicle_id"] for row in rows})
+    ))
+
+
+def _add(deltas, vehicle_id, filled_at, liters, amount, sign):
+    if filled_at is None:
+        return
+    delta = deltas[(vehicle_id, month_start(filled_at))]
+    delta[0] += sign * (liters or 0)
+    delta[1] += sign * (amount or 0)
+    delta[2] += sign
+
+
+def _new_deltas():
+    return defaultdict(lambda: [0.0, 0.0, 0])
+
+
+@event.listens_for(FuelLog, "after_insert")
+def _log_inserted(mapper, connection, target):
+    deltas = _new_deltas()
+    _add(deltas, target.vehicle_id, target.filled_at, target.liters, target.amount, 1)
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(FuelLog, "after_delete")
+def _log_deleted(mapper, connection, target):
+    deltas = _new_deltas()
+    _add(deltas, target.vehicle_id, target.filled_at, target.liters, target.amount, -1)
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(FuelLog, "after_update")
+def _log_updated(mapper, connection, target):
+    state = inspect(target)
+    old = {}
+    for attr in ("vehicle_id", "filled_at", "liters", "amount"):
+        hist = state.attrs[attr].history
+        old[attr] = hist.deleted[0] if hist.deleted else getattr(target, attr)
+
+    deltas = _new_deltas()
+    _add(deltas, old["vehicle_id"], old["filled_at"], old["liters"], old["amount"], -1)
+    _add(deltas, target.vehicle_id, target.filled_at, target.liters, target.amount, 1)
+    apply_deltas(connection, deltas)
+
+
+# ---------- IMPORT ----------
+
+def normalize_plate(value):
+    return "".join(str(value or "").split()).upper()
+
+
+def parse_record(rec, vehicle_ids, plates):
+    if not isinstance(rec, dict):
+        raise ValueError("JSON obyekt emas")
+
+    vehicle_id = rec.get("vehicle_id")
+    if vehicle_id not in (None, ""):
+        try:
+            vehicle_id = int(vehicle_id)
+        except (TypeError, ValueError):
+            raise ValueError("vehicle_id noto'g'ri")
+        if vehicle_id not in vehicle_ids:
+            raise ValueError(f"vehicle_id={vehicle_id} topilmadi")
+    else:
+        plate = normalize_plate(rec.get("plate_number"))
+        if not plate:
+            raise ValueError("vehicle_id yoki plate_number kerak")
+        vehicle_id = plates.get(plate)
+        if vehicle_id is None:
+            raise ValueError(f"davlat raqami {plate} topilmadi")
+
+    try:
+        filled_at = parse_datetime(rec.get("filled_at"))
+    except (TypeError, ValueError):
+        raise ValueError("filled_at noto'g'ri (ISO 8601 kutiladi)")
+
+    try:
+        liters = float(rec.get("liters") or 0)
+        amount = float(rec.get("amount") or 0)
+    except (TypeError, ValueError):
+        raise ValueError("liters yoki amount son emas")
+    if liters <= 0:
+        raise ValueError("liters musbat bo'lishi kerak")
+    if amount < 0:
+        raise ValueError("amount manfiy")
+
+    return {
+        "vehicle_id": vehicle_id,
+        "filled_at": filled_at,
+        "liters": liters,
+        "amount": amount,
+        "station": (rec.get("station") or None),
+        "card_number": (rec.get("card_number") or None),
+        "transaction_id": (rec.get("transaction_id") or None),
+    }
+
+
+def _write_chunk(rows, stats):
+    connection = db.session.connection()
+
+    # bir xil kartadagi takroriy tranzaksiyalar — chunk ichida shu yerda, bazadagisi ON CONFLICT'da;
+    # RETURNING faqat shu tranzaksiya qo'shgan qatorlarni beradi (parallel import ikki marta sanalmaydi)
+    unique = {}
+    for row in rows:
+        unique.setdefault((row["vehicle_id"], row["filled_at"]), row)
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    inserted = connection.execute(
+        dialect.insert(FuelLog.__table__)
+        .on_conflict_do_nothing(index_elements=["vehicle_id", "filled_at"])
+        .returning(FuelLog.vehicle_id, FuelLog.filled_at, FuelLog.liters, FuelLog.amount),
+        list(unique.values()),
+    ).all()
+    stats.duplicates += len(rows) - len(inserted)
+
+    if inserted:
+        deltas = _new_deltas()
+        for vehicle_id, filled_at, liters, amount in inserted:
+            _add(deltas, vehicle_id, filled_at, liters, amount, 1)
+        apply_deltas(connection, deltas)
+        stats.inserted += len(inserted)
+
+    db.session.commit()
+
+
+def ingest(stream, fmt="csv", chunk_size=DEFAULT_CHUNK_SIZE):
+    stats = IngestStats()
+    vehicle_ids = set()
+    plates = {}
+    for vehicle_id, plate in db.session.execute(select(Vehicle.id, Vehicle.plate_number)):
+        vehicle_ids.add(vehicle_id)
+        if plate:
+            plates.setdefault(normalize_plate(plate), vehicle_id)
+
+    records = iter_records(stream, fmt)
+    while True:
+        batch = list(islice(records, chunk_size))
+        if not batch:
+            break
+        rows = []
+        for line_no, rec in batch:
+            stats.read += 1
+            try:
+                rows.append(parse_record(rec, vehicle_ids, plates))
+            except ValueError as e:
+                stats.error(line_no, str(e))
+        if rows:
+            _write_chunk(rows, stats)
+
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+
+# ---------- BACKFILL ----------
+
+def rebuild_totals():
+    if db.session.get_bind().dialect.name == "postgresql":
+        month = cast(func.date_trunc("month", FuelLog.filled_at), Date)
+    else:
+        month = func.date(FuelLog.filled_at, "start of month")
+    db.session.execute(delete(FuelMonthlyTotal))
+    db.session.execute(
+        FuelMonthlyTotal.__table__.insert().from_select(
+            ["vehicle_id", "month", "liters", "amount", "fills"],
+            select(
+                FuelLog.vehicle_id,
+                month,
+                func.coalesce(func.sum(FuelLog.liters), 0),
+                func.coalesce(func.sum(FuelLog.amount), 0),
+                func.count(FuelLog.id),
+            ).group_by(FuelLog.vehicle_id, month),
+        )
+    )
+    rows = db.session.scalar(select(func.count(FuelMonthlyTotal.id)))
+    page_cache.bump(db.session.connection(), [("organization", 0)])
+    db.session.commit()
+    return rows
+
+
+# ---------- O'QISH ----------
+
+def vehicle_usage(vehicle_ids, month=None):
+    # sahifadagi transportlar uchun: {vehicle_id: FuelMonthlyTotal}
+    month = month or month_start(date.today())
+    if not vehicle_ids:
+        return {}
+    rows = db.session.scalars(
+        select(FuelMonthlyTotal).where(
+            FuelMonthlyTotal.month == month, FuelMonthlyTotal.vehicle_id.in_(vehicle_ids)
+        )
+    )
+    return {row.vehicle_id: row for row in rows}
+
+
+def fleet_overview(month=None):
+    month = month or month_start(date.today())
+    limit = Vehicle.monthly_fuel_limit
+    row = db.session.execute(
+        select(
+            func.count(FuelMonthlyTotal.id),
+            func.coalesce(func.sum(FuelMonthlyTotal.liters), 0),
+            func.coalesce(func.sum(FuelMonthlyTotal.amount), 0),
+            func.coalesce(func.sum(case((and_(limit > 0, FuelMonthlyTotal.liters > limit), 1), else_=0)), 0),
+        )
+        .join(Vehicle, Vehicle.id == FuelMonthlyTotal.vehicle_id)
+        .where(FuelMonthlyTotal.month == month)
+    ).one()
+    return {
+        "month": month,
+        "vehicles": row[0],
+        "liters": float(row[1]),
+        "amount": float(row[2]),
+        "over_limit": int(row[3]),
+    }
+
+
+def over_limit(month=None, limit=100):
+    month = month or month_start(date.today())
+    return db.session.execute(
+        select(Vehicle, FuelMonthlyTotal.liters)
+        .join(FuelMonthlyTotal, FuelMonthlyTotal.vehicle_id == Vehicle.id)
+        .where(
+            FuelMonthlyTotal.month == month,
+            Vehicle.monthly_fuel_limit > 0,
+            FuelMonthlyTotal.liters > Vehicle.monthly_fuel_limit,
+        )
+        .order_by((FuelMonthlyTotal.liters - Vehicle.monthly_fuel_limit).desc())
+        .limit(limit)
+    ).all()
+
+
+def organization_usage(org_ids=None, month=None):
+    # tashkilot bo'yicha: {org_id: {"liters", "amount", "limit", "vehicles"}} — transportlar soniga proporsional
+    month = month or month_start(date.today())
+    query = (
+        select(
+            Vehicle.organization_id,
+            func.count(FuelMonthlyTotal.id),
+            func.coalesce(func.sum(FuelMonthlyTotal.liters), 0),
+            func.coalesce(func.sum(FuelMonthlyTotal.amount), 0),
+            func.coalesce(func.sum(Vehicle.monthly_fuel_limit), 0),
+        )
+        .join(FuelMonthlyTotal, FuelMonthlyTotal.vehicle_id == Vehicle.id)
+        .where(FuelMonthlyTotal.month == month, Vehicle.organization_id.isnot(None))
+        .group_by(Vehicle.organization_id)
+    )
+    if org_ids is not None:
+        if not org_ids:
+            return {}
+        query = query.where(Vehicle.organization_id.in_(org_ids))
+    return {
+        org_id: {"vehicles": n, "liters": float(liters), "amount": float(amount), "limit": float(lim)}
+        for org_id, n, liters, amount, lim in db.session.execute(query)
+    }
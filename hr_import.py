@@ -0,0 +1,301 @@
+import csv
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from itertools import islice
+
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+import search
+from auth import forget_users
+from models import db, User
+import page_cache
+from passwords import hasher
+from solar_ingest import IngestStats
+
+
+# Xodimlarni CSV'dan ommaviy qo'shish/yangilash, kalit — username.
+# 1-o'tish: har bir qator tekshiriladi, fayl ichidagi takroriy username/pasport
+# va bazadagi to'qnashuvlar topiladi, farqlar hisoblanadi — hech narsa yozilmaydi.
+# Xato bo'lmasa (va dry-run emas) 2-o'tish chunk'lab Core INSERT/UPDATE qiladi:
+# har chunk — bitta tranzaksiya; qidiruv indeksi va auth kesh shu yerda yangilanadi.
+# 2-o'tishda xato chiqsa (1-o'tishdan keyingi parallel o'zgarish) oldingi chunk'lar
+# yozilib bo'lgan — hisobotdagi committed aynan bazaga tushgan qatorlar soni.
+# Bo'sh katak mavjud qiymatni o'zgartirmaydi; password faqat yangi xodimga
+# qo'yiladi. Import faqat role=employee yozuvlarga tegadi; qayta ishga
+# tushirish xavfsiz (upsert).
+
+DEFAULT_CHUNK_SIZE = 2000
+MAX_REPORTED_CHANGES = 200
+HASH_THREADS = os.cpu_count() or 1   # hashlib scrypt/pbkdf2 GIL'ni qo'yib yuboradi
+
+# ustun -> maksimal uzunlik (models.User bilan bir xil)
+FIELDS = {
+    "full_name": 120,
+    "position": 120,
+    "phone": 64,
+    "address": 200,
+    "birth_date": 20,
+    "passport_series": 10,
+    "passport_number": 20,
+    "passport_given_date": 20,
+    "passport_given_by": 200,
+    "diploma_type": 200,
+    "diploma_from": 200,
+    "diploma_year": 10,
+}
+DATE_FIELDS = ("birth_date", "passport_given_date")
+# export (exports.py "hr") ustunlari ham qabul qilinadi, lekin e'tiborsiz
+IGNORED_COLUMNS = ("id", "role")
+
+USERNAME_RE = re.compile(r"^[A-Za-z0-9_.@-]{1,64}$")
+_COLUMNS = [User.id, User.username, User.role] + [getattr(User, f) for f in FIELDS]
+
+
+class ImportReport(IngestStats):
+    def __init__(self, dry_run):
+        super().__init__()
+        self.dry_run = dry_run
+        self.applied = False
+        self.committed = 0  # 2-o'tishda commit qilingan qatorlar
+        self.updated = 0
+        self.unchanged = 0
+        self.changes = []
+        self.ignored_columns = []
+
+    def change(self, line_no, username, action, fields):
+        if len(self.changes) < MAX_REPORTED_CHANGES:
+            self.changes.append({"line": line_no, "username": username, "action": action, "fields": fields})
+
+    def as_dict(self):
+        return {
+            "dry_run": self.dry_run,
+            "applied": self.applied,
+            "committed": self.committed,
+            "read": self.read,
+            "created": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "invalid": self.invalid,
+            "errors": self.errors,
+            "changes": self.changes,
+            "ignored_columns": self.ignored_columns,
+            "elapsed_sec": round(self.elapsed, 3),
+            "rows_per_sec": self.rows_per_sec,
+        }
+
+
+# ---------- TEKSHIRISH ----------
+
+def _parse_date(value):
+    if "." in value:
+        return datetime.strptime(value, "%d.%m.%Y").date().isoformat()
+    return date.fromisoformat(value).isoformat()
+
+
+def clean_record(rec):
+    # faqat to'ldirilgan kataklar qaytadi: {"username", "password"?, maydonlar...}
+    username = (rec.get("username") or "").strip()
+    if not USERNAME_RE.match(username):
+        raise ValueError("username bo'sh yoki noto'g'ri")
+    values = {"username": username}
+
+    password = rec.get("password") or ""
+    if password:
+        values["password"] = password
+
+    for field, max_len in FIELDS.items():
+        value = (rec.get(field) or "").strip()
+        if not value:
+            continue
+        if len(value) > max_len:
+            raise ValueError(f"{field} {max_len} belgidan uzun")
+        values[field] = value
+
+    for field in DATE_FIELDS:
+        if field in values:
+            try:
+                values[field] = _parse_date(values[field])
+            except ValueError:
+                raise ValueError(f"{field} noto'g'ri (YYYY-MM-DD yoki DD.MM.YYYY)")
+    if "passport_series" in values:
+        values["passport_series"] = values["passport_series"].upper()
+        if not values["passport_series"].isalpha():
+            raise ValueError("passport_series faqat harflardan iborat bo'lishi kerak")
+    if "passport_number" in values and not values["passport_number"].isdigit():
+        raise ValueError("passport_number faqat raqamlardan iborat bo'lishi kerak")
+    if "diploma_year" in values:
+        year = values["diploma_year"]
+        if not (year.isdigit() and 1950 <= int(year) <= date.today().year):
+            raise ValueError("diploma_year noto'g'ri")
+    return values
+
+
+def _passport(values):
+    if values.get("passport_series") and values.get("passport_number"):
+        return values["passport_series"], values["passport_number"]
+    return None
+
+
+def _open_reader(f, report):
+    # Excel'dan saqlangan fayllarda ajratuvchi ko'pincha ";"
+    header = f.readline()
+    f.seek(0)
+    reader = csv.DictReader(f, delimiter=";" if header.count(";") > header.count(",") else ",")
+    reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames or ()]
+    if "username" not in reader.fieldnames:
+        raise ValueError("username ustuni yo'q")
+    known = set(FIELDS) | {"username", "password"} | set(IGNORED_COLUMNS)
+    report.ignored_columns = [name for name in reader.fieldnames if name not in known]
+    return reader
+
+
+# ---------- CHUNK ----------
+
+def _process_chunk(batch, seen, report, write, hash_many):
+    rows = []
+    for line_no, rec in batch:
+        report.read += 1
+        try:
+            values = clean_record(rec)
+        except ValueError as e:
+            report.error(line_no, str(e))
+            continue
+        username = values["username"]
+        first = seen["usernames"].setdefault(username, line_no)
+        if first != line_no:
+            report.error(line_no, f"{username} takroriy ({first}-qatorda ham bor)")
+            continue
+        passport = _passport(values)
+        if passport:
+            other = seen["passports"].setdefault(passport, username)
+            if other != username:
+                report.error(line_no, f"pasport {''.join(passport)} {other} bilan takroriy")
+                continue
+        rows.append((line_no, values, passport))
+    if not rows:
+        return
+
+    existing = {
+        row.username: row
+        for row in db.session.execute(
+            select(*_COLUMNS).where(User.username.in_([values["username"] for _, values, _ in rows]))
+        )
+    }
+    numbers = {passport[1] for _, _, passport in rows if passport}
+    holders = {
+        (row.passport_series, row.passport_number): row.username
+        for row in db.session.execute(
+            select(User.username, User.passport_series, User.passport_number)
+            .where(User.passport_number.in_(numbers))
+        )
+    } if numbers else {}
+
+    inserts, updates = [], []
+    for line_no, values, passport in rows:
+        username = values["username"]
+        old = existing.get(username)
+        holder = holders.get(passport)
+        if holder and holder != username:
+            report.error(line_no, f"pasport bazada {holder} xodimiga tegishli")
+            continue
+        if old is None:
+            if "password" not in values:
+                report.error(line_no, "yangi xodim uchun password kerak")
+                continue
+            inserts.append(values)
+            report.inserted += 1
+            report.change(line_no, username, "create", {f: [None, v] for f, v in values.items() if f in FIELDS})
+            continue
+        if old.role != "employee":
+            report.error(line_no, f"{username} — {old.role}, import faqat xodimlarni yangilaydi")
+            continue
+        # password faqat yangi xodim uchun — qayta import parollarni tiklamaydi
+        diff = {f: [getattr(old, f), v] for f, v in values.items() if f in FIELDS and getattr(old, f) != v}
+        if diff:
+            updates.append((old.id, values))
+            report.updated += 1
+            report.change(line_no, username, "update", diff)
+        else:
+            report.unchanged += 1
+
+    if write:
+        _write(inserts, updates, hash_many)
+        report.committed += len(inserts) + len(updates)
+
+
+def _write(inserts, updates, hash_many):
+    if not inserts and not updates:
+        return
+    connection = db.session.connection()
+    table = User.__table__
+
+    if inserts:
+        hashed = hash_many([values["password"] for values in inserts])
+        connection.execute(table.insert(), [
+            {"username": values["username"], "password": password, "role": "employee",
+             **{f: values.get(f) for f in FIELDS}}
+            for values, password in zip(inserts, hashed)
+        ])
+    if updates:
+        # bitta executemany: berilmagan maydon NULL bind — coalesce eski qiymatni qoldiradi
+        connection.execute(
+            table.update()
+            .where(table.c.id == bindparam("b_id"))
+            .values(**{f: func.coalesce(bindparam(f"b_{f}"), table.c[f]) for f in FIELDS}),
+            [{"b_id": user_id, **{f"b_{f}": values.get(f) for f in FIELDS}} for user_id, values in updates],
+        )
+
+    usernames = [values["username"] for values in inserts] + [values["username"] for _, values in updates]
+    written = db.session.execute(
+        select(User.id, User.username, User.full_name, User.position, User.phone,
+               User.passport_series, User.passport_number)
+        .where(User.username.in_(usernames))
+    ).all()
+    search.index_documents(connection, "user", written)
+    page_cache.bump(connection, [("user", row.id) for row in written] + [("users", 0)])
+    db.session.commit()
+    forget_users([user_id for user_id, _ in updates])
+
+
+def _run(path, report, chunk_size, write, hash_many=None):
+    seen = {"usernames": {}, "passports": {}}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        try:
+            reader = _open_reader(f, report)
+        except ValueError as e:
+            report.error(1, str(e))
+            return report
+        records = enumerate(reader, start=2)
+        while True:
+            batch = list(islice(records, chunk_size))
+            if not batch:
+                break
+            try:
+                _process_chunk(batch, seen, report, write, hash_many)
+            except SQLAlchemyError as e:
+                # faqat shu chunk bekor; to'xtatamiz — keyingilari ham to'qnashishi mumkin
+                db.session.rollback()
+                report.error(batch[0][0], f"{batch[-1][0]}-qatorgacha yozilmadi: {e.__class__.__name__}")
+                break
+    db.session.commit()
+    return report
+
+
+def import_users(path, dry_run=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    # xotirada faqat username/pasport to'plamlari va bitta chunk turadi
+    report = _run(path, ImportReport(dry_run), chunk_size, write=False)
+    if not dry_run and not report.invalid and (report.inserted or report.updated):
+        # baza 1-o'tishdan beri o'zgargan bo'lishi mumkin — farqlar qayta hisoblanadi
+        started = report.started
+        h = hasher()
+        with ThreadPoolExecutor(max_workers=HASH_THREADS) as pool:
+            report = _run(path, ImportReport(False), chunk_size, write=True,
+                          hash_many=lambda passwords: list(pool.map(h.hash, passwords)))
+        report.started = started
+    report.applied = not dry_run and not report.invalid
+    report.elapsed = time.perf_counter() - report.started
+    return report
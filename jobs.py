@@ -0,0 +1,372 @@
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from auth import prune_sessions
+from fuel import rebuild_totals as rebuild_fuel_totals
+from hr_import import import_users
+from models import db, Job, User, Vehicle, HRDocument
+import orgtech_history
+from outsourcing_analytics import rebuild_summary as rebuild_outsourcing_summary
+from search import rebuild_index as rebuild_search_index
+from solar_rollup import rebuild_rollups
+from uploads import store_spooled, discard_spooled, make_thumbnail
+
+
+# Bazadagi (job jadvali) oddiy navbat: so'rov enqueue() qiladi va darhol javob
+# qaytaradi, worker jarayonlari claim() bilan vazifani shartli UPDATE orqali
+# egallaydi. Xato bo'lsa eksponensial kutish bilan max_attempts martagacha
+# qayta uriniladi; worker o'lsa LEASE_SEC'dan keyin vazifa boshqasiga o'tadi.
+
+DEFAULT_MAX_ATTEMPTS = 3
+BACKOFF_BASE = 10.0     # sekund: 10, 20, 40 ...
+BACKOFF_MAX = 15 * 60.0
+LEASE_SEC = 10 * 60
+POLL_INTERVAL = 1.0
+ERROR_TAIL = 4000       # traceback'ning oxirgi belgilari
+
+HANDLERS = {}           # kind -> (funksiya, max_attempts)
+
+
+def handler(kind, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    def decorator(f):
+        HANDLERS[kind] = (f, max_attempts)
+        return f
+    return decorator
+
+
+def as_dict(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after.isoformat() if job.run_after else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error.strip().splitlines()[-1] if job.error else None,
+    }
+
+
+# ---------- NAVBATGA QO'YISH ----------
+
+def find_job(key):
+    if not key:
+        return None
+    return db.session.scalar(select(Job).where(Job.idempotency_key == key))
+
+
+def enqueue(kind, payload=None, key=None, created_by_id=None, delay=0):
+    # sessiyadagi boshqa o'zgarishlar bilan bitta commit'da yoziladi.
+    # (job, True) — yangi; (job, False) — shu kalit bilan avval qo'yilgan
+    if kind not in HANDLERS:
+        raise ValueError(f"Noma'lum vazifa turi: {kind}")
+    existing = find_job(key)
+    if existing is not None:
+        return existing, False
+
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        idempotency_key=key,
+        max_attempts=HANDLERS[kind][1],
+        run_after=datetime.utcnow() + timedelta(seconds=delay),
+        created_by_id=created_by_id,
+    )
+    db.session.add(job)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # parallel so'rov xuddi shu kalitni birinchi yozib ulgurdi
+        db.session.rollback()
+        return find_job(key), False
+    return job, True
+
+
+def counts():
+    return dict(db.session.execute(select(Job.status, func.count(Job.id)).group_by(Job.status)).all())
+
+
+def prune(days=7):
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = db.session.execute(
+        delete(Job).where(Job.status.in_(("done", "failed")), Job.finished_at < cutoff)
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+# ---------- WORKER ----------
+
+def claim(worker_id):
+    now = datetime.utcnow()
+    claimable = or_(
+        and_(Job.status == "queued", Job.run_after <= now),
+        and_(Job.status == "running", Job.locked_at < now - timedelta(seconds=LEASE_SEC)),
+    )
+    for _ in range(5):
+        job_id = db.session.scalar(
+            select(Job.id).where(claimable).order_by(Job.run_after, Job.id).limit(1)
+        )
+        if job_id is None:
+            db.session.commit()
+            return None
+        # boshqa worker ulgurgan bo'lsa rowcount 0 — keyingisini olamiz
+        taken = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, claimable)
+            .values(status="running", locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+        ).rowcount
+        db.session.commit()
+        if taken:
+            return db.session.get(Job, job_id)
+    return None
+
+
+def _finish(job_id, **values):
+    db.session.execute(update(Job).where(Job.id == job_id).values(locked_by=None, **values))
+    db.session.commit()
+
+
+def run_job(job):
+    job_id, kind, attempts, max_attempts = job.id, job.kind, job.attempts, job.max_attempts
+    func_, _ = HANDLERS.get(kind, (None, 0))
+    payload = json.loads(job.payload or "{}")
+    try:
+        if func_ is None:
+            raise LookupError(f"Noma'lum vazifa turi: {kind}")
+        if attempts > max_attempts:
+            raise TimeoutError("worker javob bermadi (lease tugadi)")
+        result = func_(**payload)
+    except Exception:
+        db.session.rollback()
+        error = traceback.format_exc()[-ERROR_TAIL:]
+        if attempts >= max_attempts or func_ is None:
+            _finish(job_id, status="failed", error=error, finished_at=datetime.utcnow())
+        else:
+            delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+            _finish(job_id, status="queued", error=error, run_after=datetime.utcnow() + timedelta(seconds=delay))
+        current_app.logger.warning("Vazifa #%s (%s) xato: %s", job_id, kind, error.strip().splitlines()[-1])
+        return False
+    _finish(
+        job_id, status="done", error=None, finished_at=datetime.utcnow(),
+        result=json.dumps(result) if result is not None else None,
+    )
+    return True
+
+
+def work(app, worker_id=None, stop_event=None, burst=False):
+    # burst=True: navbat bo'shagach qaytadi (CLI --burst, testlar)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    stop_event = stop_event or threading.Event()
+    done = 0
+    while not stop_event.is_set():
+        with app.app_context():
+            try:
+                job = claim(worker_id)
+                if job is not None:
+                    run_job(job)
+                    done += 1
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Vazifa worker'ida xato")
+                job = None
+        if job is None:
+            if burst:
+                break
+            stop_event.wait(POLL_INTERVAL)
+    return done
+
+
+def _process_main(overrides, stop_event):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # to'xtatishni ota jarayon boshqaradi
+    # solar poller, muddatlar va ichki worker oqimlari faqat web jarayonida
+    os.environ["SOLAR_POLL_INTERVAL"] = "0"
+    os.environ["JOB_WORKER_THREADS"] = "0"
+    os.environ["DEADLINE_SCHEDULER"] = "0"
+    from app import create_app
+
+    app = create_app(**overrides)
+    work(app, stop_event=stop_event)
+
+
+def run_pool(processes, overrides=None):
+    # har bir jarayon o'z app'i va ulanish pulini yaratadi (spawn — fork'dan meros yo'q)
+    ctx = multiprocessing.get_context("spawn")
+    stop_event = ctx.Event()
+    workers = [
+        ctx.Process(target=_process_main, args=(overrides or {}, stop_event), name=f"jobs-{i}")
+        for i in range(processes)
+    ]
+    for p in workers:
+        p.start()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    try:
+        while any(p.is_alive() for p in workers) and not stop_event.is_set():
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    stop_event.set()
+    for p in workers:
+        p.join(timeout=LEASE_SEC)
+
+
+def start_background_workers(app):
+    # alohida worker jarayoni bo'lmasa ham yuklamalar ishlansin — web jarayonida oqimlar.
+    # Birinchi so'rovda ishga tushadi: CLI buyruqlari (db-upgrade, hr-import ...) oqimsiz
+    # qoladi, gunicorn --preload'da esa oqimlar fork'dan keyin har bir worker'da yaratiladi
+    threads = app.config.get("JOB_WORKER_THREADS", 0)
+    started = app.extensions["job_workers"] = []
+    if not threads:
+        return started
+    lock = threading.Lock()
+
+    @app.before_request
+    def _start_job_workers():
+        if started:
+            return
+        with lock:
+            if started:
+                return
+            schedule_daily()
+            for i in range(threads):
+                thread = threading.Thread(target=work, args=(app,), name=f"jobs-{i}", daemon=True)
+                thread.start()
+                started.append(thread)
+
+    return started
+
+
+# ---------- VAZIFALAR ----------
+
+@handler("hr_uploads")
+def hr_uploads(user_id, docs=(), photo=None):
+    folder = current_app.config["UPLOAD_FOLDER"]
+    stored = [(store_spooled(path, name, folder), name) for path, name in docs]
+    # qayta urinishda allaqachon yozilgan hujjatlar takrorlanmaydi
+    existing = set(db.session.scalars(
+        select(HRDocument.filename).where(
+            HRDocument.user_id == user_id, HRDocument.filename.in_([rel for rel, _ in stored])
+        )
+    ))
+    for rel, name in stored:
+        if rel not in existing:
+            db.session.add(HRDocument(filename=rel, original_name=name, user_id=user_id))
+            existing.add(rel)
+    result = {"documents": len(stored)}
+    if photo:
+        result.update(_store_photo(User, user_id, *photo))  # commit shu yerda
+    db.session.commit()
+    discard_spooled(*(path for path, _ in docs))
+    return result
+
+
+@handler("hr_import", max_attempts=1)
+def hr_import(path):
+    # tekshiruv qayta o'tadi; yarim qolsa qayta yuborish xavfsiz (upsert)
+    try:
+        return import_users(path).as_dict()
+    finally:
+        discard_spooled(path)
+
+
+def _store_photo(model, object_id, path, name):
+    folder = current_app.config["UPLOAD_FOLDER"]
+    rel = store_spooled(path, name, folder)
+    obj = db.session.get(model, object_id)
+    if obj is not None:
+        obj.photo = rel
+        db.session.commit()
+    try:
+        make_thumbnail(folder, rel)
+    except Exception as e:  # buzuq rasm — asl fayl ko'rsatiladi, vazifa qayta urinilmaydi
+        current_app.logger.warning("Thumbnail yaratilmadi (%s): %s", rel, e)
+    discard_spooled(path)
+    return {"photo": rel}
+
+
+@handler("vehicle_photo")
+def vehicle_photo(vehicle_id, path, name):
+    return _store_photo(Vehicle, vehicle_id, path, name)
+
+
+# xizmat vazifalari — POST /jobs/<kind> orqali ham qo'yiladi
+MAINTENANCE = {}
+
+
+def maintenance(kind):
+    def decorator(f):
+        MAINTENANCE[kind] = f
+        return handler(kind, max_attempts=1)(f)
+    return decorator
+
+
+@maintenance("rebuild_solar_rollups")
+def _rebuild_solar_rollups():
+    return {"days": rebuild_rollups()}
+
+
+@maintenance("rebuild_search")
+def _rebuild_search():
+    return {"documents": rebuild_search_index()}
+
+
+@maintenance("rebuild_fuel_totals")
+def _rebuild_fuel_totals():
+    return {"rows": rebuild_fuel_totals()}
+
+
+@maintenance("rebuild_outsourcing_summary")
+def _rebuild_outsourcing_summary():
+    return {"rows": rebuild_outsourcing_summary()}
+
+
+@maintenance("poll_solar")
+def _poll_solar():
+    return current_app.extensions["solar_poller"].poll_once()
+
+
+@maintenance("orgtech_snapshot")
+def _orgtech_snapshot():
+    days = orgtech_history.take_snapshots()
+    schedule_orgtech_snapshot()
+    return {"days": days}
+
+
+@maintenance("prune_auth_sessions")
+def _prune_auth_sessions():
+    deleted = prune_sessions()
+    schedule_session_prune()
+    return {"sessions": deleted}
+
+
+def schedule_orgtech_snapshot():
+    # kuniga bitta: kalit — ishga tushish sanasi, qayta chaqirish yangi vazifa yaratmaydi
+    at = orgtech_history.next_snapshot_at()
+    delay = max(0.0, (at - datetime.utcnow()).total_seconds())
+    return enqueue("orgtech_snapshot", key=f"orgtech_snapshot:{at:%Y-%m-%d}", delay=delay)
+
+
+def schedule_session_prune():
+    # kuniga bitta, UTC yarim tunda; kalit — sana (idempotent)
+    at = datetime.combine(datetime.utcnow().date() + timedelta(days=1), datetime.min.time())
+    delay = max(0.0, (at - datetime.utcnow()).total_seconds())
+    return enqueue("prune_auth_sessions", key=f"prune_auth_sessions:{at:%Y-%m-%d}", delay=delay)
+
+
+def schedule_daily():
+    # kunlik vazifalar navbatda bo'lishi uchun (idempotent) — worker ishga tushganda
+    schedule_orgtech_snapshot()
+    schedule_session_prune()
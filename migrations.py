@@ -0,0 +1,253 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, inspect, literal, select, text, update
+from sqlalchemy.schema import CreateIndex
+
+from config import Config
+from models import db, User, AuthSession, OrgTech, OrgTechEvent
+import orgtech_history
+import outsourcing_analytics
+import solar_rollup
+from passwords import hash_password
+import search
+
+
+# Versiyalangan sxema migratsiyalari. Har biri bir marta, tartib bilan bajariladi;
+# qo'llangan versiyalar schema_migrations jadvalida saqlanadi. Yangi ustun/indeks
+# qo'shilganda shu ro'yxatning oxiriga yangi funksiya yoziladi.
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+def _add_column(conn, table, column):
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        col = db.metadata.tables[table].c[column]
+        col_type = col.type.compile(conn.dialect)
+        conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {col_type}'))
+
+
+def _create_index(conn, table, name):
+    # IF NOT EXISTS: checkfirst reflektsiyasi ifodali indekslarni ko'rmaydi
+    index = next(i for i in db.metadata.tables[table].indexes if i.name == name)
+    conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _has_unique(conn, table, columns):
+    inspector = inspect(conn)
+    found = [c["column_names"] for c in inspector.get_unique_constraints(table)]
+    found += [i["column_names"] for i in inspector.get_indexes(table) if i["unique"]]
+    return list(columns) in found
+
+
+def m001_baseline(conn):
+    # yangi bazada barcha jadvallar; eski bazada faqat yetishmayotganlari
+    db.metadata.create_all(conn)
+
+
+def m002_added_columns(conn):
+    _add_column(conn, "ijro_task", "updated_at")
+    _add_column(conn, "hr_document", "original_name")
+
+
+def m003_list_indexes(conn):
+    _create_index(conn, "user", "ix_user_role_id")
+    _create_index(conn, "ijro_task", "ix_ijro_task_date_id")
+
+
+def m004_search_index(conn):
+    search.ensure_index(conn)
+    search.rebuild_index(conn)
+
+
+def m005_hot_path_indexes(conn):
+    # User.role va IjroTask.date (role, id) / (date, id) kompozit indekslarining prefiksi bilan qoplangan
+    # m012 (status, due_date) bilan almashtirilgan — models.py'da endi yo'q
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ijro_task_status ON ijro_task (status)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ijro_task_assigned_to_id ON ijro_task (assigned_to_id)"))
+    _create_index(conn, "solar_reading", "ix_solar_reading_site_date")
+
+
+def m006_employee_summary_indexes(conn):
+    # ikkala indeks ham assigned_to_id bilan boshlanadi — alohida indeks ortiqcha
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ijro_task_assignee_status ON ijro_task (assigned_to_id, status)"))
+    _create_index(conn, "ijro_task", "ix_ijro_task_assignee_date")
+    conn.execute(text("DROP INDEX IF EXISTS ix_ijro_task_assigned_to_id"))
+
+
+def m007_auth_sessions(conn):
+    db.metadata.tables["auth_session"].create(conn, checkfirst=True)
+
+
+def m008_outsourcing_analytics(conn):
+    _add_column(conn, "outsource_company", "contract_end_date")
+    _create_index(conn, "outsource_company", "ix_outsource_company_contract_end_date")
+    db.metadata.tables["outsource_summary"].create(conn, checkfirst=True)
+    outsourcing_analytics.rebuild_summary(conn)
+
+
+def m009_fuel_log(conn):
+    db.metadata.tables["fuel_log"].create(conn, checkfirst=True)
+    db.metadata.tables["fuel_monthly_total"].create(conn, checkfirst=True)
+
+
+def m010_jobs(conn):
+    db.metadata.tables["job"].create(conn, checkfirst=True)
+
+
+def m011_orgtech_history(conn):
+    db.metadata.tables["org_tech_event"].create(conn, checkfirst=True)
+    db.metadata.tables["org_tech_status_snapshot"].create(conn, checkfirst=True)
+    # mavjud qurilmalar uchun boshlang'ich yozuv: avvalgi tarix saqlanmagan,
+    # eng yaqin ma'lum vaqt — last_update
+    conn.execute(
+        OrgTechEvent.__table__.insert().from_select(
+            ["item_id", "ts", "kind", "to_status", "to_user_id"],
+            select(
+                OrgTech.id,
+                func.coalesce(OrgTech.last_update, datetime.utcnow()),
+                literal("created"),
+                OrgTech.status,
+                OrgTech.assigned_to_id,
+            ).where(~OrgTech.id.in_(select(OrgTechEvent.item_id))),
+        )
+    )
+    orgtech_history.rebuild_snapshots(conn)
+
+
+def m012_deadlines(conn):
+    # muddat bo'yicha diapazon va xodim panelidagi "muddati o'tgan" soni uchun;
+    # eski indekslar yangilarining prefiksi
+    _create_index(conn, "ijro_task", "ix_ijro_task_status_due")
+    _create_index(conn, "ijro_task", "ix_ijro_task_assignee_status_due")
+    conn.execute(text("DROP INDEX IF EXISTS ix_ijro_task_status"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_ijro_task_assignee_status"))
+    db.metadata.tables["deadline_reminder"].create(conn, checkfirst=True)
+    db.metadata.tables["notification"].create(conn, checkfirst=True)
+
+
+def m013_password_hashes(conn):
+    # scrypt xeshi ~160 belgi; SQLite VARCHAR uzunligini tekshirmaydi
+    if conn.dialect.name == "postgresql":
+        conn.execute(text('ALTER TABLE "user" ALTER COLUMN password TYPE VARCHAR(255)'))
+
+
+def m014_hr_import(conn):
+    _create_index(conn, "user", "ix_user_passport_number")
+
+
+def m015_page_cache(conn):
+    db.metadata.tables["object_version"].create(conn, checkfirst=True)
+
+
+def m016_solar_reading_unique(conn):
+    # create_all'siz yaratilgan bazalarda (site_id, created_at) cheklovi yo'q edi —
+    # avval takrorlar o'chiriladi (eng kichik id qoladi), keyin unikal indeks
+    if _has_unique(conn, "solar_reading", ["site_id", "created_at"]):
+        return
+    conn.execute(text(
+        "DELETE FROM solar_reading WHERE site_id IS NOT NULL AND created_at IS NOT NULL AND id NOT IN ("
+        "SELECT min(id) FROM solar_reading WHERE site_id IS NOT NULL AND created_at IS NOT NULL "
+        "GROUP BY site_id, created_at)"
+    ))
+    _create_index(conn, "solar_reading", "ux_solar_reading_site_created")
+
+
+def m017_ijro_date_key(conn):
+    _create_index(conn, "ijro_task", "ix_ijro_task_date_key")
+
+
+def m018_solar_rollups(conn):
+    # jadvallar m001 (create_all) bilan bo'sh yaratilgan — mavjud o'lchovlardan to'ldiriladi
+    solar_rollup.rebuild_rollups(conn)
+
+
+def m019_orgtech_event_keep_removed(conn):
+    # o'chirilgan qurilmaning jurnali ("removed" yozuvi bilan) qoladi — item_id FK olib tashlanadi;
+    # SQLite FK'ni tekshirmaydi (foreign_keys pragmasi yoqilmagan), jadvalni qayta qurish shart emas
+    if conn.dialect.name != "postgresql":
+        return
+    for fk in inspect(conn).get_foreign_keys("org_tech_event"):
+        if fk["constrained_columns"] == ["item_id"]:
+            conn.execute(text(f'ALTER TABLE org_tech_event DROP CONSTRAINT "{fk["name"]}"'))
+
+
+def m020_auth_session_expiry(conn):
+    _add_column(conn, "auth_session", "expires_at")
+    _create_index(conn, "auth_session", "ix_auth_session_expires_at")
+    # mavjud sessiyalar chiqarib yuborilmaydi — hozirdan boshlab to'liq muddat
+    expires_at = datetime.utcnow() + timedelta(seconds=Config.AUTH_SESSION_TTL)
+    conn.execute(update(AuthSession.__table__).where(AuthSession.expires_at.is_(None)).values(expires_at=expires_at))
+
+
+def m021_outsourcing_blank_service(conn):
+    # eski rebuild bo'sh xizmat turini "" bucket'iga yozgan, deltalar esa NO_SERVICE'ga
+    outsourcing_analytics.rebuild_summary(conn)
+
+
+MIGRATIONS = [
+    (1, "baseline", m001_baseline),
+    (2, "added_columns", m002_added_columns),
+    (3, "list_indexes", m003_list_indexes),
+    (4, "search_index", m004_search_index),
+    (5, "hot_path_indexes", m005_hot_path_indexes),
+    (6, "employee_summary_indexes", m006_employee_summary_indexes),
+    (7, "auth_sessions", m007_auth_sessions),
+    (8, "outsourcing_analytics", m008_outsourcing_analytics),
+    (9, "fuel_log", m009_fuel_log),
+    (10, "jobs", m010_jobs),
+    (11, "orgtech_history", m011_orgtech_history),
+    (12, "deadlines", m012_deadlines),
+    (13, "password_hashes", m013_password_hashes),
+    (14, "hr_import", m014_hr_import),
+    (15, "page_cache", m015_page_cache),
+    (16, "solar_reading_unique", m016_solar_reading_unique),
+    (17, "ijro_date_key", m017_ijro_date_key),
+    (18, "solar_rollups", m018_solar_rollups),
+    (19, "orgtech_event_keep_removed", m019_orgtech_event_keep_removed),
+    (20, "auth_session_expiry", m020_auth_session_expiry),
+    (21, "outsourcing_blank_service", m021_outsourcing_blank_service),
+]
+
+
+def _ensure_table(conn):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def current_version(conn):
+    _ensure_table(conn)
+    return conn.execute(text(f"SELECT coalesce(max(version), 0) FROM {MIGRATIONS_TABLE}")).scalar()
+
+
+def upgrade(engine):
+    applied = []
+    with engine.begin() as conn:
+        version = current_version(conn)
+    for number, name, migrate in MIGRATIONS:
+        if number <= version:
+            continue
+        # har bir migratsiya o'z tranzaksiyasida, versiya yozuvi bilan birga
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text(f"INSERT INTO {MIGRATIONS_TABLE} (version, name, applied_at) VALUES (:v, :n, :at)"),
+                {"v": number, "n": name, "at": datetime.utcnow()},
+            )
+        applied.append(f"{number:03d}_{name}")
+    return applied
+
+
+def seed_admin(username="admin", password="admin"):
+    if User.query.filter_by(username=username).first():
+        return False
+    db.session.add(User(
+        username=username,
+        password=hash_password(password),
+        role="admin",
+        full_name="Super Admin"
+    ))
+    db.session.commit()
+    return True
@@ -6,9 +6,15 @@ db = SQLAlchemy()
 
 # ========== USER / HR ==========
 class User(db.Model):
+    # hr_list: role bo'yicha filtr + id bo'yicha keyset; hr_import: pasport takrorlari
+    __table_args__ = (
+        db.Index("ix_user_role_id", "role", "id"),
+        db.Index("ix_user_passport_number", "passport_number"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False)
-    password = db.Column(db.String(128), nullable=False)
+    password = db.Column(db.String(255), nullable=False)  # passwords.py xeshi (eski yozuvlarda ochiq matn)
     role = db.Column(db.String(20), default="employee")  # admin, manager, employee
 
     # HR ma'lumotlar
@@ -32,9 +38,18 @@ class User(db.Model):
     docs = db.relationship("HRDocument", backref="owner", lazy=True)
 
 
+# Server tomondagi sessiya: cookie'da faqat id, rol va ism har doim bazadan (auth.py)
+class AuthSession(db.Model):
+    id = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, index=True)  # tekshiruv va tozalash (auth.prune_sessions)
+
+
 class HRDocument(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    filename = db.Column(db.String(200))
+    filename = db.Column(db.String(200))       # uploads/ ichidagi kontent-hash nomi
+    original_name = db.Column(db.String(200))  # foydalanuvchi yuklagan nom
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"))
 
 
@@ -63,6 +78,37 @@ class Vehicle(db.Model):
     organization_id = db.Column(db.Integer, db.ForeignKey("organization.id"))
 
 
+# Yoqilg'i kartasi tranzaksiyalari (vaqt qatori); bir transportda bir vaqtda bitta quyish
+class FuelLog(db.Model):
+    __table_args__ = (db.UniqueConstraint("vehicle_id", "filled_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey("vehicle.id"), nullable=False)
+    vehicle = db.relationship("Vehicle", backref=db.backref("fuel_logs", lazy="dynamic"))
+
+    filled_at = db.Column(db.DateTime, nullable=False)
+    liters = db.Column(db.Float, default=0.0)
+    amount = db.Column(db.Float, default=0.0)
+    station = db.Column(db.String(200))
+    card_number = db.Column(db.String(32))
+    transaction_id = db.Column(db.String(64))
+
+
+# Oylik yig'indi (month = oyning 1-kuni): FuelLog yozilganda fuel.py yangilaydi
+class FuelMonthlyTotal(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("vehicle_id", "month"),
+        db.Index("ix_fuel_monthly_total_month", "month"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey("vehicle.id"), nullable=False)
+    month = db.Column(db.Date, nullable=False)
+    liters = db.Column(db.Float, default=0.0)
+    amount = db.Column(db.Float, default=0.0)
+    fills = db.Column(db.Integer, default=0)
+
+
 # ========== ORGTEXNIKA ==========
 class OrgTech(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -75,20 +121,64 @@ class OrgTech(db.Model):
     assigned_to_id = db.Column(db.Integer, db.ForeignKey("user.id"))
     assigned_to = db.relationship("User")
 
-    last_update = db.Column(db.DateTime, default=datetime.utcnow)
+    last_update = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Holat/biriktirish o'zgarishlari jurnali — faqat qo'shiladi (orgtech_history.py yozadi).
+# Har bir yozuvda o'zgarishdan keyingi holat to_* ustunlarida to'liq turadi.
+class OrgTechEvent(db.Model):
+    __table_args__ = (
+        db.Index("ix_orgtech_event_item_ts", "item_id", "ts"),
+        db.Index("ix_orgtech_event_ts", "ts"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(db.Integer, nullable=False)  # FK'siz: qurilma o'chirilsa ham jurnal qoladi
+    ts = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    kind = db.Column(db.String(20), nullable=False)  # created / status / assigned / removed
+    from_status = db.Column(db.String(64))
+    to_status = db.Column(db.String(64))
+    from_user_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+    to_user_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+    actor_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+
+
+# Kun oxiridagi holat bo'yicha qurilmalar soni (items) va shu kuni holatga o'tganlar (entered)
+class OrgTechStatusSnapshot(db.Model):
+    __table_args__ = (db.UniqueConstraint("day", "status"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(64), nullable=False)
+    items = db.Column(db.Integer, default=0)
+    entered = db.Column(db.Integer, default=0)
 
 
 # ========== OUTSOURSING ==========
 class OutsourceCompany(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), nullable=False)
-    service_type = db.Column(db.String(128))
+    # active_history: commit'dan keyin (expired) o'zgartirilsa ham eski qiymat yuklanadi —
+    # outsourcing_analytics'ning after_update deltasi unga tayanadi
+    service_type = db.column_property(db.Column(db.String(128)), active_history=True)
     contract_number = db.Column(db.String(64))
-    contract_date = db.Column(db.Date)
-    contract_amount = db.Column(db.Float, default=0.0)
+    contract_date = db.column_property(db.Column(db.Date), active_history=True)
+    contract_end_date = db.Column(db.Date, index=True)  # "muddati tugayotganlar" ro'yxati
+    contract_amount = db.column_property(db.Column(db.Float, default=0.0), active_history=True)
     comment = db.Column(db.Text)
 
 
+# Shartnomalar yig'indisi: dimension = service / month / quarter (outsourcing_analytics.py yangilaydi)
+class OutsourceSummary(db.Model):
+    __table_args__ = (db.UniqueConstraint("dimension", "bucket"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    dimension = db.Column(db.String(10), nullable=False)
+    bucket = db.Column(db.String(128), nullable=False)
+    contracts = db.Column(db.Integer, default=0)
+    total_amount = db.Column(db.Float, default=0.0)
+
+
 # ========== SOLAR ==========
 class SolarSite(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -103,6 +193,12 @@ class SolarSite(db.Model):
 
 
 class SolarReading(db.Model):
+    # bir stansiyadan bir vaqtda faqat bitta o'lchov (qayta import xavfsiz, ON CONFLICT shunga tayanadi)
+    __table_args__ = (
+        db.Index("ux_solar_reading_site_created", "site_id", "created_at", unique=True),
+        db.Index("ix_solar_reading_site_date", "site_id", "date"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     site_id = db.Column(db.Integer, db.ForeignKey("solar_site.id"))
     site = db.relationship("SolarSite", backref="readings")
@@ -112,14 +208,116 @@ class SolarReading(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+# Kunlik energiya yig'indilari: SolarReading qo'shilganda solar_rollup.py yangilaydi
+class SolarDailyRollup(db.Model):
+    __table_args__ = (db.UniqueConstraint("site_id", "date"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    site_id = db.Column(db.Integer, db.ForeignKey("solar_site.id"), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    energy_kwh = db.Column(db.Float, default=0.0)
+
+
+# Barcha stansiyalar bo'yicha jami: period = day / week / month
+class SolarEnergyTotal(db.Model):
+    __table_args__ = (db.UniqueConstraint("period", "period_start"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(10), nullable=False)
+    period_start = db.Column(db.Date, nullable=False)
+    energy_kwh = db.Column(db.Float, default=0.0)
+
+
 # ========== IJRO TOPSHIRIQLARI ==========
 class IjroTask(db.Model):
+    # kalendar: (date, id) bo'yicha oy oynasi; status bo'yicha filtr;
+    # muddatlar (deadlines.py): ochiq statuslar bo'yicha due_date diapazoni;
+    # xodim paneli: status va muddati o'tganlar soni (qoplovchi indeks) va bugungi topshiriqlar
+    __table_args__ = (
+        db.Index("ix_ijro_task_date_id", "date", "id"),
+        db.Index("ix_ijro_task_status_due", "status", "due_date"),
+        db.Index("ix_ijro_task_assignee_status_due", "assigned_to_id", "status", "due_date"),
+        db.Index("ix_ijro_task_assignee_date", "assigned_to_id", "date"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200))
     description = db.Column(db.Text)
     date = db.Column(db.Date)       # kalendarda ko‘rinadigan sana
     due_date = db.Column(db.Date)   # muddat
     status = db.Column(db.String(50), default="new")  # new / in_progress / done / rejected
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # kalendar ETag
 
     assigned_to_id = db.Column(db.Integer, db.ForeignKey("user.id"))
     assigned_to = db.relationship("User")
+
+
+# ijro_list keyset'i: sanasiz topshiriqlar oxirida. Ifoda pagination._sort_key bilan
+# aynan bir xil bo'lishi kerak, aks holda SQLite indeksni ishlatmaydi
+db.Index(
+    "ix_ijro_task_date_key",
+    db.func.coalesce(IjroTask.date, db.literal_column("'9999-12-31'")),
+    IjroTask.id,
+)
+
+
+# Muddat eslatmasi bir marta: (topshiriq, tur, muddat) — muddat o'zgarsa yangisi yuboriladi
+class DeadlineReminder(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("task_id", "kind", "due_date"),
+        db.Index("ix_deadline_reminder_due_date", "due_date"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, db.ForeignKey("ijro_task.id"), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # due_soon / overdue
+    due_date = db.Column(db.Date, nullable=False)
+    sent_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# ========== BILDIRISHNOMALAR ==========
+class Notification(db.Model):
+    # foydalanuvchining oxirgi bildirishnomalari va o'qilmaganlar
+    __table_args__ = (db.Index("ix_notification_user_id", "user_id", "id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    kind = db.Column(db.String(32), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text)
+    payload = db.Column(db.Text)  # JSON, masalan {"task_ids": [...]}
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime)
+
+
+# ========== FON VAZIFALARI ==========
+class Job(db.Model):
+    # worker navbatdagi vazifani (status, run_after) bo'yicha oladi
+    __table_args__ = (db.Index("ix_job_status_run_after", "status", "run_after"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.Text)  # JSON
+    status = db.Column(db.String(20), default="queued", nullable=False)  # queued / running / done / failed
+    idempotency_key = db.Column(db.String(128), unique=True)
+
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=3, nullable=False)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = db.Column(db.String(64))
+    locked_at = db.Column(db.DateTime)
+
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    created_by_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+
+# ========== SAHIFA KESHI ==========
+# Obyekt versiyalari (page_cache.py): yozuvda +1, ETag shu versiyalardan.
+# obj_id=0 — butun tur (qayta qurish yoki ro'yxatga bog'liq sahifalar)
+class ObjectVersion(db.Model):
+    kind = db.Column(db.String(32), primary_key=True)
+    obj_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, default=1, nullable=False)
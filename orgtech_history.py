@@ -0,0 +1,249 @@
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from flask import g, has_app_context
+from sqlalchemy import Date, cast, delete, event, func, inspect, select
+
+from models import db, OrgTech, OrgTechEvent, OrgTechStatusSnapshot, User
+
+
+# OrgTech'da faqat joriy holat turadi; har bir o'zgarish (yaratish, holat,
+# xodimga biriktirish, o'chirish) OrgTechEvent jurnaliga qo'shiladi va hech qachon
+# o'zgartirilmaydi (qurilma o'chirilgandan keyin ham). Har kuni yopilgan kun uchun holatlar bo'yicha son
+# OrgTechStatusSnapshot'ga yoziladi: oldingi kun soni + shu kungi o'tishlar.
+# Park holati va "qancha vaqt ta'mirda" hisobotlari snapshotlarni o'qiydi.
+
+STATUSES = ("new", "working", "repair", "broken")
+STATUS_LABELS = {"new": "Yangi", "working": "Ishlayapti", "repair": "Ta'mirda", "broken": "Nosoz"}
+NO_STATUS = "unknown"
+REPORT_DAYS = 90
+
+
+def _bucket(status):
+    return status or NO_STATUS
+
+
+def utc_today():
+    # ts utcnow bilan yoziladi — kun chegarasi ham UTC bo'yicha
+    return datetime.utcnow().date()
+
+
+# ---------- JURNAL ----------
+
+def _actor_id():
+    # so'rov ichida — kim o'zgartirdi; CLI va worker'da None
+    user = g.get("user") if has_app_context() else None
+    return getattr(user, "id", None)
+
+
+def _row(target, kind, ts, **fields):
+    row = {
+        "item_id": target.id,
+        "ts": ts,
+        "kind": kind,
+        "from_status": None,
+        "to_status": target.status,
+        "from_user_id": None,
+        "to_user_id": target.assigned_to_id,
+        "actor_id": _actor_id(),
+    }
+    row.update(fields)
+    return row
+
+
+def _old(state, attr, current):
+    hist = state.attrs[attr].history
+    return hist.deleted[0] if hist.deleted else current
+
+
+@event.listens_for(OrgTech, "after_insert")
+def _item_inserted(mapper, connection, target):
+    ts = target.last_update or datetime.utcnow()
+    connection.execute(OrgTechEvent.__table__.insert(), [_row(target, "created", ts)])
+
+
+@event.listens_for(OrgTech, "after_update")
+def _item_updated(mapper, connection, target):
+    state = inspect(target)
+    old_status = _old(state, "status", target.status)
+    old_user = _old(state, "assigned_to_id", target.assigned_to_id)
+    ts = target.last_update or datetime.utcnow()
+
+    # ikkalasi birga o'zgarsa ikki yozuv: avval holat, keyin biriktirish
+    rows = []
+    if old_status != target.status:
+        rows.append(_row(target, "status", ts, from_status=old_status, from_user_id=old_user, to_user_id=old_user))
+    if old_user != target.assigned_to_id:
+        rows.append(_row(target, "assigned", ts, from_status=target.status, from_user_id=old_user))
+    if rows:
+        connection.execute(OrgTechEvent.__table__.insert(), rows)
+
+
+@event.listens_for(OrgTech, "after_delete")
+def _item_deleted(mapper, connection, target):
+    # "removed": holat soni shu kundan kamayadi, yangi holatga o'tish yo'q
+    connection.execute(OrgTechEvent.__table__.insert(), [_row(
+        target, "removed", datetime.utcnow(),
+        from_status=target.status, to_status=None, from_user_id=target.assigned_to_id, to_user_id=None,
+    )])
+
+
+@event.listens_for(OrgTechEvent, "before_update")
+@event.listens_for(OrgTechEvent, "before_delete")
+def _append_only(mapper, connection, target):
+    raise ValueError("OrgTechEvent jurnali faqat qo'shiladi")
+
+
+# ---------- SNAPSHOT ----------
+
+def _transitions(connection, start=None, end=None):
+    # {kun: Counter({(kind, from, to): n})} — biriktirish holat sonlarini o'zgartirmaydi
+    if connection.dialect.name == "postgresql":
+        day = cast(OrgTechEvent.ts, Date)
+    else:
+        day = func.date(OrgTechEvent.ts, type_=Date)
+    query = (
+        select(day, OrgTechEvent.kind, OrgTechEvent.from_status, OrgTechEvent.to_status, func.count())
+        .where(OrgTechEvent.kind != "assigned")
+        .group_by(day, OrgTechEvent.kind, OrgTechEvent.from_status, OrgTechEvent.to_status)
+    )
+    if start is not None:
+        query = query.where(OrgTechEvent.ts >= datetime.combine(start, time.min))
+    if end is not None:
+        query = query.where(OrgTechEvent.ts < datetime.combine(end + timedelta(days=1), time.min))
+    by_day = defaultdict(Counter)
+    for d, kind, from_status, to_status, n in connection.execute(query):
+        by_day[d][(kind, from_status, to_status)] += n
+    return by_day
+
+
+def _apply(counts, transitions):
+    entered = Counter()
+    for (kind, from_status, to_status), n in transitions.items():
+        if kind != "created":
+            counts[_bucket(from_status)] -= n
+        if kind != "removed":
+            counts[_bucket(to_status)] += n
+            entered[_bucket(to_status)] += n
+    return entered
+
+
+def _roll(connection, counts, by_day, start, until):
+    rows = []
+    day = start
+    while day <= until:
+        entered = _apply(counts, by_day.get(day, {}))
+        rows.extend(
+            {"day": day, "status": status, "items": counts[status], "entered": entered[status]}
+            for status in sorted(set(counts) | set(entered))
+            if counts[status] or entered[status]
+        )
+        day += timedelta(days=1)
+    if rows:
+        connection.execute(OrgTechStatusSnapshot.__table__.insert(), rows)
+    return (until - start).days + 1 if until >= start else 0
+
+
+def take_snapshots(until=None, connection=None):
+    # yopilgan kunlar uchun (standart — kechagacha); o'tkazib yuborilgan kunlar ham to'ldiriladi
+    own = connection is None
+    if own:
+        connection = db.session.connection()
+    until = until or utc_today() - timedelta(days=1)
+    last = connection.execute(select(func.max(OrgTechStatusSnapshot.day))).scalar()
+    if last is None:
+        days = rebuild_snapshots(connection, until)
+    elif last >= until:
+        days = 0
+    else:
+        counts = Counter(dict(connection.execute(
+            select(OrgTechStatusSnapshot.status, OrgTechStatusSnapshot.items).where(OrgTechStatusSnapshot.day == last)
+        ).all()))
+        start = last + timedelta(days=1)
+        days = _roll(connection, counts, _transitions(connection, start, until), start, until)
+    if own:
+        db.session.commit()
+    return days
+
+
+def rebuild_snapshots(connection=None, until=None):
+    own = connection is None
+    if own:
+        connection = db.session.connection()
+    until = until or utc_today() - timedelta(days=1)
+    connection.execute(delete(OrgTechStatusSnapshot))
+    by_day = _transitions(connection, end=until)
+    days = _roll(connection, Counter(), by_day, min(by_day), until) if by_day else 0
+    if own:
+        db.session.commit()
+    return days
+
+
+def next_snapshot_at(now=None):
+    # yangi kun boshlangandan 5 daqiqa keyin
+    now = now or datetime.utcnow()
+    return datetime.combine(now.date() + timedelta(days=1), time.min) + timedelta(minutes=5)
+
+
+# ---------- O'QISH ----------
+
+def current_counts():
+    rows = db.session.execute(select(OrgTech.status, func.count(OrgTech.id)).group_by(OrgTech.status))
+    counts = Counter()
+    for status, n in rows:
+        counts[_bucket(status)] += n
+    return counts
+
+
+def fleet_report(days=REPORT_DAYS, end=None):
+    # oxirgi `days` ta yopilgan kun: o'rtacha son (qurilma-kun / kun) va holatga o'tishlar
+    end = end or utc_today() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+    rows = db.session.execute(
+        select(
+            OrgTechStatusSnapshot.status,
+            func.sum(OrgTechStatusSnapshot.items),
+            func.sum(OrgTechStatusSnapshot.entered),
+            func.max(OrgTechStatusSnapshot.day),
+        )
+        .where(OrgTechStatusSnapshot.day.between(start, end))
+        .group_by(OrgTechStatusSnapshot.status)
+    ).all()
+    by_status = {
+        status: {"device_days": item_days or 0, "average": (item_days or 0) / days, "entered": entered or 0}
+        for status, item_days, entered, _ in rows
+    }
+    return {
+        "start": start,
+        "end": end,
+        "days": days,
+        "snapshot_day": max((last for *_, last in rows), default=None),
+        "by_status": by_status,
+    }
+
+
+def item_history(item_id, now=None):
+    # bitta qurilma jurnali (item_id, ts) indeksi bo'yicha; holatlar bo'yicha jami vaqt
+    now = now or datetime.utcnow()
+    events = db.session.scalars(
+        select(OrgTechEvent).where(OrgTechEvent.item_id == item_id).order_by(OrgTechEvent.ts, OrgTechEvent.id)
+    ).all()
+
+    durations = Counter()
+    changes = [e for e in events if e.kind != "assigned"]
+    for change, following in zip(changes, changes[1:] + [None]):
+        if change.kind == "removed":
+            break
+        durations[_bucket(change.to_status)] += ((following.ts if following else now) - change.ts).total_seconds()
+
+    user_ids = {uid for e in events for uid in (e.from_user_id, e.to_user_id, e.actor_id) if uid}
+    names = {}
+    if user_ids:
+        names = dict(db.session.execute(
+            select(User.id, func.coalesce(User.full_name, User.username)).where(User.id.in_(user_ids))
+        ).all())
+    return {
+        "events": list(reversed(events)),
+        "durations": {status: timedelta(seconds=int(sec)) for status, sec in durations.most_common()},
+        "names": names,
+    }
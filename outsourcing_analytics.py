@@ -0,0 +1,175 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import Integer, String, cast, delete, event, func, inspect, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, OutsourceCompany, OutsourceSummary
+
+
+# Shartnomalar soni va summasi xizmat turi, oy va chorak bo'yicha
+# OutsourceSummary'da saqlanadi: OutsourceCompany yozilganda delta qo'shiladi,
+# sahifa faqat bir necha o'nta tayyor qatorni o'qiydi.
+
+DIMENSIONS = ("service", "month", "quarter")
+NO_SERVICE = "—"
+EXPIRING_DAYS = 30
+EXPIRING_LIMIT = 50
+
+
+def _buckets(service_type, contract_date):
+    buckets = [("service", service_type or NO_SERVICE)]
+    if contract_date:
+        buckets.append(("month", f"{contract_date:%Y-%m}"))
+        buckets.append(("quarter", f"{contract_date.year}-Q{(contract_date.month - 1) // 3 + 1}"))
+    return buckets
+
+
+# ---------- INKREMENTAL YANGILASH ----------
+
+# deltas: {(dimension, bucket): [contracts, amount]}
+def apply_deltas(connection, deltas):
+    rows = [
+        {"dimension": dim, "bucket": bucket, "contracts": n, "total_amount": amount}
+        for (dim, bucket), (n, amount) in deltas.items()
+        if n or amount
+    ]
+    if not rows:
+        return
+    table = OutsourceSummary.__table__
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["dimension", "bucket"],
+        set_={
+            "contracts": table.c.contracts + stmt.excluded.contracts,
+            "total_amount": table.c.total_amount + stmt.excluded.total_amount,
+        },
+    )
+    connection.execute(stmt, rows)
+
+
+def _add(deltas, service_type, contract_date, amount, sign):
+    for key in _buckets(service_type, contract_date):
+        deltas[key][0] += sign
+        deltas[key][1] += sign * (amount or 0)
+
+
+@event.listens_for(OutsourceCompany, "after_insert")
+def _company_inserted(mapper, connection, target):
+    deltas = defaultdict(lambda: [0, 0.0])
+    _add(deltas, target.service_type, target.contract_date, target.contract_amount, 1)
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(OutsourceCompany, "after_delete")
+def _company_deleted(mapper, connection, target):
+    deltas = defaultdict(lambda: [0, 0.0])
+    _add(deltas, target.service_type, target.contract_date, target.contract_amount, -1)
+    apply_deltas(connection, deltas)
+
+
+@event.listens_for(OutsourceCompany, "after_update")
+def _company_updated(mapper, connection, target):
+    state = inspect(target)
+    old = {}
+    for attr in ("service_type", "contract_date", "contract_amount"):
+        hist = state.attrs[attr].history
+        old[attr] = hist.deleted[0] if hist.deleted else getattr(target, attr)
+
+    deltas = defaultdict(lambda: [0, 0.0])
+    _add(deltas, old["service_type"], old["contract_date"], old["contract_amount"], -1)
+    _add(deltas, target.service_type, target.contract_date, target.contract_amount, 1)
+    apply_deltas(connection, deltas)
+
+
+# ---------- BACKFILL ----------
+
+def _period_exprs(dialect_name):
+    d = OutsourceCompany.contract_date
+    if dialect_name == "postgresql":
+        return func.to_char(d, "YYYY-MM"), func.to_char(d, 'YYYY-"Q"Q')
+    month = func.strftime("%Y-%m", d, type_=String)
+    quarter = (
+        func.strftime("%Y-Q", d, type_=String)
+        + cast((cast(func.strftime("%m", d), Integer) + 2) // 3, String)
+    )
+    return month, quarter
+
+
+def rebuild_summary(connection=None):
+    # connection berilsa (migratsiya) o'sha tranzaksiyada, aks holda db.session'da commit bilan
+    own = connection is None
+    if own:
+        connection = db.session.connection()
+    connection.execute(delete(OutsourceSummary))
+
+    month, quarter = _period_exprs(connection.dialect.name)
+    # _buckets bilan bir xil: bo'sh satr ham (forma bo'sh maydonni "" yuboradi) NO_SERVICE
+    service = func.coalesce(func.nullif(OutsourceCompany.service_type, ""), NO_SERVICE)
+    grouped = [
+        ("service", service, None),
+        ("month", month, OutsourceCompany.contract_date.isnot(None)),
+        ("quarter", quarter, OutsourceCompany.contract_date.isnot(None)),
+    ]
+    table = OutsourceSummary.__table__
+    for dimension, bucket, where in grouped:
+        query = select(
+            literal(dimension),
+            bucket,
+            func.count(OutsourceCompany.id),
+            func.coalesce(func.sum(OutsourceCompany.contract_amount), 0),
+        ).group_by(bucket)
+        if where is not None:
+            query = query.where(where)
+        connection.execute(
+            table.insert().from_select(["dimension", "bucket", "contracts", "total_amount"], query)
+        )
+    rows = connection.execute(select(func.count(OutsourceSummary.id))).scalar()
+    if own:
+        db.session.commit()
+    return rows
+
+
+# ---------- O'QISH ----------
+
+def _rows(dimension, order_by, limit=None):
+    query = select(OutsourceSummary.bucket, OutsourceSummary.contracts, OutsourceSummary.total_amount).where(
+        OutsourceSummary.dimension == dimension, OutsourceSummary.contracts > 0
+    ).order_by(order_by)
+    if limit:
+        query = query.limit(limit)
+    return [
+        {"bucket": bucket, "contracts": n, "total": total or 0.0, "average": (total or 0.0) / n}
+        for bucket, n, total in db.session.execute(query)
+    ]
+
+
+def expiring_contracts(days=EXPIRING_DAYS, today=None, limit=EXPIRING_LIMIT):
+    today = today or date.today()
+    return (
+        OutsourceCompany.query.filter(
+            OutsourceCompany.contract_end_date >= today,
+            OutsourceCompany.contract_end_date <= today + timedelta(days=days),
+        )
+        .order_by(OutsourceCompany.contract_end_date, OutsourceCompany.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def analytics(months=12, quarters=8, expiring_days=EXPIRING_DAYS):
+    by_service = _rows("service", OutsourceSummary.total_amount.desc())
+    contracts = sum(r["contracts"] for r in by_service)
+    total = sum(r["total"] for r in by_service)
+    return {
+        "contracts": contracts,
+        "total": total,
+        "average": total / contracts if contracts else 0.0,
+        "by_service": by_service,
+        # eng oxirgi davrlar, ko'rsatish uchun eskisidan yangisiga
+        "by_month": list(reversed(_rows("month", OutsourceSummary.bucket.desc(), months))),
+        "by_quarter": list(reversed(_rows("quarter", OutsourceSummary.bucket.desc(), quarters))),
+        "expiring": expiring_contracts(expiring_days),
+        "expiring_days": expiring_days,
+    }
@@ -0,0 +1,257 @@
+import hashlib
+import os
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from threading import Lock
+
+from flask import current_app, g, make_response, render_template, request
+from markupsafe import Markup
+from sqlalchemy import and_, event, inspect, literal, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from auth import current_user
+from models import (
+    db, ObjectVersion, User, HRDocument, Organization, Vehicle, OutsourceCompany,
+    OrgTech, OrgTechEvent, SolarSite,
+)
+
+
+# Kam o'zgaradigan detal sahifalari uchun. Har bir yozuv ObjectVersion'dagi
+# (tur, id) versiyasini oshiradi: ORM orqali — mapper hodisalari, Core
+# orqali ommaviy yozuvlar (import, poller, rollup) — bump() chaqiradi.
+# So'rovda bitta PK so'rovi bilan versiyalar o'qiladi: ETag mos kelsa 304,
+# aks holda shablonning o'z bloklari (endpoint, id, rol) bo'yicha LRU'dan
+# olinadi va faqat base.html (foydalanuvchi paneli) qayta render qilinadi.
+# Versiyalar bazada — gunicorn worker'lari orasida ETag bir xil.
+
+DEFAULT_MAX_BYTES = 32 * 2**20
+PERIODS = {"day": "%Y-%m-%d", "hour": "%Y-%m-%d %H"}  # sana/vaqtga bog'liq qismlar uchun
+
+
+# ---------- VERSIYALAR ----------
+
+def _insert(connection):
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    return dialect.insert(ObjectVersion.__table__)
+
+
+def _on_conflict(stmt):
+    table = ObjectVersion.__table__
+    return stmt.on_conflict_do_update(index_elements=["kind", "obj_id"], set_={"version": table.c.version + 1})
+
+
+def bump(connection, keys):
+    rows = [{"kind": kind, "obj_id": obj_id, "version": 1} for kind, obj_id in dict.fromkeys(keys) if obj_id is not None]
+    if rows:
+        connection.execute(_on_conflict(_insert(connection)), rows)
+
+
+def bump_select(connection, kind, ids):
+    # ids: bitta ustunli select — id'lar shu so'rovning o'zida olinadi
+    ids = ids.subquery()
+    column = list(ids.c)[0]
+    connection.execute(_on_conflict(_insert(connection).from_select(
+        ["kind", "obj_id", "version"],
+        select(literal(kind), column, literal(1)).where(column.isnot(None)).distinct(),
+    )))
+
+
+def _previous(target, attr):
+    hist = inspect(target).attrs[attr].history
+    return hist.deleted[0] if hist.deleted else None
+
+
+# model -> yozilgan obyektdan versiya kalitlari
+TRACKED = {
+    User: lambda u: [("user", u.id), ("users", 0)],
+    HRDocument: lambda d: [("user", d.user_id), ("user", _previous(d, "user_id"))],
+    Organization: lambda o: [("organization", o.id)],
+    Vehicle: lambda v: [
+        ("vehicle", v.id), ("organization", v.organization_id), ("organization", _previous(v, "organization_id")),
+    ],
+    OutsourceCompany: lambda c: [("outsource", c.id)],
+    OrgTech: lambda t: [("orgtech", t.id)],
+    OrgTechEvent: lambda e: [("orgtech", e.item_id)],
+    SolarSite: lambda s: [("solar_site", s.id)],
+}
+
+
+def _register(model, keys):
+    def changed(mapper, connection, target):
+        bump(connection, keys(target))
+
+    for name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, name, changed)
+
+
+for _model, _keys in TRACKED.items():
+    _register(_model, _keys)
+
+
+def read_versions(keys):
+    found = {
+        (kind, obj_id): version
+        for kind, obj_id, version in db.session.execute(
+            select(ObjectVersion.kind, ObjectVersion.obj_id, ObjectVersion.version).where(
+                or_(*(and_(ObjectVersion.kind == kind, ObjectVersion.obj_id == obj_id) for kind, obj_id in keys))
+            )
+        )
+    }
+    return tuple(found.get(key, 0) for key in keys)
+
+
+# ---------- LRU ----------
+
+class FragmentCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # (endpoint, id, rol) -> (imzo, shablon, bloklar, bayt)
+        self._lock = Lock()
+        self.bytes = 0
+        self.hits = self.misses = self.not_modified = self.evictions = 0
+
+    def get(self, key, signature):
+        with self._lock:
+            item = self._items.get(key)
+            if item and item[0] == signature:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[1], item[2]
+            self.misses += 1
+            return None
+
+    def revalidated(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def put(self, key, signature, template, blocks):
+        size = sum(len(html.encode()) for html in blocks.values())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old:
+                self.bytes -= old[3]
+            self._items[key] = (signature, template, blocks, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, _, evicted) = self._items.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            served = self.hits + self.not_modified
+            total = served + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "hit_rate": round(served / total, 4) if total else 0.0,
+            }
+
+
+# ---------- RENDER ----------
+
+def _wrapper(template):
+    # shablonning o'zini kengaytirib, uning bloklarini tayyor HTML bilan almashtiradi
+    env = current_app.jinja_env
+    wrappers = current_app.extensions["page_cache_wrappers"]
+    if template not in wrappers:
+        names = env.get_template(template).blocks
+        wrappers[template] = env.from_string(
+            f'{{% extends "{template}" %}}'
+            + "".join(f"{{% block {name} %}}{{{{ page_blocks[{name!r}] }}}}{{% endblock %}}" for name in names)
+        )
+    return wrappers[template]
+
+
+def render_page(template, **context):
+    # @cached_page ostidagi view'lar render_template o'rniga chaqiradi
+    pending = g.pop("page_fragment", None)
+    if pending is None:
+        return render_template(template, **context)
+    app = current_app
+    tmpl = app.jinja_env.get_template(template)
+    app.update_template_context(context)
+    ctx = tmpl.new_context(context)
+    blocks = {name: Markup("".join(render(ctx))) for name, render in tmpl.blocks.items()}
+    key, signature = pending
+    app.extensions["page_cache"].put(key, signature, template, blocks)
+    return render_template(_wrapper(template), page_blocks=blocks)
+
+
+def cached_page(kind, arg, also=(), period="day", guard=None):
+    # kind/arg — asosiy obyekt versiyasi; also — qo'shimcha kalitlar, masalan ("users", 0).
+    # guard(**kwargs) — keshdan oldingi ruxsat tekshiruvi (javob qaytarsa o'sha beriladi)
+    def decorator(f):
+        @wraps(f)
+        def wrapper(**kwargs):
+            if guard is not None:
+                denied = guard(**kwargs)
+                if denied is not None:
+                    return denied
+            cache = current_app.extensions.get("page_cache")
+            if cache is None or request.method != "GET":
+                return f(**kwargs)
+
+            obj_id = kwargs[arg]
+            user = current_user()
+            versions = read_versions([(kind, obj_id), (kind, 0), *also])
+            signature = f"{versions}|{datetime.now().strftime(PERIODS[period])}|{current_app.extensions['page_cache_build']}"
+            # sahifa = bloklar (rolga bog'liq) + panel (foydalanuvchiga bog'liq)
+            etag = hashlib.sha1(f"{request.endpoint}|{obj_id}|{signature}|{tuple(user)}".encode()).hexdigest()
+            if request.if_none_match.contains(etag):
+                cache.revalidated()
+                resp = current_app.response_class(status=304)
+            else:
+                key = (request.endpoint, obj_id, user.role)
+                hit = cache.get(key, signature)
+                if hit is not None:
+                    template, blocks = hit
+                    resp = make_response(render_template(_wrapper(template), page_blocks=blocks))
+                else:
+                    g.page_fragment = (key, signature)
+                    resp = make_response(f(**kwargs))
+                    g.pop("page_fragment", None)
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(etag)
+            resp.cache_control.private = True
+            resp.cache_control.no_cache = True
+            return resp
+        return wrapper
+    return decorator
+
+
+def _build_token(app):
+    # shablon va statik fayllar o'zgarsa (deploy) eski ETag/bloklar yaroqsiz
+    digest = hashlib.sha1()
+    folders = [os.path.join(app.root_path, app.template_folder), app.static_folder]
+    uploads = os.path.abspath(app.config["UPLOAD_FOLDER"])
+    for folder in folders:
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != uploads)
+            for name in sorted(files):
+                st = os.stat(os.path.join(root, name))
+                digest.update(f"{root}/{name}:{st.st_mtime_ns}:{st.st_size}".encode())
+    return digest.hexdigest()[:12]
+
+
+def init_app(app):
+    max_bytes = app.config.get("PAGE_CACHE_BYTES", DEFAULT_MAX_BYTES)
+    if not max_bytes:
+        return
+    app.extensions["page_cache"] = FragmentCache(max_bytes)
+    app.extensions["page_cache_wrappers"] = {}
+    app.extensions["page_cache_build"] = _build_token(app)
@@ -0,0 +1,118 @@
+import base64
+import json
+from datetime import date
+
+from flask import request
+from sqlalchemy import Date, and_, func, literal_column, tuple_
+
+
+DEFAULT_PER_PAGE = 24
+MAX_PER_PAGE = 100
+# NULL bo'lishi mumkin bo'lgan sana kalitida NULL o'rniga (NULL'lar oxirida).
+# SQL'da literal — models.py'dagi ifodali indeks so'rov bilan aynan mos kelsin
+NULL_DATE = date(9999, 12, 31)
+
+
+# ---------- KURSOR ----------
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, keys):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            return None
+        # null — NULL_DATE'dan oldingi kursorlar (eski havolalar)
+        return [
+            (NULL_DATE if v is None else date.fromisoformat(v)) if isinstance(col.type, Date) else int(v)
+            for col, v in zip(keys, values)
+        ]
+    except (ValueError, TypeError):
+        return None
+
+
+def _sort_key(col):
+    # (NULL, id) > (v, id) hech qachon rost emas — NULL qiymat kursorda ham, seek'da ham bo'lmasin
+    if col.nullable and isinstance(col.type, Date):
+        return func.coalesce(col, literal_column(f"'{NULL_DATE.isoformat()}'"))
+    return col
+
+
+def _seek(keys, values, reverse=False):
+    # (k1, k2) > (v1, v2) row-value taqqoslash — kompozit indeks bo'yicha diapazon.
+    # k1 >= v1 ortiqcha, lekin SQLite ifodali indeksda row-value'dan diapazon chiqarmaydi
+    if len(keys) == 1:
+        return keys[0] < values[0] if reverse else keys[0] > values[0]
+    lhs, rhs = tuple_(*keys), tuple_(*values)
+    if reverse:
+        return and_(keys[0] <= values[0], lhs < rhs)
+    return and_(keys[0] >= values[0], lhs > rhs)
+
+
+# ---------- SAHIFA ----------
+
+class Page:
+    def __init__(self, items, per_page, next_cursor, prev_cursor):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def _row_key(row, keys):
+    values = [getattr(row, col.key) for col in keys]
+    return [NULL_DATE if v is None and isinstance(col.type, Date) else v for col, v in zip(keys, values)]
+
+
+# keys: tartiblash ustunlari, oxirgisi unikal bo'lishi kerak (odatda id)
+def keyset_paginate(query, keys, descending=False):
+    # descending=True: yangilari birinchi ("Keyingi" — eskilari tomon)
+    per_page = request.args.get("per_page", DEFAULT_PER_PAGE, type=int)
+    per_page = min(max(per_page, 1), MAX_PER_PAGE)
+    after = decode_cursor(request.args.get("after"), keys)
+    before = decode_cursor(request.args.get("before"), keys)
+    sort_keys = [_sort_key(col) for col in keys]
+    forward = [key.desc() for key in sort_keys] if descending else sort_keys
+    backward = sort_keys if descending else [key.desc() for key in sort_keys]
+
+    if before is not None:
+        rows = (
+            query.filter(_seek(sort_keys, before, reverse=not descending))
+            .order_by(*backward)
+            .limit(per_page + 1)
+            .all()
+        )
+        has_prev = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        has_next = True
+    else:
+        if after is not None:
+            query = query.filter(_seek(sort_keys, after, reverse=descending))
+        rows = query.order_by(*forward).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_prev = after is not None
+
+    next_cursor = encode_cursor(_row_key(rows[-1], keys)) if rows and has_next else None
+    prev_cursor = encode_cursor(_row_key(rows[0], keys)) if rows and has_prev else None
+    return Page(rows, per_page, next_cursor, prev_cursor)
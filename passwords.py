@@ -0,0 +1,75 @@
+import hmac
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+# Parollar werkzeug.security formatida: "<usul>$<salt>$<hash>", masalan
+# "scrypt:32768:8:1$..." yoki "pbkdf2:sha256:600000$...". Usul va narx
+# PASSWORD_METHOD bilan tanlanadi (benchmarks/login_bench.py bilan o'lchab).
+# Eski ochiq matnli yoki boshqa narxdagi yozuvlar keyingi muvaffaqiyatli
+# kirishda joriy usul bilan qayta xeshlanadi.
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+DEFAULT_SALT_LENGTH = 16
+HASH_METHODS = ("scrypt", "pbkdf2")
+
+
+def is_hashed(stored):
+    method, sep, rest = (stored or "").partition("$")
+    return bool(sep) and method.split(":")[0] in HASH_METHODS and "$" in rest
+
+
+class PasswordHasher:
+    def __init__(self, method=DEFAULT_METHOD, salt_length=DEFAULT_SALT_LENGTH):
+        self.method = method
+        self.salt_length = salt_length
+        self._dummy = None
+        self._prefix = None
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method, salt_length=self.salt_length)
+
+    def verify(self, stored, password):
+        if stored is None:
+            # noma'lum login uchun ham bir xil vaqt — foydalanuvchi borligi oshkor bo'lmaydi
+            if self._dummy is None:
+                self._dummy = self.hash("")
+            check_password_hash(self._dummy, password or "")
+            return False
+        if is_hashed(stored):
+            return check_password_hash(stored, password or "")
+        # eski ochiq matn — doimiy vaqtli taqqoslash
+        return hmac.compare_digest(stored.encode(), (password or "").encode())
+
+    def needs_rehash(self, stored):
+        # "scrypt"/"pbkdf2" kabi qisqa nomlarni werkzeug standart narx bilan to'liq yozadi
+        # ("scrypt:32768:8:1$...") — solishtirish namunaviy xeshning prefiksi bilan
+        if self._prefix is None:
+            self._prefix = self.hash("").partition("$")[0]
+        return stored.partition("$")[0] != self._prefix
+
+
+def hasher():
+    return current_app.extensions["passwords"]
+
+
+def hash_password(password):
+    return hasher().hash(password)
+
+
+def check_user_password(user, password):
+    # to'g'ri bo'lsa va usul eskirgan bo'lsa user.password yangilanadi (commit chaqiruvchida)
+    h = hasher()
+    if not h.verify(user.password if user else None, password):
+        return False
+    if h.needs_rehash(user.password):
+        user.password = h.hash(password)
+    return True
+
+
+def init_app(app):
+    app.extensions["passwords"] = PasswordHasher(
+        app.config.get("PASSWORD_METHOD", DEFAULT_METHOD),
+        app.config.get("PASSWORD_SALT_LENGTH", DEFAULT_SALT_LENGTH),
+    )
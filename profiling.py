@@ -0,0 +1,208 @@
+import cProfile
+import io
+import os
+import pstats
+import random
+import time
+from bisect import bisect_left
+from collections import deque
+from threading import Lock
+
+from flask import Blueprint, Response, abort, current_app, g, has_app_context, jsonify, request, template_rendered, before_render_template
+from sqlalchemy import event
+
+from auth import is_manager
+from querycount import query_count
+
+
+# Ixtiyoriy (PROFILING_ENABLED) so'rov profili: har bir endpoint uchun
+# umumiy vaqt, SQL soni va vaqti, shablon render vaqti, javob hajmi.
+# Natijalar xotiradagi gistogrammalarda, /metrics'da Prometheus formatida.
+
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# nom -> (tavsif, chegaralar)
+HISTOGRAMS = {
+    "app_request_duration_seconds": ("So'rov umumiy vaqti", TIME_BUCKETS),
+    "app_request_sql_queries": ("So'rovdagi SQL soni", COUNT_BUCKETS),
+    "app_request_sql_duration_seconds": ("So'rovdagi SQL vaqti", TIME_BUCKETS),
+    "app_request_template_duration_seconds": ("Shablon render vaqti", TIME_BUCKETS),
+    "app_response_size_bytes": ("Javob hajmi", SIZE_BUCKETS),
+}
+
+SKIP_ENDPOINTS = {"static", "profiling.metrics", "profiling.profiles"}
+
+bp = Blueprint("profiling", __name__)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # oxirgisi +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self, profile_keep=20):
+        self._lock = Lock()
+        self._histograms = {}   # (nom, endpoint) -> Histogram
+        self._requests = {}     # (endpoint, method, status) -> son
+        self.profiles = deque(maxlen=profile_keep)
+
+    def observe(self, endpoint, method, status, values):
+        with self._lock:
+            key = (endpoint, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for name, value in values.items():
+                if value is None:
+                    continue
+                hist = self._histograms.get((name, endpoint))
+                if hist is None:
+                    hist = self._histograms[(name, endpoint)] = Histogram(HISTOGRAMS[name][1])
+                hist.observe(value)
+
+    def render(self):
+        lines = ["# HELP app_requests_total So'rovlar soni", "# TYPE app_requests_total counter"]
+        with self._lock:
+            for (endpoint, method, status), n in sorted(self._requests.items()):
+                lines.append(f'app_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {n}')
+            for name, (help_text, buckets) in HISTOGRAMS.items():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (hist_name, endpoint), hist in sorted(self._histograms.items()):
+                    if hist_name != name:
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(buckets + ("+Inf",), hist.counts):
+                        cumulative += n
+                        lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {hist.sum:.6f}')
+                    lines.append(f'{name}_count{{endpoint="{endpoint}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+
+# ---------- SQL VA SHABLON VAQTI ----------
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    conn.info["profiling_started"] = time.perf_counter()
+
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("profiling_started", None)
+    if started is not None and has_app_context():
+        g.sql_seconds = g.get("sql_seconds", 0.0) + time.perf_counter() - started
+
+
+def _before_render(sender, template, context, **extra):
+    g.setdefault("template_started", []).append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    started = g.get("template_started")
+    if started:
+        g.template_seconds = g.get("template_seconds", 0.0) + time.perf_counter() - started.pop()
+
+
+# ---------- SO'ROV HAYOTI ----------
+
+def _start_request():
+    g.request_started = time.perf_counter()
+    g.queries_at_start = query_count()
+    rate = current_app.config["PROFILE_SAMPLE_RATE"]
+    if rate and random.random() < rate:
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+def _finish_request(response):
+    started = g.pop("request_started", None)
+    if started is None or request.endpoint in SKIP_ENDPOINTS:
+        return response
+    elapsed = time.perf_counter() - started
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        if elapsed * 1000 >= current_app.config["PROFILE_SLOW_MS"]:
+            _keep_profile(profiler, elapsed)
+
+    registry = current_app.extensions["profiling"]
+    endpoint = request.endpoint or "404"
+    registry.observe(endpoint, request.method, response.status_code, {
+        "app_request_duration_seconds": elapsed,
+        "app_request_sql_queries": query_count() - g.get("queries_at_start", 0),
+        "app_request_sql_duration_seconds": g.get("sql_seconds", 0.0),
+        "app_request_template_duration_seconds": g.get("template_seconds"),
+        # oqimli javoblarda hajm oldindan ma'lum emas
+        "app_response_size_bytes": None if response.is_streamed else response.calculate_content_length(),
+    })
+    return response
+
+
+def _teardown(exc):
+    # view xato bilan tugasa after_request chaqirilmaydi — profiler oqimda qolmasin
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+
+
+def _keep_profile(profiler, elapsed):
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(30)
+    entry = {
+        "endpoint": request.endpoint,
+        "path": request.full_path,
+        "ms": round(elapsed * 1000, 1),
+        "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "stats": out.getvalue(),
+    }
+    current_app.extensions["profiling"].profiles.append(entry)
+    folder = current_app.config.get("PROFILE_DIR")
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+        profiler.dump_stats(os.path.join(folder, f"{request.endpoint}-{int(time.time() * 1000)}.prof"))
+
+
+# ---------- ENDPOINTLAR ----------
+
+def _require_access():
+    # Prometheus "Authorization: Bearer <METRICS_TOKEN>" yuboradi; brauzerda — rahbar sessiyasi.
+    # Token sozlanmagan bo'lsa anonim uchun endpoint yo'qdek (404): profillarda so'rov yo'llari bor
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") == f"Bearer {token}":
+        return
+    if not is_manager():
+        abort(403 if token else 404)
+
+
+@bp.route("/metrics")
+def metrics():
+    _require_access()
+    return Response(current_app.extensions["profiling"].render(), mimetype="text/plain; version=0.0.4")
+
+
+@bp.route("/metrics/profiles")
+def profiles():
+    _require_access()
+    return jsonify(list(reversed(current_app.extensions["profiling"].profiles)))
+
+
+def init_app(app, db):
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+    app.extensions["profiling"] = Registry()
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown)
+    app.register_blueprint(bp)
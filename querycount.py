@@ -0,0 +1,46 @@
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        g.sql_queries = g.get("sql_queries", 0) + 1
+
+
+def init_app(app, db):
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _on_execute)
+
+
+def query_count():
+    return g.get("sql_queries", 0)
+
+
+def query_budget(limit):
+    # Sahifa sonidan qat'i nazar view O(1) so'rovda qolishi kerak.
+    # QUERY_BUDGET_STRICT (query_budget_check) bo'lsa xato, debug rejimida ogohlantirish.
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            app = current_app
+            if not (app.debug or app.config.get("QUERY_BUDGET_STRICT")):
+                return f(*args, **kwargs)
+
+            start = query_count()
+            response = f(*args, **kwargs)
+            used = query_count() - start
+            if used > limit:
+                message = f"{f.__name__}: {used} ta SQL so'rov (budjet {limit})"
+                if app.config.get("QUERY_BUDGET_STRICT"):
+                    raise QueryBudgetExceeded(message)
+                app.logger.warning(message)
+            return response
+        wrapper.query_budget = limit
+        return wrapper
+    return decorator
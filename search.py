@@ -0,0 +1,188 @@
+import re
+
+from sqlalchemy import event, select, text
+
+from models import db, User, Vehicle, Organization, OutsourceCompany, OrgTech, IjroTask
+
+
+# Bitta FTS5 jadvali: rowid = obj_id * 8 + tur kodi
+INDEX_TABLE = "search_index"
+MAX_PER_PAGE = 50
+# bundan ko'p hujjatga mos keladigan so'rovlar bm25 bilan tartiblanmaydi (yangilari birinchi)
+RANK_LIMIT = 20_000
+
+
+def _join(*parts):
+    return " ".join(str(p) for p in parts if p)
+
+
+# tur -> (model, kod, hujjat ustunlari, hujjat yasovchi (title, body)).
+# Ustunlar ro'yxati qayta indekslashda Core so'rovi uchun: migratsiyada model
+# keyinroq qo'shilgan ustunlarni bazada hali yo'q bo'lsa ham tanlamasin.
+DOCUMENTS = {
+    "user": (User, 1, ("username", "full_name", "position", "phone", "passport_series", "passport_number"), lambda u: (
+        u.full_name or u.username,
+        _join(u.username, u.position, u.phone, u.passport_series, u.passport_number),
+    )),
+    "vehicle": (Vehicle, 2, ("model", "plate_number", "driver_full_name"), lambda v: (
+        _join(v.model, v.plate_number),
+        _join(v.plate_number, v.driver_full_name),
+    )),
+    "organization": (Organization, 3, ("name", "address", "floor", "comment"), lambda o: (
+        o.name,
+        _join(o.address, o.floor, o.comment),
+    )),
+    "outsource": (OutsourceCompany, 4, ("name", "service_type", "contract_number", "comment"), lambda c: (
+        c.name,
+        _join(c.service_type, c.contract_number, c.comment),
+    )),
+    "orgtech": (OrgTech, 5, ("name", "model", "serial_number", "comment"), lambda t: (
+        _join(t.name, t.model),
+        _join(t.serial_number, t.comment),
+    )),
+    "task": (IjroTask, 6, ("title", "description"), lambda t: (
+        t.title,
+        t.description,
+    )),
+}
+KIND_BY_CODE = {code: kind for kind, (_, code, _, _) in DOCUMENTS.items()}
+
+
+def _enabled(connection):
+    return connection.dialect.name == "sqlite"
+
+
+def ensure_index(connection):
+    if not _enabled(connection):
+        return
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5("
+        "title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+    ))
+    # sarlavhadagi moslik 10 barobar og'irroq
+    connection.execute(text(f"INSERT INTO {INDEX_TABLE}({INDEX_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')"))
+
+
+# ---------- SINXRONLASH ----------
+
+def _index_rows(connection, rows):
+    # rows: [{"rowid", "title", "body"}] — avval o'chirib, keyin yozamiz
+    if not rows:
+        return
+    connection.execute(text(f"DELETE FROM {INDEX_TABLE} WHERE rowid = :rowid"), rows)
+    connection.execute(
+        text(f"INSERT INTO {INDEX_TABLE} (rowid, title, body) VALUES (:rowid, :title, :body)"), rows
+    )
+
+
+def _doc_row(kind, obj):
+    _, code, _, build = DOCUMENTS[kind]
+    title, body = build(obj)
+    return {"rowid": obj.id * 8 + code, "title": title or "", "body": body or ""}
+
+
+def _register(kind, model):
+    def upsert(mapper, connection, target):
+        if _enabled(connection):
+            _index_rows(connection, [_doc_row(kind, target)])
+
+    def remove(mapper, connection, target):
+        if _enabled(connection):
+            connection.execute(
+                text(f"DELETE FROM {INDEX_TABLE} WHERE rowid = :rowid"),
+                {"rowid": target.id * 8 + DOCUMENTS[kind][1]},
+            )
+
+    event.listen(model, "after_insert", upsert)
+    event.listen(model, "after_update", upsert)
+    event.listen(model, "after_delete", remove)
+
+
+for _kind, _doc in DOCUMENTS.items():
+    _register(_kind, _doc[0])
+
+
+def index_documents(connection, kind, objs):
+    # Core orqali ommaviy yozuvlar mapper hodisalarini chaqirmaydi (hr_import) —
+    # objs: model obyektlari yoki kerakli ustunli Row'lar
+    if _enabled(connection):
+        _index_rows(connection, [_doc_row(kind, obj) for obj in objs])
+
+
+def rebuild_index(connection=None, batch_size=5000):
+    # connection berilsa (migratsiya) o'sha tranzaksiyada, aks holda db.session'da commit bilan
+    own = connection is None
+    if own:
+        connection = db.session.connection()
+    if not _enabled(connection):
+        return 0
+    connection.execute(text(f"DELETE FROM {INDEX_TABLE}"))
+    total = 0
+    for kind, (model, _, columns, _) in DOCUMENTS.items():
+        table = model.__table__
+        rows = connection.execution_options(yield_per=batch_size).execute(
+            select(table.c.id, *(table.c[name] for name in columns)).order_by(table.c.id)
+        )
+        batch = []
+        for row in rows:
+            batch.append(_doc_row(kind, row))
+            if len(batch) >= batch_size:
+                _index_rows(connection, batch)
+                total += len(batch)
+                batch = []
+        _index_rows(connection, batch)
+        total += len(batch)
+    connection.execute(text(f"INSERT INTO {INDEX_TABLE}({INDEX_TABLE}) VALUES ('optimize')"))
+    if own:
+        db.session.commit()
+    return total
+
+
+# ---------- QIDIRUV ----------
+
+def _tokens(query):
+    return [tok.lower() for tok in re.findall(r"\w+", query or "", re.UNICODE)[:10]]
+
+
+def build_match(tokens):
+    # har bir so'z prefiks sifatida, barchasi AND: "abc"* "de"*
+    return " ".join(f'"{tok}"*' for tok in tokens)
+
+
+def _too_broad(match):
+    # ko'pi bilan RANK_LIMIT + 1 ta moslik sanaladi — hisob so'rov hajmiga bog'liq emas
+    found = db.session.execute(
+        text(
+            f"SELECT count(*) FROM (SELECT 1 FROM {INDEX_TABLE} "
+            f"WHERE {INDEX_TABLE} MATCH :match LIMIT :limit)"
+        ),
+        {"match": match, "limit": RANK_LIMIT + 1},
+    ).scalar()
+    return found > RANK_LIMIT
+
+
+def search(query, kinds=None, page=1, per_page=20):
+    tokens = _tokens(query)
+    match = build_match(tokens)
+    per_page = min(max(per_page, 1), MAX_PER_PAGE)
+    page = max(page, 1)
+    codes = [DOCUMENTS[k][1] for k in (kinds or DOCUMENTS) if k in DOCUMENTS]
+    # FTS5 indeksi faqat SQLite'da (ensure_index) — boshqa bazada qidiruv bo'sh
+    if not match or not codes or not _enabled(db.session.connection()):
+        return [], False
+    # juda keng so'rovda hamma moslikni baholash qimmat — rowid bo'yicha oqim bilan olamiz
+    order = "rowid DESC" if _too_broad(match) else "rank"
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, title, rank FROM {INDEX_TABLE} "
+            f"WHERE {INDEX_TABLE} MATCH :match AND (rowid % 8) IN ({', '.join(map(str, codes))}) "
+            f"ORDER BY {order} LIMIT :limit OFFSET :offset"
+        ),
+        {"match": match, "limit": per_page + 1, "offset": (page - 1) * per_page},
+    ).all()
+
+    results = [
+        {"kind": KIND_BY_CODE[rowid % 8], "id": rowid // 8, "title": title, "score": round(score, 4)}
+        for rowid, title, score in rows[:per_page]
+    ]
+    return results, len(rows) > per_page
@@ -0,0 +1,219 @@
+import csv
+import json
+import time
+from datetime import datetime, date, timezone
+from itertools import islice
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, SolarSite, SolarReading, SolarDailyRollup
+from solar_rollup import apply_deltas
+import page_cache
+
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 20
+
+
+class IngestStats:
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def error(self, line_no, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{line_no}-qator: {message}")
+
+    @property
+    def rows_per_sec(self):
+        return round(self.read / self.elapsed, 1) if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            "read": self.read,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "errors": self.errors,
+            "elapsed_sec": round(self.elapsed, 3),
+            "rows_per_sec": self.rows_per_sec,
+        }
+
+
+# ---------- O'QISH VA TEKSHIRISH ----------
+
+def iter_records(stream, fmt):
+    # (qator raqami, dict) juftliklari — fayl butunlay xotiraga o'qilmaydi
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for line_no, rec in enumerate(reader, start=2):
+            yield line_no, rec
+    elif fmt == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError:
+                yield line_no, None
+    else:
+        raise ValueError(f"Noma'lum format: {fmt}")
+
+
+def parse_datetime(value):
+    # ISO 8601 -> naive UTC; fuel.py importi ham ishlatadi
+    dt = datetime.fromisoformat(str(value).strip())
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def parse_record(rec, site_ids):
+    if not isinstance(rec, dict):
+        raise ValueError("JSON obyekt emas")
+
+    try:
+        site_id = int(rec.get("site_id"))
+    except (TypeError, ValueError):
+        raise ValueError("site_id noto'g'ri")
+    if site_id not in site_ids:
+        raise ValueError(f"site_id={site_id} topilmadi")
+
+    try:
+        created_at = parse_datetime(rec.get("created_at"))
+    except (TypeError, ValueError):
+        raise ValueError("created_at noto'g'ri (ISO 8601 kutiladi)")
+
+    try:
+        energy = float(rec.get("energy_kwh") or 0)
+    except (TypeError, ValueError):
+        raise ValueError("energy_kwh son emas")
+    if energy < 0:
+        raise ValueError("energy_kwh manfiy")
+
+    day = rec.get("date")
+    try:
+        day = date.fromisoformat(str(day)) if day else created_at.date()
+    except ValueError:
+        raise ValueError("date noto'g'ri")
+
+    power = rec.get("power_kw")
+    try:
+        power = float(power) if power not in (None, "") else None
+    except (TypeError, ValueError):
+        raise ValueError("power_kw son emas")
+
+    return {
+        "site_id": site_id,
+        "date": day,
+        "energy_kwh": energy,
+        "created_at": created_at,
+    }, power
+
+
+# ---------- YOZISH ----------
+
+def _insert_ignore(connection, rows):
+    # RETURNING faqat haqiqatan qo'shilgan qatorlarni qaytaradi: bazada bor yoki
+    # parallel ingest shu tranzaksiyadan oldin yozib ulgurgan kalitlar tushib qoladi
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(SolarReading.__table__).on_conflict_do_nothing(
+        index_elements=["site_id", "created_at"]
+    ).returning(SolarReading.site_id, SolarReading.date, SolarReading.energy_kwh)
+    return connection.execute(stmt, rows).all()
+
+
+def _write_chunk(rows, stats):
+    connection = db.session.connection()
+
+    # takroriy (site_id, created_at) — chunk ichida shu yerda, bazadagisi ON CONFLICT'da
+    unique = {}
+    for row in rows:
+        unique.setdefault((row["site_id"], row["created_at"]), row)
+    inserted = _insert_ignore(connection, list(unique.values()))
+    stats.duplicates += len(rows) - len(inserted)
+
+    if inserted:
+        # rollup'ga faqat shu tranzaksiya yozgan qatorlar qo'shiladi
+        deltas = {}
+        for site_id, day, energy in inserted:
+            deltas[(site_id, day)] = deltas.get((site_id, day), 0.0) + energy
+        apply_deltas(connection, deltas)
+        stats.inserted += len(inserted)
+
+    db.session.commit()
+
+
+def _update_sites(latest):
+    # har bir stansiyaning last_* ustunlari butun batch uchun bir marta
+    if not latest:
+        return
+    today = date.today()
+    energy_today = dict(
+        db.session.execute(
+            select(SolarDailyRollup.site_id, SolarDailyRollup.energy_kwh).where(
+                SolarDailyRollup.site_id.in_(list(latest)),
+                SolarDailyRollup.date == today,
+            )
+        ).all()
+    )
+    site = SolarSite.__table__
+    params = []
+    for site_id, (created_at, power) in latest.items():
+        params.append({
+            "b_id": site_id,
+            "b_power": power,
+            "b_energy": energy_today.get(site_id, 0.0),
+            "b_updated": created_at,
+        })
+    db.session.connection().execute(
+        update(site)
+        .where(site.c.id == bindparam("b_id"))
+        .where((site.c.last_updated_at.is_(None)) | (site.c.last_updated_at <= bindparam("b_updated")))
+        .values(
+            last_power_kw=func.coalesce(bindparam("b_power"), site.c.last_power_kw),
+            last_energy_today_kwh=bindparam("b_energy"),
+            last_updated_at=bindparam("b_updated"),
+        ),
+        params,
+    )
+    page_cache.bump(db.session.connection(), [("solar_site", site_id) for site_id in latest])
+    db.session.commit()
+
+
+def ingest(stream, fmt="csv", chunk_size=DEFAULT_CHUNK_SIZE):
+    stats = IngestStats()
+    site_ids = set(db.session.execute(select(SolarSite.id)).scalars())
+    latest = {}  # site_id -> (created_at, power_kw)
+
+    records = iter_records(stream, fmt)
+    while True:
+        batch = list(islice(records, chunk_size))
+        if not batch:
+            break
+        rows = []
+        for line_no, rec in batch:
+            stats.read += 1
+            try:
+                row, power = parse_record(rec, site_ids)
+            except ValueError as e:
+                stats.error(line_no, str(e))
+                continue
+            rows.append(row)
+            prev_time, prev_power = latest.get(row["site_id"], (None, None))
+            if prev_time is None or row["created_at"] >= prev_time:
+                latest[row["site_id"]] = (row["created_at"], power if power is not None else prev_power)
+        if rows:
+            _write_chunk(rows, stats)
+
+    _update_sites(latest)
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
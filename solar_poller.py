@@ -0,0 +1,259 @@
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from sqlalchemy import bindparam, func, select, update
+
+from models import db, SolarSite
+import page_cache
+
+
+DEFAULT_TIMEOUT = 5.0        # sekund, har bir stansiya uchun
+DEFAULT_WORKERS = 100
+BACKOFF_BASE = 30.0          # birinchi xatodan keyingi kutish, sekund
+BACKOFF_MAX = 30 * 60.0
+
+# tashqi API'lar turlicha nomlaydi
+POWER_KEYS = ("power_kw", "current_power_kw", "power")
+ENERGY_KEYS = ("energy_today_kwh", "today_energy_kwh", "energy_today", "e_today")
+
+
+class PollError(Exception):
+    pass
+
+
+def _pick(data, keys):
+    for key in keys:
+        if data.get(key) is not None:
+            return float(data[key])
+    return None
+
+
+def parse_payload(body):
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise PollError("javob JSON emas")
+    if not isinstance(data, dict):
+        raise PollError("javob JSON obyekt emas")
+    try:
+        power = _pick(data, POWER_KEYS)
+        energy = _pick(data, ENERGY_KEYS)
+    except (TypeError, ValueError):
+        raise PollError("qiymatlar son emas")
+    if power is None and energy is None:
+        raise PollError("power/energy maydonlari topilmadi")
+    return power, energy
+
+
+class SiteStats:
+    def __init__(self):
+        self.fetches = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_latency_ms = None
+        self.total_latency_ms = 0.0
+        self.last_error = None
+        self.next_attempt = 0.0  # time.monotonic() bo'yicha
+
+    def as_dict(self):
+        return {
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_latency_ms": self.last_latency_ms,
+            "avg_latency_ms": round(self.total_latency_ms / self.fetches, 2) if self.fetches else None,
+            "last_error": self.last_error,
+        }
+
+
+class SolarPoller:
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_workers=DEFAULT_WORKERS,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # oqimlar tsikllar orasida yashaydi, shuning uchun ulanishlar qayta ishlatiladi
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="solar-poll")
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.site_stats = {}
+        self.last_cycle = None
+
+    # ---------- HTTP ----------
+
+    def _pool(self):
+        pool = getattr(self._local, "pool", None)
+        if pool is None:
+            pool = self._local.pool = {}
+        return pool
+
+    def _connection(self, scheme, netloc):
+        pool = self._pool()
+        key = (scheme, netloc)
+        conn = pool.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = pool[key] = cls(netloc, timeout=self.timeout)
+        return conn, key
+
+    def fetch(self, url):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise PollError(f"noto'g'ri URL: {url}")
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        for attempt in (1, 2):
+            conn, key = self._connection(parts.scheme, parts.netloc)
+            reused = conn.sock is not None
+            try:
+                conn.request("GET", path, headers={"Accept": "application/json"})
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                self._pool().pop(key, None)
+                # server yopib qo'ygan keep-alive ulanish — bir marta qayta urinamiz
+                if reused and attempt == 1:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                self._pool().pop(key, None)
+                raise
+            if resp.will_close:
+                conn.close()
+                self._pool().pop(key, None)
+            if resp.status != 200:
+                raise PollError(f"HTTP {resp.status}")
+            return parse_payload(body)
+
+    def _poll_site(self, site_id, url):
+        t0 = time.perf_counter()
+        try:
+            result = self.fetch(url)
+            error = None
+        except Exception as e:
+            result = None
+            error = str(e) or e.__class__.__name__
+        return site_id, result, error, (time.perf_counter() - t0) * 1000
+
+    # ---------- TSIKL ----------
+
+    def _record(self, site_id, error, latency_ms, now):
+        with self._lock:
+            st = self.site_stats.setdefault(site_id, SiteStats())
+            st.fetches += 1
+            st.last_latency_ms = round(latency_ms, 2)
+            st.total_latency_ms += latency_ms
+            if error is None:
+                st.consecutive_failures = 0
+                st.last_error = None
+                st.next_attempt = 0.0
+            else:
+                st.failures += 1
+                st.consecutive_failures += 1
+                st.last_error = error
+                delay = min(self.backoff_base * 2 ** (st.consecutive_failures - 1), self.backoff_max)
+                st.next_attempt = now + delay
+
+    def _due(self, site_id, now):
+        st = self.site_stats.get(site_id)
+        return st is None or st.next_attempt <= now
+
+    def poll_once(self):
+        started = time.perf_counter()
+        now = time.monotonic()
+        sites = db.session.execute(
+            select(SolarSite.id, SolarSite.external_url).where(
+                SolarSite.external_url.isnot(None), SolarSite.external_url != ""
+            )
+        ).all()
+        due = [(site_id, url) for site_id, url in sites if self._due(site_id, now)]
+
+        results = list(self.executor.map(lambda s: self._poll_site(*s), due))
+
+        updates = []
+        fetched_at = datetime.utcnow()
+        for site_id, result, error, latency_ms in results:
+            self._record(site_id, error, latency_ms, now)
+            if result is not None:
+                power, energy = result
+                updates.append({"b_id": site_id, "b_power": power, "b_energy": energy, "b_at": fetched_at})
+
+        # tsikl natijalari bitta tranzaksiyada yoziladi
+        if updates:
+            site = SolarSite.__table__
+            db.session.connection().execute(
+                update(site)
+                .where(site.c.id == bindparam("b_id"))
+                .values(
+                    last_power_kw=func.coalesce(bindparam("b_power"), site.c.last_power_kw),
+                    last_energy_today_kwh=func.coalesce(bindparam("b_energy"), site.c.last_energy_today_kwh),
+                    last_updated_at=bindparam("b_at"),
+                ),
+                updates,
+            )
+            page_cache.bump(db.session.connection(), [("solar_site", row["b_id"]) for row in updates])
+        db.session.commit()
+
+        self.last_cycle = {
+            "at": fetched_at.isoformat(),
+            "sites": len(sites),
+            "polled": len(due),
+            "skipped_backoff": len(sites) - len(due),
+            "ok": len(updates),
+            "failed": len(due) - len(updates),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        return self.last_cycle
+
+    def stats(self):
+        with self._lock:
+            sites = {site_id: st.as_dict() for site_id, st in self.site_stats.items()}
+        return {"last_cycle": self.last_cycle, "sites": sites}
+
+    def run_forever(self, app, interval, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            with app.app_context():
+                try:
+                    self.poll_once()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("Solar poller tsiklida xato")
+            stop_event.wait(interval)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+def start_background_poller(app, poller):
+    # birinchi so'rovda (jobs.start_background_workers kabi): import, CLI buyruqlari va
+    # xizmat qilmayotgan app nusxalari oqim ishga tushirmaydi
+    interval = app.config.get("SOLAR_POLL_INTERVAL", 0)
+    started = app.extensions["solar_poller_threads"] = []
+    if not interval:
+        return started
+    lock = threading.Lock()
+
+    @app.before_request
+    def _start_solar_poller():
+        if started:
+            return
+        with lock:
+            if started:
+                return
+            thread = threading.Thread(
+                target=poller.run_forever, args=(app, interval), name="solar-poller", daemon=True
+            )
+            thread.start()
+            started.append(thread)
+
+    return started
@@ -0,0 +1,165 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import event, func, inspect, select, delete
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, SolarReading, SolarDailyRollup, SolarEnergyTotal
+import page_cache
+
+
+PERIODS = ("day", "week", "month")
+
+
+def period_start(period, d):
+    if period == "week":
+        return d - timedelta(days=d.weekday())
+    if period == "month":
+        return d.replace(day=1)
+    return d
+
+
+def _period_starts(period, count, end):
+    # oxirgi `count` ta davrning boshlanish sanalari (eskisidan yangisiga)
+    current = period_start(period, end)
+    starts = [current]
+    for _ in range(count - 1):
+        if period == "month":
+            current = (current - timedelta(days=1)).replace(day=1)
+        elif period == "week":
+            current = current - timedelta(days=7)
+        else:
+            current = current - timedelta(days=1)
+        starts.append(current)
+    return list(reversed(starts))
+
+
+# ---------- INKREMENTAL YANGILASH ----------
+
+def _upsert(connection, table, keys, rows):
+    if not rows:
+        return
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={"energy_kwh": table.c.energy_kwh + stmt.excluded.energy_kwh},
+    )
+    connection.execute(stmt, rows)
+
+
+# deltas: {(site_id, date): kwh} — rollup va jami jadvallarga qo'shiladi
+def apply_deltas(connection, deltas):
+    site_rows = []
+    totals = defaultdict(float)
+    for (site_id, day), kwh in deltas.items():
+        if day is None or not kwh:
+            continue
+        if site_id is not None:
+            site_rows.append({"site_id": site_id, "date": day, "energy_kwh": kwh})
+        for period in PERIODS:
+            totals[(period, period_start(period, day))] += kwh
+
+    _upsert(connection, SolarDailyRollup.__table__, ["site_id", "date"], site_rows)
+    page_cache.bump(connection, [("solar_site", row["site_id"]) for row in site_rows])
+    _upsert(
+        connection,
+        SolarEnergyTotal.__table__,
+        ["period", "period_start"],
+        [{"period": p, "period_start": d, "energy_kwh": kwh} for (p, d), kwh in totals.items()],
+    )
+
+
+@event.listens_for(SolarReading, "after_insert")
+def _reading_inserted(mapper, connection, target):
+    apply_deltas(connection, {(target.site_id, target.date): target.energy_kwh or 0})
+
+
+@event.listens_for(SolarReading, "after_delete")
+def _reading_deleted(mapper, connection, target):
+    apply_deltas(connection, {(target.site_id, target.date): -(target.energy_kwh or 0)})
+
+
+@event.listens_for(SolarReading, "after_update")
+def _reading_updated(mapper, connection, target):
+    state = inspect(target)
+    old = {}
+    for attr in ("site_id", "date", "energy_kwh"):
+        hist = state.attrs[attr].history
+        old[attr] = hist.deleted[0] if hist.deleted else getattr(target, attr)
+
+    deltas = defaultdict(float)
+    deltas[(old["site_id"], old["date"])] -= old["energy_kwh"] or 0
+    deltas[(target.site_id, target.date)] += target.energy_kwh or 0
+    apply_deltas(connection, deltas)
+
+
+# ---------- BACKFILL ----------
+
+def rebuild_rollups(connection=None):
+    # connection berilsa (migratsiya) o'sha tranzaksiyada, aks holda db.session'da commit bilan
+    own = connection is None
+    if own:
+        connection = db.session.connection()
+    connection.execute(delete(SolarDailyRollup))
+    connection.execute(delete(SolarEnergyTotal))
+
+    connection.execute(
+        SolarDailyRollup.__table__.insert().from_select(
+            ["site_id", "date", "energy_kwh"],
+            select(
+                SolarReading.site_id,
+                SolarReading.date,
+                func.coalesce(func.sum(SolarReading.energy_kwh), 0),
+            )
+            .where(SolarReading.site_id.isnot(None), SolarReading.date.isnot(None))
+            .group_by(SolarReading.site_id, SolarReading.date),
+        )
+    )
+
+    # jami yig'indilar kunlar soniga proporsional, o'qishlar soniga emas
+    daily = connection.execute(
+        select(SolarReading.date, func.coalesce(func.sum(SolarReading.energy_kwh), 0))
+        .where(SolarReading.date.isnot(None))
+        .group_by(SolarReading.date)
+    ).all()
+    totals = defaultdict(float)
+    for day, kwh in daily:
+        for period in PERIODS:
+            totals[(period, period_start(period, day))] += float(kwh or 0)
+    if totals:
+        connection.execute(
+            SolarEnergyTotal.__table__.insert(),
+            [{"period": p, "period_start": d, "energy_kwh": kwh} for (p, d), kwh in totals.items()],
+        )
+
+    page_cache.bump(connection, [("solar_site", 0)])
+    if own:
+        db.session.commit()
+    return len(daily)
+
+
+# ---------- O'QISH ----------
+
+def period_series(period="day", count=7, end=None):
+    end = end or date.today()
+    starts = _period_starts(period, count, end)
+    rows = db.session.execute(
+        select(SolarEnergyTotal.period_start, SolarEnergyTotal.energy_kwh).where(
+            SolarEnergyTotal.period == period,
+            SolarEnergyTotal.period_start >= starts[0],
+            SolarEnergyTotal.period_start <= starts[-1],
+        )
+    ).all()
+    totals = {d: float(kwh or 0) for d, kwh in rows}
+    return [d.isoformat() for d in starts], [totals.get(d, 0.0) for d in starts]
+
+
+def site_daily(site_id, limit=14):
+    rows = (
+        SolarDailyRollup.query.filter_by(site_id=site_id)
+        .order_by(SolarDailyRollup.date.desc())
+        .limit(limit)
+        .all()
+    )
+    return list(reversed(rows))
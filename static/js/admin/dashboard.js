@@ -0,0 +1,59 @@
+// Serverdan keladigan ma'lumotlar: <script id="page-data"> (admin/dashboard.html)
+const pageData = JSON.parse(document.getElementById('page-data').textContent);
+const taskStatusData = pageData.taskStatus;   // {labels: [...], values:[...]}
+const ijroMonthlyData = pageData.ijroMonthly; // {labels: [...], values:[...]}
+const solarWeeklyData = pageData.solarWeekly; // {labels: [...], values:[...]}
+
+// Task status chart
+const ctx1 = document.getElementById('taskStatusChart').getContext('2d');
+new Chart(ctx1, {
+  type: 'doughnut',
+  data: {
+    labels: taskStatusData.labels,
+    datasets: [{
+      data: taskStatusData.values
+    }]
+  },
+  options:{
+    plugins:{ legend:{ labels:{ color:'#fff' } } }
+  }
+});
+
+// Ijro monthly chart
+const ctx2 = document.getElementById('ijroMonthlyChart').getContext('2d');
+new Chart(ctx2, {
+  type: 'line',
+  data: {
+    labels: ijroMonthlyData.labels,
+    datasets: [{
+      data: ijroMonthlyData.values,
+      tension:0.3
+    }]
+  },
+  options:{
+    plugins:{ legend:{ display:false } },
+    scales:{
+      x:{ ticks:{ color:'#ccc' }, grid:{ color:'#333'} },
+      y:{ ticks:{ color:'#ccc' }, grid:{ color:'#333'} }
+    }
+  }
+});
+
+// Solar weekly chart
+const ctx3 = document.getElementById('solarWeeklyChart').getContext('2d');
+new Chart(ctx3, {
+  type: 'bar',
+  data: {
+    labels: solarWeeklyData.labels,
+    datasets: [{
+      data: solarWeeklyData.values
+    }]
+  },
+  options:{
+    plugins:{ legend:{ display:false } },
+    scales:{
+      x:{ ticks:{ color:'#ccc' }, grid:{ color:'#333'} },
+      y:{ ticks:{ color:'#ccc' }, grid:{ color:'#333'} }
+    }
+  }
+});
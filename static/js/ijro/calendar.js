@@ -0,0 +1,127 @@
+const pageData = JSON.parse(document.getElementById('page-data').textContent);
+// Oylar serverdan kerak bo'lganda olinadi: {"month": "YYYY-MM", "days": {"YYYY-MM-DD": [{title, ...}]}}
+const FEED_URL = pageData.feedUrl;
+const monthCache = {};
+let days = {};
+
+let currentDate = new Date();
+renderCalendar();
+
+function monthKey(dt){
+    return `${dt.getFullYear()}-${String(dt.getMonth()+1).padStart(2,'0')}`;
+}
+
+function loadMonth(key){
+    if (!monthCache[key]){
+        // ETag bilan: o'zgarmagan oy 304 qaytaradi va brauzer keshidan o'qiladi
+        monthCache[key] = fetch(`${FEED_URL}?month=${key}`, {credentials:"same-origin"})
+            .then(r => r.ok ? r.json() : {days:{}})
+            .then(data => data.days || {})
+            .catch(() => { delete monthCache[key]; return {}; });
+    }
+    return monthCache[key];
+}
+
+function renderCalendar(){
+    const key = monthKey(currentDate);
+    loadMonth(key).then(monthDays => {
+        if (key !== monthKey(currentDate)) return;  // foydalanuvchi boshqa oyga o'tib bo'lgan
+        days = monthDays;
+        drawMonth();
+    });
+}
+
+function drawMonth(){
+    const year = currentDate.getFullYear();
+    const month = currentDate.getMonth();
+
+    const firstDay = new Date(year, month, 1).getDay(); // 0 Yakshanba
+    const lastDate = new Date(year, month+1, 0).getDate();
+
+    document.getElementById("monthYear").innerText =
+        currentDate.toLocaleString("uz-UZ", { month:"long", year:"numeric" });
+
+    // dushanbani hafta boshi qilamiz (0=Yak → 6 ga surib, 1=Du → 0)
+    let offset = firstDay - 1;
+    if (offset < 0) offset = 6;
+
+    let html = "";
+
+    for (let i=0; i<offset; i++){
+        html += `<div></div>`;
+    }
+
+    const today = new Date();
+    const todayStr = today.toISOString().slice(0,10); // YYYY-MM-DD
+
+    for (let d=1; d<=lastDate; d++){
+        const dateStr = `${year}-${String(month+1).padStart(2,'0')}-${String(d).padStart(2,'0')}`;
+        const dayTasks = days[dateStr] || [];
+
+        let chips = "";
+        dayTasks.slice(0,3).forEach(t => {
+            const st = (t.status || "new").replace(" ","_");
+            chips += `<span class="task-chip chip-${st}">${t.title}</span>`;
+        });
+        if (dayTasks.length > 3){
+            chips += `<span class="task-chip">+${dayTasks.length - 3} ta</span>`;
+        }
+
+        const isToday = (dateStr === todayStr);
+
+        html += `
+          <div class="day-box ${isToday ? 'today-box' : ''}" onclick="openModal('${dateStr}')">
+            <div class="day-number">${d}</div>
+            <div class="day-badges">
+              ${chips}
+            </div>
+          </div>
+        `;
+    }
+
+    document.getElementById("calendarGrid").innerHTML = html;
+}
+
+function prevMonth(){
+    currentDate.setDate(1);
+    currentDate.setMonth(currentDate.getMonth() - 1);
+    renderCalendar();
+}
+
+function nextMonth(){
+    currentDate.setDate(1);
+    currentDate.setMonth(currentDate.getMonth() + 1);
+    renderCalendar();
+}
+
+function openModal(dateStr){
+    const dayTasks = days[dateStr] || [];
+    const box = document.getElementById("modalTasks");
+    let html = "";
+
+    if (dayTasks.length === 0){
+        html = "<div class='empty-text'>Bu kunda topshiriq yo‘q.</div>";
+    } else {
+        dayTasks.forEach(t => {
+            const st = (t.status || "new").replace(" ","_");
+            html += `
+              <div class="modal-task">
+                <div class="modal-task-title">${t.title}</div>
+                <div class="modal-task-meta">
+                  Muddat: ${t.due_date || "-"}<br>
+                  ${t.description || ""}
+                </div>
+                <span class="modal-status-pill chip-${st}">${t.status || "new"}</span>
+              </div>
+            `;
+        });
+    }
+
+    document.getElementById("modalDateTitle").innerText = "Sana: " + dateStr;
+    box.innerHTML = html;
+    document.getElementById("modalBg").style.display = "flex";
+}
+
+function closeModal(){
+    document.getElementById("modalBg").style.display = "none";
+}
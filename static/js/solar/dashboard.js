@@ -0,0 +1,25 @@
+const pageData = JSON.parse(document.getElementById('page-data').textContent);
+const solarLabels = pageData.labels;     // masalan: ["2025-11-13","2025-11-14",...]
+const solarData   = pageData.values;     // masalan: [120, 140, 110, ...]
+
+const ctx = document.getElementById('solarChart').getContext('2d');
+new Chart(ctx, {
+  type: 'line',
+  data: {
+    labels: solarLabels,
+    datasets: [{
+      label: 'Kunda ishlab chiqarilgan energiya (kWh)',
+      data: solarData,
+      tension: 0.3
+    }]
+  },
+  options: {
+    plugins:{
+      legend:{ labels:{ color:'#fff' } }
+    },
+    scales:{
+      x:{ ticks:{ color:'#ccc' }, grid:{ color:'#333'} },
+      y:{ ticks:{ color:'#ccc' }, grid:{ color:'#333'} }
+    }
+  }
+});
@@ -0,0 +1,22 @@
+const pageData = JSON.parse(document.getElementById('page-data').textContent);
+const labels = pageData.labels;   // masalan ["2025-11-10", ...]
+const values = pageData.values;   // [100, 120, ...]
+
+const ctx2 = document.getElementById('siteChart').getContext('2d');
+new Chart(ctx2, {
+  type: 'bar',
+  data: {
+    labels,
+    datasets: [{
+      label: 'Kunlik energiya (kWh)',
+      data: values
+    }]
+  },
+  options:{
+    plugins:{ legend:{ labels:{ color:'#fff' } } },
+    scales:{
+      x:{ ticks:{ color:'#ccc' }, grid:{ color:'#333'} },
+      y:{ ticks:{ color:'#ccc' }, grid:{ color:'#333'} }
+    }
+  }
+});
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import shutil
+import uuid
+
+from werkzeug.utils import secure_filename
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow bo'lmasa thumbnail yaratilmaydi, asl rasm ko'rsatiladi
+    Image = None
+
+
+CHUNK_SIZE = 64 * 1024
+THUMB_DIR = "thumbs"
+THUMB_HEIGHT = 360   # kartalarda 180px, retina uchun 2x
+THUMB_QUALITY = 80
+IMAGE_EXTS = {"jpg", "jpeg", "png", "gif", "webp", "bmp"}
+
+
+def _extension(filename):
+    name = secure_filename(filename or "")
+    return name.rsplit(".", 1)[1].lower() if "." in name else ""
+
+
+# ---------- SPOOL (fon vazifalari uchun) ----------
+# So'rov faylni hash'siz, tasodifiy nom bilan spool_dir'ga tashlaydi; worker keyin
+# store_spooled bilan kontent-hash nomiga o'tkazadi. Spool fayl faqat vazifa
+# muvaffaqiyatli tugagach o'chiriladi — qayta urinishda ham mavjud bo'ladi.
+# Yakuniy nom sha256 bo'yicha: "ab/abcd...ef.jpg" (upload_folder'ga nisbatan);
+# bir xil tarkibli fayl ikkinchi marta yozilmaydi.
+
+def spool_upload(file_storage, spool_dir):
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, uuid.uuid4().hex + ".part")
+    file_storage.save(path, buffer_size=CHUNK_SIZE)
+    return path
+
+
+def store_spooled(spool_path, filename, upload_folder):
+    ext = _extension(filename)
+    digest = hashlib.sha256()
+    with open(spool_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    hexdigest = digest.hexdigest()
+    rel_path = f"{hexdigest[:2]}/{hexdigest}" + (f".{ext}" if ext else "")
+    final_path = os.path.join(upload_folder, rel_path)
+    if not os.path.exists(final_path):
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        tmp_path = final_path + f".{uuid.uuid4().hex}.tmp"
+        try:
+            os.link(spool_path, tmp_path)  # bir fayl tizimida nusxalashsiz
+        except OSError:
+            shutil.copyfile(spool_path, tmp_path)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, final_path)
+    return rel_path
+
+
+def discard_spooled(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# ---------- THUMBNAIL ----------
+
+def thumbnail_path(rel_path):
+    stem = os.path.splitext(os.path.basename(rel_path))[0]
+    return f"{THUMB_DIR}/{stem[:2]}/{stem}_{THUMB_HEIGHT}.webp"
+
+
+def is_image(rel_path):
+    return _extension(rel_path) in IMAGE_EXTS
+
+
+def make_thumbnail(upload_folder, rel_path):
+    if Image is None or not is_image(rel_path):
+        return None
+    target = os.path.join(upload_folder, thumbnail_path(rel_path))
+    if os.path.exists(target):
+        return target
+
+    with Image.open(os.path.join(upload_folder, rel_path)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.height > THUMB_HEIGHT:
+            width = max(1, round(img.width * THUMB_HEIGHT / img.height))
+            img = img.resize((width, THUMB_HEIGHT), Image.LANCZOS)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = target + ".tmp"
+        img.save(tmp, "WEBP", quality=THUMB_QUALITY, method=4)
+        os.replace(tmp, target)
+    return target
+
+
+def thumbnail_or_original(upload_folder, rel_path):
+    if not rel_path:
+        return rel_path
+    thumb = thumbnail_path(rel_path)
+    if os.path.exists(os.path.join(upload_folder, thumb)):
+        return thumb
+    return rel_path